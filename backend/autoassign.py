@@ -0,0 +1,56 @@
+# app/autoassign.py
+import asyncio
+import os
+from database import fetch
+from cache import invalidate
+
+# complaints assigned per auto_assign_complaints() call
+AUTO_ASSIGN_BATCH = int(os.getenv("AUTO_ASSIGN_BATCH", 100))
+# seconds between background passes over the pending backlog; 0 disables the loop
+AUTO_ASSIGN_INTERVAL = float(os.getenv("AUTO_ASSIGN_INTERVAL", 0))
+
+
+async def auto_assign(limit: int = AUTO_ASSIGN_BATCH, assigned_by: int | None = None) -> list[dict]:
+    """
+    Assigns one batch of unassigned Pending complaints to the least-loaded
+    officer of the routed department. Safe to call from several workers at
+    once: only one run assigns at a time, the others return no rows.
+    """
+    rows = await fetch("SELECT * FROM auto_assign_complaints($1, $2)", limit, assigned_by)
+    if rows:
+        invalidate("complaintassignments", "complaints")
+    return rows
+
+
+class AutoAssigner:
+    """Background loop that drains the pending backlog batch by batch."""
+
+    def __init__(self, interval: float, batch: int):
+        self.interval = interval
+        self.batch = batch
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # a full batch means more may be waiting, so go again without the full
+                # interval, yielding so a large backlog doesn't starve the event loop
+                while len(await auto_assign(self.batch)) == self.batch:
+                    await asyncio.sleep(0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("❌ Auto-assignment pass failed:", e)
+            await asyncio.sleep(self.interval)
+
+
+auto_assigner = AutoAssigner(AUTO_ASSIGN_INTERVAL, AUTO_ASSIGN_BATCH)
@@ -0,0 +1,113 @@
+"""
+Write latency on the complaint hot path under each audit trigger mode:
+per-row triggers, statement-level triggers with transition tables, and no
+auditing as the floor.
+
+    cd backend && python -m benchmarks.audit_modes --rows 2000 --user-id 1
+
+Each mode times single-row INSERTs (POST /complaints), single-row status
+UPDATEs (PUT /complaints/{id}/status) and multi-row INSERTs of --batch rows
+(POST /complaints/bulk). Needs DATABASE_URL pointing at a database loaded
+from init.sql. Switching modes recreates triggers, so run it against a test
+database; marker rows are deleted and the original mode restored afterwards.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from database import init_db_pool, close_db_pool, fetchrow, execute
+
+MARKER = "__bench_audit__"
+MODES = ("row", "statement", "off")
+
+INSERT_SQL = """
+    INSERT INTO complaints (user_id, category, description, location, status)
+    VALUES ($1, $2, $3, 'Bench Street', 'Pending')
+    RETURNING complaint_id
+"""
+UPDATE_SQL = """
+    UPDATE complaints SET status = $1, last_updated_at = CURRENT_TIMESTAMP
+    WHERE complaint_id = $2
+"""
+BULK_SQL = """
+    INSERT INTO complaints (user_id, category, description, location, status)
+    SELECT $1, $2, 'benchmark complaint ' || g, 'Bench Street', 'Pending'
+    FROM generate_series(1, $3) g
+"""
+
+
+def summary(samples: list[float]) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "n": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(ms[len(ms) // 2], 3),
+        "p95_ms": round(ms[int(len(ms) * 0.95) - 1], 3),
+    }
+
+
+async def timed(query: str, *args) -> float:
+    start = time.perf_counter()
+    await fetchrow(query, *args)
+    return time.perf_counter() - start
+
+
+async def run_mode(mode: str, rows: int, batch: int, user_id: int) -> dict:
+    await execute("SELECT set_audit_mode($1)", mode)
+    ids, inserts, updates, bulks = [], [], [], []
+    for i in range(rows):
+        start = time.perf_counter()
+        row = await fetchrow(INSERT_SQL, user_id, MARKER, f"benchmark complaint {i}")
+        inserts.append(time.perf_counter() - start)
+        ids.append(row["complaint_id"])
+    for cid in ids:
+        updates.append(await timed(UPDATE_SQL, "In Progress", cid))
+    for _ in range(max(1, rows // batch)):
+        bulks.append(await timed(BULK_SQL, user_id, MARKER, batch))
+    audit_rows = await fetchrow(
+        "SELECT count(*) AS n FROM auditlog WHERE table_name = 'complaints' AND primary_key = ANY($1::jsonb[])",
+        [str(i) for i in ids],
+    )
+    await execute("DELETE FROM complaints WHERE category = $1", MARKER)
+    return {
+        "insert": summary(inserts),
+        "status_update": summary(updates),
+        f"bulk_insert_{batch}": summary(bulks),
+        "audit_rows_for_single_row_ids": audit_rows["n"],
+    }
+
+
+async def run(rows: int, batch: int, user_id: int, modes) -> dict:
+    original = (await fetchrow("SELECT audit_mode() AS mode"))["mode"]
+    results = {"original_mode": original}
+    try:
+        for mode in modes:
+            results[mode] = await run_mode(mode, rows, batch, user_id)
+    finally:
+        await execute("SELECT set_audit_mode($1)", original)
+    if "row" in results and "statement" in results:
+        results["statement_vs_row_mean"] = {
+            op: round(results["statement"][op]["mean_ms"] / results["row"][op]["mean_ms"], 3)
+            for op in ("insert", "status_update", f"bulk_insert_{batch}")
+        }
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500, help="rows per multi-row insert")
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args()
+
+    await init_db_pool()
+    try:
+        print(json.dumps(await run(args.rows, args.batch, args.user_id, args.modes), indent=2))
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Event-loop stall caused by password hashing. A probe coroutine stands in for
+an unrelated endpoint and records how late each of its ticks runs while
+`--concurrency` registrations hash passwords, first inline on the loop (the
+old register handler) and then through security.hash_password.
+
+    cd backend && python -m benchmarks.auth_latency --registrations 64 --concurrency 16
+
+No database is needed.
+"""
+import argparse
+import asyncio
+import json
+import time
+import security
+
+PROBE_INTERVAL = 0.005
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def probe(stop: asyncio.Event, delays: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        delays.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def inline_hash(password: str):
+    security._hash(password)
+
+
+async def run_mode(hasher, registrations: int, concurrency: int):
+    delays: list = []
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(stop, delays))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def register(i):
+        async with semaphore:
+            await hasher(f"password-{i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(register(i) for i in range(registrations)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+    return {
+        "registrations_per_second": round(registrations / elapsed, 1),
+        "probe_lag_ms": {
+            "p50": round(percentile(delays, 50), 2),
+            "p99": round(percentile(delays, 99), 2),
+            "max": round(max(delays, default=0.0), 2),
+        },
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--registrations", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    results = {
+        "bcrypt_rounds": security.BCRYPT_ROUNDS,
+        "workers": security.HASH_WORKERS,
+        "inline": await run_mode(inline_hash, args.registrations, args.concurrency),
+        "offloaded": await run_mode(security.hash_password, args.registrations, args.concurrency),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
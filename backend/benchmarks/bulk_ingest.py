@@ -0,0 +1,79 @@
+"""
+Rows/second for complaint ingestion: one INSERT per row (what POST /complaints
+does) against the batched path behind POST /complaints/bulk.
+
+    cd backend && python -m benchmarks.bulk_ingest --rows 5000 --user-id 1
+
+Needs DATABASE_URL pointing at a database loaded from init.sql. The inserted
+rows are tagged with a marker category and deleted afterwards.
+"""
+import argparse
+import asyncio
+import json
+import time
+from database import init_db_pool, close_db_pool, fetchrow, execute, transaction
+from bulk import bulk_insert
+from schemas import ComplaintCreate
+
+MARKER = "__bench_bulk__"
+COLUMNS = {"user_id": "int", "category": "varchar", "description": "text", "location": "varchar"}
+
+
+def make_items(n: int, user_id: int):
+    return [
+        (i, ComplaintCreate(user_id=user_id, category=MARKER,
+                            description=f"benchmark complaint {i}", location="Bench Street"))
+        for i in range(n)
+    ]
+
+
+async def single_rows(items):
+    q = """
+    INSERT INTO complaints (user_id, category, description, location, status)
+    VALUES ($1, $2, $3, $4, 'Pending')
+    RETURNING complaint_id
+    """
+    for _, c in items:
+        await fetchrow(q, c.user_id, c.category, c.description, c.location)
+
+
+async def batched(items):
+    async with transaction() as conn:
+        await bulk_insert(conn, "complaints", COLUMNS, items, [],
+                          references={"user_id": ("users", "user_id")}, returning="complaint_id")
+
+
+async def run(rows: int, user_id: int, batch: int):
+    results = {}
+    for name, fn in (("single_row", single_rows), ("bulk", batched)):
+        items = make_items(rows, user_id)
+        start = time.perf_counter()
+        if name == "bulk":
+            for i in range(0, rows, batch):
+                await fn(items[i:i + batch])
+        else:
+            await fn(items)
+        elapsed = time.perf_counter() - start
+        results[name] = {"rows": rows, "seconds": round(elapsed, 3),
+                         "rows_per_second": round(rows / elapsed, 1)}
+        await execute("DELETE FROM complaints WHERE category = $1", MARKER)
+    results["speedup"] = round(results["bulk"]["rows_per_second"] / results["single_row"]["rows_per_second"], 2)
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=1000, help="rows per bulk request")
+    parser.add_argument("--user-id", type=int, default=1)
+    args = parser.parse_args()
+
+    await init_db_pool()
+    try:
+        print(json.dumps(await run(args.rows, args.user_id, args.batch), indent=2))
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,182 @@
+"""
+Drives the API with concurrent clients and reports throughput and
+p50/p95/p99 latency per route.
+
+    cd backend && python -m benchmarks.load --concurrency 32 --requests 500 --output results/base.json
+    python -m benchmarks.load --base-url http://localhost:5000 --compare results/base.json
+
+Without --base-url the FastAPI app runs in-process (httpx ASGI transport, no
+sockets), so the numbers isolate the app and database from network and
+server overhead. Each route gets --requests calls, spread round-robin over
+the clients. --output saves the report as JSON; --compare prints the change
+in p95 against an earlier report and exits non-zero on regressions beyond
+--threshold. Seed data first with benchmarks.seed.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import httpx
+
+# name -> path; {complaint_id} and {officer_id} are filled from ids sampled at start
+ROUTES = {
+    "complaints.list": "/api/complaints/?limit=50",
+    "complaints.get": "/api/complaints/{complaint_id}",
+    "complaints.stats": "/api/complaints/stats",
+    "complaints.search": "/api/complaints/search?q=smoke&limit=20",
+    "views.complaint_summary": "/api/views/complaint_summary?limit=100",
+    "views.officer_workload": "/api/views/officer_workload",
+    "views.officer_workload_one": "/api/views/officer_workload/{officer_id}",
+    "analytics.timeseries": "/api/analytics/timeseries?group_by=category",
+    "audit.list": "/api/audit/?limit=100",
+    "officers.list": "/api/officers/",
+    "health": "/api/health",
+}
+
+
+def percentile(sorted_ms: list[float], p: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = (len(sorted_ms) - 1) * p
+    lo, hi = int(k), min(int(k) + 1, len(sorted_ms) - 1)
+    return sorted_ms[lo] + (sorted_ms[hi] - sorted_ms[lo]) * (k - lo)
+
+
+def summarize(samples: list[float], errors: int, elapsed: float) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "requests": len(ms),
+        "errors": errors,
+        "rps": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 0.50), 3),
+        "p95_ms": round(percentile(ms, 0.95), 3),
+        "p99_ms": round(percentile(ms, 0.99), 3),
+        "max_ms": round(ms[-1], 3) if ms else 0.0,
+    }
+
+
+async def sample_ids(client: httpx.AsyncClient) -> dict:
+    complaints = (await client.get("/api/complaints/?limit=500")).json()
+    officers = (await client.get("/api/officers/")).json()
+    return {
+        "complaint_id": [c["complaint_id"] for c in complaints] or [1],
+        "officer_id": [o["officer_id"] for o in officers] or [1],
+    }
+
+
+async def run(client: httpx.AsyncClient, routes: dict, requests: int, concurrency: int) -> dict:
+    ids = await sample_ids(client)
+    jobs = [name for _ in range(requests) for name in routes]
+    latencies: dict[str, list[float]] = {name: [] for name in routes}
+    errors: dict[str, int] = {name: 0 for name in routes}
+    statuses: dict[str, dict[str, int]] = {name: {} for name in routes}
+    queue: asyncio.Queue = asyncio.Queue()
+    for name in jobs:
+        queue.put_nowait(name)
+
+    async def worker():
+        while not queue.empty():
+            name = queue.get_nowait()
+            path = routes[name].format(**{k: random.choice(v) for k, v in ids.items()})
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                code = str(response.status_code)
+            except httpx.HTTPError as e:
+                code = type(e).__name__
+            latencies[name].append(time.perf_counter() - start)
+            statuses[name][code] = statuses[name].get(code, 0) + 1
+            if not code.startswith("2"):
+                errors[name] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    report = {name: {**summarize(latencies[name], errors[name], elapsed), "status": statuses[name]}
+              for name in routes}
+    everything = [s for samples in latencies.values() for s in samples]
+    report["_total"] = summarize(everything, sum(errors.values()), elapsed)
+    return report
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Prints p95 changes per route; returns the routes that regressed beyond `threshold`."""
+    regressions = []
+    for name, stats in current["routes"].items():
+        before = baseline.get("routes", {}).get(name)
+        if not before or not before["p95_ms"]:
+            continue
+        change = stats["p95_ms"] / before["p95_ms"] - 1
+        flag = ""
+        if change > threshold and name != "_total":
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:32} p95 {before['p95_ms']:9.2f} -> {stats['p95_ms']:9.2f} ms ({change:+.1%}){flag}",
+              file=sys.stderr)
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--routes", nargs="+", choices=sorted(ROUTES), help="default: all")
+    parser.add_argument("--label", help="free-form name stored in the report, e.g. a branch")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--compare", type=Path, help="earlier report to compare p95 against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="p95 increase counted as a regression")
+    args = parser.parse_args()
+
+    routes = {name: ROUTES[name] for name in (args.routes or ROUTES)}
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+            report = await run(client, routes, args.requests, args.concurrency)
+    else:
+        import main as app_main  # the app's startup hook opens the pool and the change listener
+        await app_main.startup()
+        try:
+            transport = httpx.ASGITransport(app=app_main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+                report = await run(client, routes, args.requests, args.concurrency)
+        finally:
+            await app_main.shutdown()
+
+    result = {
+        "label": args.label,
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "target": args.base_url or "in-process",
+        "concurrency": args.concurrency,
+        "requests_per_route": args.requests,
+        "routes": report,
+    }
+    print(json.dumps(result, indent=2))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2))
+    if args.compare:
+        if compare(result, json.loads(args.compare.read_text()), args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
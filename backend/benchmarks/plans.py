@@ -0,0 +1,363 @@
+"""
+Collects the SQL the API issues and checks each plan with
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) against a seeded database.
+
+    cd backend && python -m benchmarks.plans --output results/plans.json
+    python -m benchmarks.plans --baseline results/plans.json --fail-on-findings
+
+Statements come from three places: every route the app mounts is called
+once in-process (writes included, plus the query strings in benchmarks.load)
+while the database helpers record each distinct query with its arguments,
+the prepared-statement registry, and the SQL functions listed in
+FUNCTION_CALLS. During collection every checkout gets one connection and
+each request runs in a transaction on it that is rolled back, and each
+statement is explained the same way, so writes leave nothing behind. Routes
+in SKIPPED touch files or never finish and are not called. Statements the
+exports stream through a server-side cursor are explained as DECLARE CURSOR,
+which the planner optimizes for the first rows rather than the total.
+
+Flags sequential scans that read at least --min-rows rows and sorts over at
+least --min-rows rows or spilling to disk. --baseline compares total plan
+cost per statement with an earlier report. --nested also explains the
+statements inside PL/pgSQL functions through auto_explain, which needs a
+superuser to LOAD. Seed data first with benchmarks.seed.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlencode
+import httpx
+import database
+import metrics
+from database import acquire, primary_reads, replica_set
+from routers.evidence import EvidenceCreate
+from schemas import ActionCreate, AssignmentCreate, ComplaintCreate
+from statements import registered
+from benchmarks.load import ROUTES, git_revision
+
+# (method, path) -> why it isn't called during collection
+SKIPPED = {
+    ("GET", "/api/events/complaints"): "server-sent event stream, never completes",
+    ("POST", "/api/evidence/upload"): "writes a blob file",
+    ("POST", "/api/evidence/uploads"): "creates an upload file",
+    ("HEAD", "/api/evidence/uploads/{upload_id}"): "reads an upload file",
+    ("PATCH", "/api/evidence/uploads/{upload_id}"): "writes an upload file",
+    ("POST", "/api/evidence/uploads/{upload_id}/complete"): "moves an upload file into the blob store",
+    ("DELETE", "/api/evidence/{evidence_id}"): "removes the blob file once its own transaction commits",
+}
+
+# bulk routes parse their body themselves, so OpenAPI has no schema for it
+BULK_MODELS = {
+    "/api/complaints/bulk": ComplaintCreate,
+    "/api/categories/bulk": ComplaintCreate,
+    "/api/evidence/bulk": EvidenceCreate,
+    "/api/actions/bulk": ActionCreate,
+    "/api/assignments/bulk": AssignmentCreate,
+}
+
+# a real row for each id a route or body can take
+SAMPLE_IDS = {
+    # an officer's user, so DELETE /users/{user_id} cascades through ComplaintActions too
+    "user_id": "SELECT min(user_id) FROM officers",
+    "complaint_id": "SELECT min(complaint_id) FROM complaints",
+    "officer_id": "SELECT min(officer_id) FROM officers",
+    "evidence_id": "SELECT min(evidence_id) FROM complaintevidence",
+    "feedback_id": "SELECT min(feedback_id) FROM feedback",
+}
+# fields whose placeholder value would fail a check constraint
+SAMPLE_VALUES = {"status": "In Progress", "mime_type": "text/plain"}
+
+# SQL functions that no mounted route reaches, with representative arguments
+FUNCTION_CALLS = [
+    ("SELECT * FROM officer_workload($1)", (1,)),
+    ("SELECT * FROM complaints_by_status($1)", ("Pending",)),
+    ("SELECT * FROM officers_workload($1, $2, $3)", (None, 7, 90)),
+]
+
+AUTO_EXPLAIN = [
+    "LOAD 'auto_explain'",
+    "SET auto_explain.log_min_duration = 0",
+    "SET auto_explain.log_analyze = on",
+    "SET auto_explain.log_buffers = on",
+    "SET auto_explain.log_nested_statements = on",
+    "SET auto_explain.log_format = json",
+    "SET client_min_messages = log",
+]
+
+
+class _RollbackPool:
+    """
+    Stands in for the pool during collection: every checkout gets the same
+    connection, so a request's statements all run in the transaction
+    collect() opens around it and rolls back. Checkouts from other tasks
+    (a route gathering reads) wait their turn; the holding task may nest.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._lock = asyncio.Lock()
+        self._owner = None
+        self._depth = 0
+
+    async def acquire(self, timeout=None):
+        task = asyncio.current_task()
+        if self._owner is not task:
+            await self._lock.acquire()
+            self._owner = task
+        self._depth += 1
+        return self._conn
+
+    async def release(self, conn):
+        self._depth -= 1
+        if not self._depth:
+            self._owner = None
+            self._lock.release()
+
+    def get_size(self):
+        return 1
+
+    get_max_size = get_min_size = get_size
+
+    def get_idle_size(self):
+        return 0
+
+    def __getattr__(self, name):
+        # pool.fetchval() and friends
+        return getattr(self._conn, name)
+
+
+def example(schema: dict, defs: dict, ids: dict, name: str = ""):
+    """A minimal valid value for a JSON schema; `ids` fills fields by name."""
+    if "$ref" in schema:
+        return example(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, ids, name)
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"]
+        return example(options[0], defs, ids, name) if options else None
+    if name in ids:
+        return ids[name]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+    kind = schema.get("type")
+    if kind == "object":
+        return {k: example(v, defs, ids, k) for k, v in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [example(schema.get("items", {}), defs, ids, name)]
+    if kind == "integer":
+        return schema.get("minimum", 1)
+    if kind == "number":
+        return float(schema.get("minimum", 1))
+    if kind == "boolean":
+        return False
+    if schema.get("format") == "email":
+        return "plans@example.com"
+    if schema.get("format") == "date-time":
+        return datetime.now(timezone.utc).isoformat()
+    return "plans".ljust(schema.get("minLength", 0), "x")[:schema.get("maxLength", 100)]
+
+
+def requests_for(spec: dict, ids: dict) -> list[tuple]:
+    """(method, url, json body) for every mounted route, from the app's OpenAPI schema."""
+    defs = spec.get("components", {}).get("schemas", {})
+    out = []
+    for path, operations in spec["paths"].items():
+        for method, op in operations.items():
+            method = method.upper()
+            if (method, path) in SKIPPED:
+                continue
+            url, query = path, {}
+            for param in op.get("parameters", []):
+                value = example(param.get("schema", {}), defs, ids, param["name"])
+                if param["in"] == "path":
+                    url = url.replace(f"{{{param['name']}}}", str(value))
+                elif param["in"] == "query" and param.get("required"):
+                    query[param["name"]] = value
+            body = None
+            if path in BULK_MODELS:
+                model = BULK_MODELS[path].model_json_schema()
+                body = [example(model, model.get("$defs", {}), ids)]
+            elif "requestBody" in op:
+                body = example(op["requestBody"]["content"]["application/json"]["schema"], defs, ids)
+            out.append((method, f"{url}?{urlencode(query)}" if query else url, body))
+    for path in ROUTES.values():
+        # the load test's filters and search terms reach statements bare routes don't
+        out.append(("GET", path.format_map(ids), None))
+    return out
+
+
+async def collect(app_main) -> dict[str, tuple]:
+    """fingerprint -> (query, args, source) for everything the routes and registry issue."""
+    async with acquire() as conn:
+        ids = {name: await conn.fetchval(sql) or 1 for name, sql in SAMPLE_IDS.items()}
+    ids.update(SAMPLE_VALUES, assigned_by=ids["user_id"])
+    # nothing else may use the shared connection, and replicas would bypass it
+    await app_main.auto_assigner.stop()
+    await replica_set.stop()
+    pool = database._pool
+    metrics.start_capture()
+    async with acquire() as conn:
+        database._pool = _RollbackPool(conn)
+        transport = httpx.ASGITransport(app=app_main.app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://plans", timeout=60) as client:
+                for method, url, body in requests_for(app_main.app.openapi(), ids):
+                    tr = conn.transaction()
+                    await tr.start()
+                    try:
+                        with primary_reads():
+                            response = await client.request(method, url, json=body)
+                        if response.status_code >= 500:
+                            print(f"{method} {url}: {response.status_code}", file=sys.stderr)
+                    except Exception as e:
+                        print(f"{method} {url}: {type(e).__name__}: {e}", file=sys.stderr)
+                    finally:
+                        await tr.rollback()
+        finally:
+            database._pool = pool
+    found = {key: (query, args, "cursor" if cursor else "route")
+             for key, (query, args, cursor) in metrics.captured().items()}
+
+    for name, sql in registered().items():
+        key = metrics.fingerprint(sql)
+        # a registered statement with parameters is only explainable with arguments a route supplied
+        if key not in found and "$1" not in sql:
+            found[key] = (sql, (), f"registry:{name}")
+    for sql, args in FUNCTION_CALLS:
+        found.setdefault(metrics.fingerprint(sql), (sql, args, "function"))
+    return found
+
+
+def findings(node: dict, min_rows: int, out: list, nested: bool = False) -> list:
+    loops = node.get("Actual Loops", 1) or 1
+    kind = node["Node Type"]
+    if kind == "Seq Scan":
+        scanned = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * loops
+        if scanned >= min_rows:
+            out.append({"issue": "seq_scan", "relation": node.get("Relation Name"),
+                        "rows": scanned, "filter": node.get("Filter"), "nested": nested})
+    elif kind in ("Sort", "Incremental Sort"):
+        rows = node.get("Actual Rows", 0) * loops
+        if rows >= min_rows or node.get("Sort Space Type") == "Disk":
+            out.append({"issue": "sort", "rows": rows, "key": node.get("Sort Key"),
+                        "method": node.get("Sort Method"), "space": node.get("Sort Space Type"),
+                        "nested": nested})
+    for child in node.get("Plans", []):
+        findings(child, min_rows, out, nested)
+    return out
+
+
+async def explain(conn, query: str, args, min_rows: int, nested: bool) -> dict:
+    notices: list[str] = []
+    listener = lambda _conn, message: notices.append(message.message)
+    if nested:
+        conn.add_log_listener(listener)
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        raw = await conn.fetchval(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *args)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    finally:
+        await tr.rollback()
+        if nested:
+            conn.remove_log_listener(listener)
+
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    top = plan["Plan"]
+    result = {
+        "total_cost": top.get("Total Cost"),
+        "execution_ms": plan.get("Execution Time"),
+        "shared_hit": top.get("Shared Hit Blocks", 0),
+        "shared_read": top.get("Shared Read Blocks", 0),
+        "findings": findings(top, min_rows, []),
+    }
+    for message in notices:
+        # auto_explain notices: "duration: ... ms  plan:\n{json}"
+        body = message.split("plan:", 1)[-1].strip()
+        try:
+            inner = json.loads(body)
+        except ValueError:
+            continue
+        inner_plan = inner.get("Plan", inner)
+        if inner.get("Query Text", "").lstrip().upper().startswith("EXPLAIN"):
+            continue
+        findings(inner_plan, min_rows, result["findings"], nested=True)
+    return result
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    before = {s["fingerprint"]: s for s in baseline.get("statements", [])}
+    regressions = []
+    for s in current["statements"]:
+        old = before.get(s["fingerprint"])
+        if not old or not old.get("total_cost") or not s.get("total_cost"):
+            continue
+        change = s["total_cost"] / old["total_cost"] - 1
+        new_issues = len(s["findings"]) > len(old.get("findings", []))
+        if change > threshold or new_issues:
+            regressions.append(s["fingerprint"])
+            print(f"REGRESSION cost {old['total_cost']:.1f} -> {s['total_cost']:.1f} ({change:+.1%})"
+                  f"{' new findings' if new_issues else ''}: {s['fingerprint'][:120]}", file=sys.stderr)
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-rows", type=int, default=10000, help="scan/sort size worth flagging")
+    parser.add_argument("--nested", action="store_true", help="explain statements inside PL/pgSQL functions")
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare plan costs against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="cost increase counted as a regression")
+    parser.add_argument("--fail-on-findings", action="store_true", help="exit non-zero if anything is flagged")
+    args = parser.parse_args()
+
+    import main as app_main
+    await app_main.startup()
+    try:
+        statements = await collect(app_main)
+        report = []
+        async with acquire() as conn:
+            if args.nested:
+                for sql in AUTO_EXPLAIN:
+                    await conn.execute(sql)
+            for key, (query, qargs, source) in sorted(statements.items()):
+                if source == "cursor":
+                    # planned for fast start, as the export's cursor runs it, not as a plain SELECT
+                    query = f"DECLARE plans_cursor CURSOR FOR {query}"
+                result = await explain(conn, query, qargs, args.min_rows, args.nested)
+                report.append({"fingerprint": key, "source": source, **result})
+            if args.nested:
+                await conn.execute("RESET ALL")
+    finally:
+        await app_main.shutdown()
+
+    flagged = [s for s in report if s.get("findings")]
+    result = {
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "min_rows": args.min_rows,
+        "summary": {
+            "statements": len(report),
+            "flagged": len(flagged),
+            "errors": sum(1 for s in report if "error" in s),
+        },
+        "statements": report,
+    }
+    print(json.dumps(result, indent=2, default=str))
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2, default=str))
+
+    failed = bool(args.fail_on_findings and flagged)
+    if args.baseline and compare(result, json.loads(args.baseline.read_text()), args.threshold):
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,242 @@
+"""
+Loads synthetic volume into a local Postgres for benchmarking: users,
+officers, complaints with assignments, actions, evidence rows, feedback and audit rows,
+generated server-side with generate_series.
+
+    cd backend && python -m benchmarks.seed --reset-schema --complaints 1000000
+
+--reset-schema drops the public schema and reloads init.sql first; without it
+rows are added to what is there. By default rows are written with
+session_replication_role = replica, which skips triggers and FK checks for
+speed (needs a superuser), and the counters and rollups the triggers would
+have maintained are rebuilt afterwards. --with-triggers writes through every
+trigger instead, like the API does; both produce the same data. Prints row
+counts and timings as JSON on stdout, progress on stderr.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+import asyncpg
+import bcrypt
+from database import DATABASE_URL
+from security import BCRYPT_ROUNDS
+
+INIT_SQL = Path(__file__).resolve().parents[2] / "init.sql"
+CATEGORIES = ["Air Pollution", "Garbage Dumping", "Noise Pollution", "Water Leakage",
+              "Plastic Waste", "Deforestation", "Illegal Construction", "Garbage Issue"]
+CITIES = ["Indore", "Pune", "Gurugram", "Navi Mumbai", "Mumbai", "Chandigarh", "Bhopal", "Jaipur"]
+DEPARTMENTS = ["Pollution Control", "Waste Management", "Water Resources", "Public Health", "Noise Regulation"]
+# every synthetic user can log in with this password
+PASSWORD = "bench-password"
+
+USERS_SQL = """
+WITH ins AS (
+    INSERT INTO Users (name, email, phone, role, password_hash, created_at)
+    SELECT 'Bench ' || $2::text || ' ' || g, $2::text || '-' || g || '-' || $4::text || '@bench.example.com',
+           '9' || lpad((g % 1000000000)::text, 9, '0'), $2::text, $3::text,
+           now() - random() * interval '730 days' + g * interval '0'
+    FROM generate_series(1, $1) g
+    RETURNING user_id
+)
+SELECT min(user_id) AS lo, max(user_id) AS hi FROM ins
+"""
+
+OFFICERS_SQL = """
+WITH ins AS (
+    INSERT INTO Officers (user_id, department, designation)
+    SELECT $1 + g - 1, ($3::text[])[1 + g % cardinality($3::text[])],
+           (ARRAY['Inspector', 'Field Officer', 'Supervisor'])[1 + g % 3]
+    FROM generate_series(1, $2) g
+    RETURNING officer_id
+)
+SELECT min(officer_id) AS lo, max(officer_id) AS hi FROM ins
+"""
+
+# `+ g * 0` keeps each random() per row; an uncorrelated LATERAL is evaluated only once
+COMPLAINTS_SQL = """
+WITH ins AS (
+    INSERT INTO Complaints (user_id, category, description, location, status,
+                            submitted_at, resolved_at, last_updated_at, current_officer_id)
+    SELECT $1::int + floor(random() * ($2::int - $1::int + 1))::int,
+           x.category,
+           'Synthetic report ' || x.g || ': ' || lower(x.category) || ' near ' || x.city,
+           'Sector ' || (1 + x.g % 40) || ', ' || x.city,
+           x.status,
+           x.submitted_at,
+           CASE WHEN x.status IN ('Resolved', 'Closed') THEN x.submitted_at + random() * interval '14 days' END,
+           x.submitted_at,
+           CASE WHEN x.status <> 'Pending' THEN $3::int + floor(random() * ($4::int - $3::int + 1))::int END
+    FROM (
+        SELECT g,
+               ($6::text[])[1 + floor(random() * cardinality($6::text[]) + g * 0)::int] AS category,
+               ($7::text[])[1 + floor(random() * cardinality($7::text[]) + g * 0)::int] AS city,
+               CASE WHEN r < 0.25 THEN 'Pending'
+                    WHEN r < 0.50 THEN 'In Progress'
+                    WHEN r < 0.75 THEN 'Resolved'
+                    WHEN r < 0.95 THEN 'Closed'
+                    ELSE 'Rejected' END AS status,
+               now() - random() * make_interval(days => $8) + g * interval '0' AS submitted_at
+        FROM (SELECT g, random() + g * 0 AS r FROM generate_series(1, $5) g) s
+    ) x
+    RETURNING complaint_id
+)
+SELECT min(complaint_id) AS lo, max(complaint_id) AS hi FROM ins
+"""
+
+ASSIGNMENTS_SQL = """
+INSERT INTO ComplaintAssignments (complaint_id, officer_id, assigned_by, assigned_at)
+SELECT complaint_id, current_officer_id, NULL, submitted_at + interval '2 hours'
+FROM Complaints
+WHERE complaint_id BETWEEN $1 AND $2 AND current_officer_id IS NOT NULL
+"""
+
+# $4 false holds back is_final: inserting a final action fires trg_set_complaint_resolved,
+# which would reset resolved_at to now() and turn Closed complaints back into Resolved
+ACTIONS_SQL = """
+INSERT INTO ComplaintActions (complaint_id, officer_id, action_taken, is_final, action_date)
+SELECT c.complaint_id, c.current_officer_id,
+       CASE WHEN a = $3 AND c.resolved_at IS NOT NULL THEN 'Resolved on site' ELSE 'Site inspection ' || a END,
+       a = $3 AND c.resolved_at IS NOT NULL AND $4,
+       COALESCE(c.resolved_at, now()) - ($3 - a) * interval '1 hour'
+FROM Complaints c
+CROSS JOIN generate_series(1, $3) a
+WHERE c.complaint_id BETWEEN $1 AND $2 AND c.current_officer_id IS NOT NULL
+"""
+
+# the trigger only fires on INSERT, so flagging afterwards keeps the synthetic resolutions
+FINAL_ACTIONS_SQL = """
+UPDATE ComplaintActions SET is_final = TRUE
+WHERE complaint_id BETWEEN $1 AND $2 AND action_taken = 'Resolved on site'
+"""
+
+FEEDBACK_SQL = """
+INSERT INTO Feedback (complaint_id, user_id, rating, comments, submitted_at)
+SELECT complaint_id, user_id, 1 + floor(random() * 5)::int, 'Synthetic feedback', resolved_at + interval '1 day'
+FROM Complaints
+WHERE complaint_id BETWEEN $1 AND $2 AND status = 'Closed'
+"""
+
+# rows only: the files aren't in the evidence store, so content and thumbnail routes 404
+EVIDENCE_SQL = """
+INSERT INTO ComplaintEvidence (complaint_id, file_path, mime_type, size_bytes, uploaded_at)
+SELECT complaint_id, 'bench/' || complaint_id || '-' || e || '.jpg', 'image/jpeg',
+       50000 + floor(random() * 2000000)::int, submitted_at + e * interval '1 minute'
+FROM Complaints
+CROSS JOIN generate_series(1, $3) e
+WHERE complaint_id BETWEEN $1 AND $2
+"""
+
+AUDIT_SQL = """
+INSERT INTO AuditLog (table_name, operation, primary_key, changed_by, changed_at, row_data)
+SELECT 'complaints', 'U', to_jsonb($1::int + floor(random() * ($2::int - $1::int + 1))::int), NULL,
+       now() - random() * make_interval(days => $4) + g * interval '0',
+       jsonb_build_object('old', jsonb_build_object('status', 'Pending'),
+                          'new', jsonb_build_object('status', 'In Progress'))
+FROM generate_series(1, $3) g
+"""
+
+REBUILD_SQL = [
+    "SELECT rebuild_complaint_stats()",
+    "SELECT rebuild_officer_load()",
+    "SELECT rebuild_complaint_rollups()",
+]
+
+
+async def timed(results: dict, name: str, coro):
+    start = time.perf_counter()
+    value = await coro
+    results.setdefault("seconds", {})[name] = round(time.perf_counter() - start, 3)
+    return value
+
+
+async def seed(conn, args) -> dict:
+    results = {"rows": {}}
+    rows = results["rows"]
+    tag = str(int(time.time()))
+    password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+
+    if args.reset_schema:
+        async def reset():
+            await conn.execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public;")
+            await conn.execute(INIT_SQL.read_text())
+        await timed(results, "schema", reset())
+
+    if not args.with_triggers:
+        await conn.execute("SET session_replication_role = replica")
+
+    citizens = await timed(results, "users", conn.fetchrow(USERS_SQL, args.users, "citizen", password_hash, tag))
+    officer_users = await conn.fetchrow(USERS_SQL, args.officers, "officer", password_hash, tag)
+    officers = await timed(results, "officers", conn.fetchrow(OFFICERS_SQL, officer_users["lo"], args.officers, DEPARTMENTS))
+    rows["users"] = args.users + args.officers
+    rows["officers"] = args.officers
+
+    complaint_lo, complaint_hi = None, None
+    start = time.perf_counter()
+    done = 0
+    while done < args.complaints:
+        n = min(args.batch, args.complaints - done)
+        r = await conn.fetchrow(COMPLAINTS_SQL, citizens["lo"], citizens["hi"], officers["lo"], officers["hi"],
+                                n, CATEGORIES, CITIES, args.days)
+        complaint_lo = r["lo"] if complaint_lo is None else complaint_lo
+        complaint_hi = r["hi"]
+        # assignments and actions per batch keep each statement's working set bounded
+        await conn.execute(ASSIGNMENTS_SQL, r["lo"], r["hi"])
+        if args.actions_per_complaint:
+            await conn.execute(ACTIONS_SQL, r["lo"], r["hi"], args.actions_per_complaint, not args.with_triggers)
+            if args.with_triggers:
+                await conn.execute(FINAL_ACTIONS_SQL, r["lo"], r["hi"])
+        await conn.execute(FEEDBACK_SQL, r["lo"], r["hi"])
+        if args.evidence_per_complaint:
+            await conn.execute(EVIDENCE_SQL, r["lo"], r["hi"], args.evidence_per_complaint)
+        done += n
+        print(f"complaints: {done}/{args.complaints}", file=sys.stderr, flush=True)
+    results["seconds"]["complaints"] = round(time.perf_counter() - start, 3)
+    rows["complaints"] = args.complaints
+
+    if args.audit and complaint_lo is not None:
+        start = time.perf_counter()
+        for i in range(0, args.audit, args.batch):
+            await conn.execute(AUDIT_SQL, complaint_lo, complaint_hi, min(args.batch, args.audit - i), args.days)
+        results["seconds"]["audit"] = round(time.perf_counter() - start, 3)
+    rows["audit_extra"] = args.audit
+
+    if not args.with_triggers:
+        await conn.execute("RESET session_replication_role")
+        start = time.perf_counter()
+        for sql in REBUILD_SQL:
+            await conn.execute(sql)
+        results["seconds"]["rebuild"] = round(time.perf_counter() - start, 3)
+
+    await timed(results, "analyze", conn.execute("ANALYZE"))
+    for table in ("users", "complaints", "complaintassignments", "complaintactions", "complaintevidence",
+                  "feedback", "auditlog"):
+        rows[f"total_{table}"] = await conn.fetchval(f"SELECT count(*) FROM {table}")
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reset-schema", action="store_true", help="drop the public schema and reload init.sql")
+    parser.add_argument("--with-triggers", action="store_true", help="write through triggers and FK checks")
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--officers", type=int, default=200)
+    parser.add_argument("--complaints", type=int, default=100000)
+    parser.add_argument("--actions-per-complaint", type=int, default=2)
+    parser.add_argument("--evidence-per-complaint", type=int, default=1)
+    parser.add_argument("--audit", type=int, default=0, help="extra synthetic audit rows")
+    parser.add_argument("--days", type=int, default=365, help="spread submissions over this many days")
+    parser.add_argument("--batch", type=int, default=100000, help="complaints per INSERT")
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        print(json.dumps(await seed(conn, args), indent=2))
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
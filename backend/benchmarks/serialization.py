@@ -0,0 +1,71 @@
+"""
+Rows/second for serving a ComplaintSummary page: the dict + Pydantic +
+jsonable_encoder path the routes used before, against the fast path where
+Postgres renders each row as JSON text (pagination.fetch_json_page).
+
+    cd backend && python -m benchmarks.serialization --limit 500 --rounds 50
+
+Needs DATABASE_URL pointing at a database with at least --limit complaints;
+both paths read the same first page of complaintsummary.
+"""
+import argparse
+import asyncio
+import json
+import time
+from fastapi.encoders import jsonable_encoder
+from database import init_db_pool, close_db_pool, fetch
+from pagination import page_query, fetch_json_page
+from schemas import ComplaintSummaryOut
+
+KEYS = ("submitted_at", "complaint_id")
+
+
+async def dict_path(query, args):
+    rows = await fetch(query, *args)
+    rows = [dict(row) for row in rows]  # the second copy views.py used to make
+    validated = [ComplaintSummaryOut.model_validate(row) for row in rows]
+    body = json.dumps(jsonable_encoder(validated)).encode()
+    return len(rows), len(body)
+
+
+async def fast_path(query, args, limit):
+    body, _ = await fetch_json_page(query, args, KEYS, limit)
+    return body.count(b'"complaint_id"'), len(body)
+
+
+async def measure(fn, rounds):
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        n, _ = await fn()
+        rows += n
+    elapsed = time.perf_counter() - start
+    return {"rows": rows, "seconds": round(elapsed, 3), "rows_per_second": round(rows / elapsed, 1)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    await init_db_pool()
+    try:
+        q, qargs = page_query("SELECT * FROM complaintsummary", KEYS, None, args.limit)
+        # warm both paths once so statement preparation isn't measured
+        await dict_path(q, qargs)
+        await fast_path(q, qargs, args.limit)
+        results = {
+            "dict_pydantic": await measure(lambda: dict_path(q, qargs), args.rounds),
+            "postgres_json": await measure(lambda: fast_path(q, qargs, args.limit), args.rounds),
+        }
+        results["speedup"] = round(
+            results["postgres_json"]["rows_per_second"] / results["dict_pydantic"]["rows_per_second"], 2
+        )
+        print(json.dumps(results, indent=2))
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
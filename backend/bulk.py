@@ -0,0 +1,136 @@
+# app/bulk.py
+import json
+import os
+import asyncpg
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from database import fetch, fetchrow
+
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", 10000))
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+# failures caused by one row's values (too long, NULL, CHECK, a trigger's RAISE)
+ROW_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError, asyncpg.RaiseError)
+
+
+async def read_items(request: Request, model: type[BaseModel]):
+    """
+    Parses a JSON array or an NDJSON body into `model` instances.
+    Returns (valid, errors) where valid is [(index, item)] and errors are
+    per-row result dicts, so one bad row doesn't reject the whole batch.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    raw_items = []
+    if content_type in NDJSON_TYPES:
+        buf = b""
+        async for chunk in request.stream():
+            buf += chunk
+            *lines, buf = buf.split(b"\n")
+            raw_items.extend(line for line in lines if line.strip())
+            if len(raw_items) > BULK_MAX_ROWS:
+                break
+        if buf.strip():
+            raw_items.append(buf)
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        raw_items = body
+
+    if len(raw_items) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ROWS} rows per request")
+
+    valid, errors = [], []
+    for i, raw in enumerate(raw_items):
+        try:
+            item = json.loads(raw) if isinstance(raw, bytes) else raw
+            valid.append((i, model.model_validate(item)))
+        except ValueError as e:  # ValidationError and JSONDecodeError are both ValueErrors
+            if isinstance(e, ValidationError):
+                msg = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            else:
+                msg = str(e)
+            errors.append({"index": i, "ok": False, "error": msg})
+    return valid, errors
+
+
+async def _missing_refs(conn, valid, field: str, table: str, column: str) -> set:
+    """
+    Ids in `field` that don't exist in `table`. Existing rows are locked with
+    FOR KEY SHARE so they can't be deleted before the insert runs.
+    """
+    ids = list({getattr(item, field) for _, item in valid if getattr(item, field) is not None})
+    if not ids:
+        return set()
+    rows = await fetch(
+        f"SELECT {column} FROM {table} WHERE {column} = ANY($1::int[]) FOR KEY SHARE", ids, conn=conn
+    )
+    return set(ids) - {r[column] for r in rows}
+
+
+async def _insert_each(conn, q: str, names: list[str], valid) -> list[dict]:
+    """Fallback for a batch with a bad row: one savepoint per row, so each failure is reported."""
+    results = []
+    for i, item in valid:
+        try:
+            async with conn.transaction():
+                row = await fetchrow(q, *[[getattr(item, name)] for name in names], conn=conn)
+            results.append({"index": i, "ok": True, "row": row})
+        except ROW_ERRORS as e:
+            results.append({"index": i, "ok": False, "error": str(e)})
+    return results
+
+
+async def bulk_insert(conn, table: str, columns: dict[str, str], valid, errors,
+                      references: dict[str, tuple[str, str]], returning: str):
+    """
+    Inserts the valid items with a single INSERT ... SELECT FROM unnest(...)
+    statement on `conn`, which should be inside a transaction (see
+    database.transaction): one pool checkout and one round trip for the whole
+    batch. Rows pointing at missing parents are reported per row instead of
+    failing the batch. If any other row is rejected (a value too long, a CHECK
+    or NOT NULL violation), the batch is rolled back to a savepoint and
+    retried row by row, so every failure is reported against its row.
+
+    `columns` maps column name -> Postgres type, `references` maps a field to
+    the (table, column) it must exist in.
+    """
+    results = list(errors)
+    for field, (ref_table, ref_column) in references.items():
+        missing = await _missing_refs(conn, valid, field, ref_table, ref_column)
+        if not missing:
+            continue
+        kept = []
+        for i, item in valid:
+            if getattr(item, field) in missing:
+                results.append({"index": i, "ok": False,
+                                "error": f"{field} {getattr(item, field)} not found"})
+            else:
+                kept.append((i, item))
+        valid = kept
+
+    if valid:
+        names = list(columns)
+        arrays = [[getattr(item, name) for _, item in valid] for name in names]
+        params = ", ".join(f"${n + 1}::{columns[name]}[]" for n, name in enumerate(names))
+        q = f"""
+        INSERT INTO {table} ({", ".join(names)})
+        SELECT {", ".join(names)}
+        FROM unnest({params}) WITH ORDINALITY AS u({", ".join(names)}, ord)
+        ORDER BY ord
+        RETURNING {returning}
+        """
+        try:
+            async with conn.transaction():  # a savepoint inside the caller's transaction
+                rows = await fetch(q, *arrays, conn=conn)
+        except ROW_ERRORS:
+            results += await _insert_each(conn, q, names, valid)
+        else:
+            for (i, _), row in zip(valid, rows):
+                results.append({"index": i, "ok": True, "row": row})
+
+    results.sort(key=lambda r: r["index"])
+    inserted = sum(1 for r in results if r["ok"])
+    return {"inserted": inserted, "failed": len(results) - inserted, "results": results}
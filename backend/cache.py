@@ -0,0 +1,192 @@
+# app/cache.py
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from fastapi import Request, Response
+from database import fetch, fetchrow, primary_reads, READ_YOUR_WRITES_SECONDS
+from pagination import NEXT_CURSOR_HEADER
+
+CACHE_TTL = float(os.getenv("CACHE_TTL", 30))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+
+
+class CacheEntry:
+    __slots__ = ("value", "etag", "tags", "expires_at")
+
+    def __init__(self, value, etag: str, tags, expires_at: float):
+        self.value = value
+        self.etag = etag
+        self.tags = tags
+        self.expires_at = expires_at
+
+
+class QueryCache:
+    """
+    LRU of query results with a per-entry TTL. Entries are tagged with the
+    tables they read so writes can drop exactly the results they affect.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, CacheEntry] = OrderedDict()
+        self._tags: dict[str, set[tuple]] = {}
+        # bumped on every invalidation so results read before a write aren't stored after it
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+        # when each tag was last invalidated, for routing fresh fills to the primary
+        self._changed_at: dict[str, float] = {}
+        self._cleared_at = float("-inf")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def generation(self, tags) -> tuple:
+        return (self._epoch,) + tuple(self._generations.get(t, 0) for t in tags)
+
+    def set(self, key, value, tags=(), ttl: float | None = None, generation: tuple | None = None) -> CacheEntry:
+        entry = CacheEntry(value, make_etag(value), tuple(tags),
+                           time.monotonic() + (self.ttl if ttl is None else ttl))
+        if generation is not None and generation != self.generation(tags):
+            # a write landed while this result was being read; serve it once, don't keep it
+            return entry
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, *tags: str) -> int:
+        removed = 0
+        now = time.monotonic()
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            self._changed_at[tag] = now
+            for key in self._tags.pop(tag, set()):
+                if key in self._entries:
+                    self._remove(key)
+                    removed += 1
+        self.invalidations += removed
+        return removed
+
+    def changed_within(self, tags, seconds: float) -> bool:
+        """Whether any of `tags` was invalidated (or the cache cleared) in the last `seconds`."""
+        since = time.monotonic() - seconds
+        return self._cleared_at > since or any(self._changed_at.get(t, float("-inf")) > since for t in tags)
+
+    def clear(self):
+        self._epoch += 1
+        self._cleared_at = time.monotonic()
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def make_etag(value) -> str:
+    if isinstance(value, tuple) and value and isinstance(value[0], bytes):
+        raw = b"\0".join(v if isinstance(v, bytes) else str(v).encode() for v in value)
+    else:
+        raw = json.dumps(value, default=str, sort_keys=True, separators=(",", ":")).encode()
+    return '"' + hashlib.blake2b(raw, digest_size=12).hexdigest() + '"'
+
+
+query_cache = QueryCache()
+
+
+async def cached_call(key, loader, tags=(), ttl: float | None = None) -> CacheEntry:
+    """
+    Returns the cached entry for `key`, filling it from `await loader()` on a miss.
+    Fills for tables written in the last READ_YOUR_WRITES_SECONDS read from the
+    primary, so a lagging replica's rows aren't cached for a whole TTL.
+    """
+    entry = query_cache.get(key)
+    if entry is None:
+        generation = query_cache.generation(tags)
+        with primary_reads(query_cache.changed_within(tags, READ_YOUR_WRITES_SECONDS)):
+            value = await loader()
+        entry = query_cache.set(key, value, tags, ttl, generation)
+    return entry
+
+
+async def cached_fetch(query: str, *args, tags=(), ttl: float | None = None) -> CacheEntry:
+    return await cached_call(("fetch", query, args), lambda: fetch(query, *args, shared=True, replica=True), tags, ttl)
+
+
+async def cached_fetchrow(query: str, *args, tags=(), ttl: float | None = None) -> CacheEntry:
+    return await cached_call(("fetchrow", query, args), lambda: fetchrow(query, *args, shared=True, replica=True), tags, ttl)
+
+
+def invalidate(*tags: str) -> int:
+    """Drops every cached result that read one of the given tables."""
+    return query_cache.invalidate(*tags)
+
+
+def on_table_change(event: dict):
+    """Handler for the `table_changes` NOTIFY channel fired by trg_notify_* triggers."""
+    table = event.get("table")
+    if table:
+        query_cache.invalidate(table)
+
+
+def check_etag(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Sets the ETag header and returns a 304 response when the client already
+    holds this version, otherwise None.
+    """
+    response.headers["ETag"] = etag
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+
+def json_page_response(request: Request, entry: CacheEntry) -> Response:
+    """Response for a cached (body, next cursor) pair from pagination.fetch_json_page."""
+    not_modified = check_etag(request, Response(), entry.etag)
+    if not_modified:
+        return not_modified
+    body, next_cursor = entry.value
+    headers = {"ETag": entry.etag}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return Response(content=body, media_type="application/json", headers=headers)
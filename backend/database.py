@@ -1,23 +1,377 @@
+import asyncio
 import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from urllib.parse import urlsplit
 import asyncpg
 from dotenv import load_dotenv
+from statements import registered
+from metrics import observe_acquire, observe_query
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# pool settings, all overridable from the environment
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 1))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_ACQUIRE_TIMEOUT = float(os.getenv("DB_ACQUIRE_TIMEOUT", 10))
+DB_COMMAND_TIMEOUT = float(os.getenv("DB_COMMAND_TIMEOUT", 0)) or None
+DB_MAX_INACTIVE_CONNECTION_LIFETIME = float(os.getenv("DB_MAX_INACTIVE_CONNECTION_LIFETIME", 300))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+DB_MAX_CACHED_STATEMENT_LIFETIME = int(os.getenv("DB_MAX_CACHED_STATEMENT_LIFETIME", 300))
+
+# comma-separated read replica DSNs; empty sends every read to the primary
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+DB_REPLICA_POOL_MAX_SIZE = int(os.getenv("DB_REPLICA_POOL_MAX_SIZE", DB_POOL_MAX_SIZE))
+# replicas further behind than this leave the rotation until they catch up
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+REPLICA_CHECK_INTERVAL = float(os.getenv("REPLICA_CHECK_INTERVAL", 5))
+REPLICA_CHECK_TIMEOUT = float(os.getenv("REPLICA_CHECK_TIMEOUT", 2))
+# after a write a session reads from the primary this long; keep it above REPLICA_MAX_LAG_SECONDS
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 10))
+
 _pool: asyncpg.pool.Pool | None = None
 
 
+class PoolTimeoutError(RuntimeError):
+    """No pooled connection became free within DB_ACQUIRE_TIMEOUT."""
+
+
+class PoolStats:
+    """Counters for how long requests wait to check out a connection."""
+
+    def __init__(self, get_pool=lambda: _pool):
+        self._get_pool = get_pool
+        self.acquires = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        self.acquires += 1
+        self.wait_total += seconds
+        if seconds > self.wait_max:
+            self.wait_max = seconds
+
+    def snapshot(self) -> dict:
+        stats = {
+            "acquires": self.acquires,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.acquires * 1000, 3) if self.acquires else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "acquire_timeout_s": DB_ACQUIRE_TIMEOUT,
+        }
+        pool = self._get_pool()
+        if pool is not None:
+            stats.update(
+                size=pool.get_size(),
+                idle=pool.get_idle_size(),
+                in_use=pool.get_size() - pool.get_idle_size(),
+                min_size=pool.get_min_size(),
+                max_size=pool.get_max_size(),
+            )
+        return stats
+
+
+pool_stats = PoolStats()
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical reads: the first caller for a key starts the
+    query, callers arriving while it is in flight await the same result.
+    """
+
+    def __init__(self):
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.leaders = 0
+        self.collapsed = 0
+
+    async def do(self, key: tuple, fn):
+        try:
+            task = self._inflight.get(key)
+        except TypeError:
+            # unhashable arguments (lists, dicts) can't be keyed; run uncoalesced
+            return await fn()
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.collapsed += 1
+        # shielded so one caller disconnecting doesn't cancel the query for the others
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved even if every waiter went away
+
+    def snapshot(self) -> dict:
+        return {"leaders": self.leaders, "collapsed": self.collapsed, "in_flight": len(self._inflight)}
+
+
+single_flight = SingleFlight()
+
+
+# connection-level failures that take a replica out of rotation
+REPLICA_ERRORS = (OSError, asyncio.TimeoutError, asyncpg.PostgresConnectionError,
+                  asyncpg.CannotConnectNowError, asyncpg.InterfaceError)
+
+PRIMARY_LSN_SQL = "SELECT pg_current_wal_lsn()::text"
+# bytes of primary WAL not yet replayed, and how old the last replayed commit is;
+# both are 0 on a server that isn't a standby, and NULL on a standby when unknown
+# (no primary position given, or nothing replayed yet)
+REPLICA_LAG_SQL = """
+SELECT CASE WHEN pg_is_in_recovery()
+            THEN pg_wal_lsn_diff($1::text::pg_lsn, pg_last_wal_replay_lsn()) ELSE 0 END::bigint AS behind_bytes,
+       CASE WHEN pg_is_in_recovery()
+            THEN extract(epoch FROM now() - pg_last_xact_replay_timestamp()) ELSE 0 END::float8 AS replay_age
+"""
+
+# True while the current request or cache fill must read from the primary
+_pinned: ContextVar[bool] = ContextVar("db_pinned_to_primary", default=False)
+
+
+@contextmanager
+def primary_reads(enabled: bool = True):
+    """Routes `replica=True` reads inside the block to the primary."""
+    token = _pinned.set(_pinned.get() or enabled)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def _replica_name(dsn: str, index: int) -> str:
+    # host:port/db, never the credentials
+    try:
+        u = urlsplit(dsn)
+        if u.hostname:
+            return f"{u.hostname}:{u.port or 5432}{u.path}"
+    except ValueError:
+        pass
+    return f"replica{index}"
+
+
+class Replica:
+    def __init__(self, dsn: str, name: str):
+        self.dsn = dsn
+        self.name = name
+        self.pool: asyncpg.pool.Pool | None = None
+        self.stats = PoolStats(lambda: self.pool)
+        self.healthy = False
+        self.lag: float | None = None
+        self.behind_bytes: int | None = None
+        self.error: str | None = None
+        self.checked_at: float | None = None
+        self.reads = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "healthy": self.healthy,
+            "lag_s": None if self.lag is None else round(self.lag, 3),
+            "behind_bytes": self.behind_bytes,
+            "error": self.error,
+            "checked_at": self.checked_at,
+            "reads": self.reads,
+            "pool": self.stats.snapshot(),
+        }
+
+
+class ReplicaSet:
+    """
+    Read replicas from DATABASE_REPLICA_URLS, one pool each. A background check
+    compares each replica's replay position with the primary's WAL every
+    REPLICA_CHECK_INTERVAL seconds; replicas that don't answer or lag more
+    than REPLICA_MAX_LAG_SECONDS get no reads until a later check passes.
+    """
+
+    def __init__(self, dsns: list[str]):
+        self.replicas = [Replica(dsn, _replica_name(dsn, i)) for i, dsn in enumerate(dsns)]
+        self._next = 0
+        self._task: asyncio.Task | None = None
+        # replica reads served by the primary: none in rotation, saturated pool, failed query
+        self.fallbacks = 0
+        # replica reads sent to the primary for read-your-writes
+        self.pinned_reads = 0
+
+    def pick(self) -> Replica | None:
+        """Next replica in rotation, or None to read from the primary."""
+        if not self.replicas:
+            return None
+        if _pinned.get():
+            self.pinned_reads += 1
+            return None
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            self.fallbacks += 1
+            return None
+        self._next = (self._next + 1) % len(healthy)
+        replica = healthy[self._next]
+        replica.reads += 1
+        return replica
+
+    def failed(self, replica: Replica, error: Exception):
+        """Takes `replica` out of rotation after a connection failure; the next check may restore it."""
+        self.fallbacks += 1
+        self._set(replica, False, f"{type(error).__name__}: {error}")
+
+    def _set(self, replica: Replica, healthy: bool, error: str | None):
+        if replica.healthy and not healthy:
+            print(f"❌ Replica {replica.name} out of rotation:", error)
+        elif healthy and not replica.healthy:
+            print(f"Replica {replica.name} in rotation")
+        replica.healthy = healthy
+        replica.error = error
+
+    async def start(self):
+        if self.replicas and self._task is None:
+            await self.check()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for replica in self.replicas:
+            if replica.pool is not None:
+                await replica.pool.close()
+                replica.pool = None
+            replica.healthy = False
+
+    async def check(self):
+        try:
+            primary_lsn = await asyncio.wait_for(get_pool().fetchval(PRIMARY_LSN_SQL), REPLICA_CHECK_TIMEOUT)
+        except Exception as e:
+            # without it replicas are judged on the age of their last replayed commit alone
+            print("❌ Could not read primary WAL position:", e)
+            primary_lsn = None
+        await asyncio.gather(*(self._check(r, primary_lsn) for r in self.replicas))
+
+    async def _check(self, replica: Replica, primary_lsn: str | None):
+        try:
+            if replica.pool is None:
+                replica.pool = await asyncio.wait_for(
+                    _create_pool(replica.dsn, DB_REPLICA_POOL_MAX_SIZE, timeout=REPLICA_CHECK_TIMEOUT),
+                    REPLICA_CHECK_TIMEOUT * 2,
+                )
+            row = await asyncio.wait_for(replica.pool.fetchrow(REPLICA_LAG_SQL, primary_lsn), REPLICA_CHECK_TIMEOUT)
+        except Exception as e:
+            self._set(replica, False, f"{type(e).__name__}: {e}")
+            return
+        finally:
+            replica.checked_at = time.time()
+        behind = row["behind_bytes"]
+        replica.behind_bytes = None if behind is None else max(behind, 0)
+        # a replica that has replayed everything is current however old its last commit is;
+        # with the position unknown, an idle primary looks like lag, which errs towards the primary
+        replica.lag = 0.0 if replica.behind_bytes == 0 else row["replay_age"]
+        healthy = replica.lag is not None and replica.lag <= REPLICA_MAX_LAG_SECONDS
+        if healthy:
+            self._set(replica, True, None)
+        else:
+            self._set(replica, False, "replication lag unknown" if replica.lag is None
+                      else f"replication lag {replica.lag:.1f}s")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(REPLICA_CHECK_INTERVAL)
+            try:
+                await self.check()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print("❌ Replica health check failed:", e)
+
+    def snapshot(self) -> dict:
+        return {
+            "configured": len(self.replicas),
+            "healthy": sum(1 for r in self.replicas if r.healthy),
+            "fallbacks": self.fallbacks,
+            "pinned_reads": self.pinned_reads,
+            "max_lag_s": REPLICA_MAX_LAG_SECONDS,
+            "replicas": [r.snapshot() for r in self.replicas],
+        }
+
+
+replica_set = ReplicaSet(DATABASE_REPLICA_URLS)
+
+STICKY_COOKIE = "db_primary"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware for read-your-writes. A successful non-GET request
+    sets a cookie that pins the session's reads to the primary for
+    READ_YOUR_WRITES_SECONDS, so a client sees its own changes while the
+    replicas catch up. Does nothing without replicas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cookie = (f"{STICKY_COOKIE}=1; Max-Age={READ_YOUR_WRITES_SECONDS}; "
+                       f"Path=/; HttpOnly; SameSite=Lax").encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not replica_set.replicas:
+            return await self.app(scope, receive, send)
+
+        write = scope["method"] not in SAFE_METHODS
+
+        async def send_wrapper(message):
+            if write and message["type"] == "http.response.start" and message["status"] < 400:
+                message["headers"] = [*message.get("headers", ()), (b"set-cookie", self.cookie)]
+            await send(message)
+
+        with primary_reads(write or _has_sticky_cookie(scope)):
+            await self.app(scope, receive, send_wrapper if READ_YOUR_WRITES_SECONDS > 0 else send)
+
+
+def _has_sticky_cookie(scope) -> bool:
+    for name, value in scope.get("headers", ()):
+        if name == b"cookie":
+            return any(part.strip().startswith(f"{STICKY_COOKIE}=") for part in value.decode("latin-1").split(";"))
+    return False
+
+
+async def _prepare_statements(conn: asyncpg.Connection):
+    # pool `init` hook: runs once per new connection. Statements go into the
+    # connection's statement cache, which fetch()/execute() look up by SQL text.
+    # PreparedStatement objects from conn.prepare() can't be kept instead:
+    # asyncpg refuses them once the connection has been back in the pool.
+    for name, sql in registered().items():
+        try:
+            await conn._prepare(sql, use_cache=True)
+        except asyncpg.PostgresError as e:
+            print(f"❌ Could not prepare statement '{name}':", e)
+
+
+def _create_pool(dsn: str, max_size: int, **connect_kwargs):
+    return asyncpg.create_pool(
+        dsn=dsn,
+        min_size=min(DB_POOL_MIN_SIZE, max_size),
+        max_size=max_size,
+        command_timeout=DB_COMMAND_TIMEOUT,
+        max_inactive_connection_lifetime=DB_MAX_INACTIVE_CONNECTION_LIFETIME,
+        statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+        max_cached_statement_lifetime=DB_MAX_CACHED_STATEMENT_LIFETIME,
+        init=_prepare_statements,
+        **connect_kwargs,
+    )
+
+
 async def init_db_pool():
     global _pool
     if _pool is None:
         try:
-            _pool = await asyncpg.create_pool(
-                dsn=DATABASE_URL,
-                min_size=1,
-                max_size=10,
-            )
+            _pool = await _create_pool(DATABASE_URL, DB_POOL_MAX_SIZE)
             # test connection
             async with _pool.acquire() as conn:
                 await conn.fetchval("SELECT 1")
@@ -25,10 +379,12 @@ async def init_db_pool():
         except Exception as e:
             print("❌ Database connection failed:", e)
             raise
+        await replica_set.start()
 
 
 async def close_db_pool():
     global _pool
+    await replica_set.stop()
     if _pool:
         await _pool.close()
         _pool = None
@@ -40,22 +396,155 @@ def get_pool() -> asyncpg.pool.Pool:
     return _pool
 
 
-# helper functions
-async def fetch(query: str, *args):
-    pool = get_pool()
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(query, *args)
-        return [dict(r) for r in rows]
+async def _checkout(pool: asyncpg.pool.Pool, stats: PoolStats):
+    start = time.perf_counter()
+    try:
+        conn = await pool.acquire(timeout=DB_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        stats.timeouts += 1
+        raise PoolTimeoutError(f"No database connection available within {DB_ACQUIRE_TIMEOUT}s")
+    waited = time.perf_counter() - start
+    stats.record_wait(waited)
+    observe_acquire(waited)
+    return conn
 
 
-async def fetchrow(query: str, *args):
+@asynccontextmanager
+async def acquire(conn=None, replica: "Replica | None" = None):
+    """
+    Checks out a pooled connection, timing the wait. When `conn` is given
+    (a request-scoped connection) it is used as-is and not released here.
+    With `replica` the connection comes from that replica's pool, or from the
+    primary if the replica can't hand one out.
+    """
+    if conn is not None:
+        yield conn
+        return
     pool = get_pool()
-    async with pool.acquire() as conn:
-        row = await conn.fetchrow(query, *args)
-        return dict(row) if row else None
+    if replica is not None:
+        try:
+            conn = await _checkout(replica.pool, replica.stats)
+            pool = replica.pool
+        except PoolTimeoutError:
+            # a saturated replica is healthy; the primary just takes the overflow
+            replica_set.fallbacks += 1
+        except REPLICA_ERRORS as e:
+            replica_set.failed(replica, e)
+    if conn is None:
+        conn = await _checkout(pool, pool_stats)
+    try:
+        yield conn
+    finally:
+        await pool.release(conn)
 
 
-async def execute(query: str, *args):
-    pool = get_pool()
-    async with pool.acquire() as conn:
-        return await conn.execute(query, *args)
+@asynccontextmanager
+async def transaction():
+    async with acquire() as conn:
+        async with conn.transaction():
+            yield conn
+
+
+# FastAPI dependencies: one connection for the whole request
+async def get_connection():
+    async with acquire() as conn:
+        yield conn
+
+
+async def get_transaction():
+    """Like get_connection, inside a transaction that rolls back if the handler raises."""
+    async with transaction() as conn:
+        yield conn
+
+
+async def _run(c, method: str, query: str, args):
+    """Runs `query`, timing it under the query's fingerprint."""
+    start = time.perf_counter()
+    try:
+        return await getattr(c, method)(query, *args)
+    finally:
+        observe_query(query, time.perf_counter() - start, args)
+
+
+async def _read(method: str, query: str, args, replica: bool):
+    """
+    Runs a pooled `method` call, on a replica when `replica` is set and one is
+    in rotation. Reads the replica can't finish are retried on the primary.
+    """
+    target = replica_set.pick() if replica else None
+    if target is not None:
+        try:
+            async with acquire(replica=target) as c:
+                return await _run(c, method, query, args)
+        except REPLICA_ERRORS as e:
+            replica_set.failed(target, e)
+        except asyncpg.exceptions.SerializationError:
+            # cancelled by a recovery conflict on the standby; the primary has none
+            replica_set.fallbacks += 1
+    async with acquire() as c:
+        return await _run(c, method, query, args)
+
+
+async def _call(method: str, query: str, args, conn, shared: bool, replica: bool):
+    if conn is not None:
+        return await _run(conn, method, query, args)
+    if shared:
+        # pinned and unpinned callers must not share, or a pinned one could get replica rows
+        key = (method, query, args, replica and not _pinned.get())
+        return await single_flight.do(key, lambda: _read(method, query, args, replica))
+    return await _read(method, query, args, replica)
+
+
+# helper functions; pass `conn` to run on a request-scoped connection.
+# `shared=True` lets concurrent identical reads share one query, `replica=True`
+# sends a read-only query to a replica; both are ignored with `conn`, whose
+# transaction may see rows other callers can't.
+async def fetch(query: str, *args, conn=None, shared: bool = False, replica: bool = False):
+    rows = await _call("fetch", query, args, conn, shared, replica)
+    return [dict(r) for r in rows]
+
+
+async def fetchrow(query: str, *args, conn=None, shared: bool = False, replica: bool = False):
+    row = await _call("fetchrow", query, args, conn, shared, replica)
+    return dict(row) if row else None
+
+
+async def fetch_records(query: str, *args, conn=None, shared: bool = False, replica: bool = False) -> list:
+    """Like fetch, but returns the asyncpg Records without copying them into dicts."""
+    records = await _call("fetch", query, args, conn, shared, replica)
+    # callers may slice or extend the list; shared results are handed to several
+    return list(records) if shared else records
+
+
+async def execute(query: str, *args, conn=None):
+    async with acquire(conn) as c:
+        start = time.perf_counter()
+        try:
+            return await c.execute(query, *args)
+        finally:
+            observe_query(query, time.perf_counter() - start, args)
+
+
+async def stream(query: str, *args, prefetch: int = 1000, replica: bool = False, describe=None):
+    """
+    Yields rows one at a time from a server-side cursor. Only `prefetch` rows
+    are held in memory, so large exports don't grow with the result size.
+    `describe`, if given, is called with the result's (column, type name)
+    pairs before the first row, so a caller knows the columns even when no
+    rows follow.
+    """
+    async with acquire(replica=replica_set.pick() if replica else None) as conn:
+        async with conn.transaction(readonly=True):
+            # timed to the first batch; the rest is paced by the client reading the export
+            start = time.perf_counter()
+            timed = False
+            stmt = await conn._prepare(query, use_cache=True)
+            if describe is not None:
+                describe([(a.name, a.type.name) for a in stmt.get_attributes()])
+            async for record in stmt.cursor(*args, prefetch=prefetch):
+                if not timed:
+                    observe_query(query, time.perf_counter() - start, args, cursor=True)
+                    timed = True
+                yield record
+            if not timed:
+                observe_query(query, time.perf_counter() - start, args, cursor=True)
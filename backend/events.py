@@ -0,0 +1,88 @@
+# app/events.py
+import asyncio
+import os
+from fastapi import HTTPException
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 100))
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv("EVENTS_MAX_SUBSCRIBERS", 5000))
+
+# filters a subscriber can set, most selective first; used to index subscribers
+FILTER_FIELDS = ("complaint_id", "officer_id", "category")
+
+
+class Subscription:
+    """
+    One connected client. Events go into a bounded queue; when the client
+    can't keep up the oldest event is dropped and counted, so a slow reader
+    never holds up the publisher or the other subscribers.
+    """
+
+    def __init__(self, filters: dict, maxsize: int = EVENTS_QUEUE_SIZE):
+        self.filters = filters
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def matches(self, event: dict) -> bool:
+        return all(event.get(k) == v for k, v in self.filters.items())
+
+    def offer(self, event: dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class EventHub:
+    """
+    Fans events from the shared database listener out to every subscriber.
+    Subscribers are indexed by their most selective filter so an event only
+    visits the subscribers that could want it.
+    """
+
+    def __init__(self, max_subscribers: int = EVENTS_MAX_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self._index: dict[tuple, set[Subscription]] = {}
+        self._count = 0
+        self.published = 0
+
+    def check_capacity(self):
+        if self._count >= self.max_subscribers:
+            raise HTTPException(status_code=503, detail="Too many live feed subscribers")
+
+    def subscribe(self, **filters) -> Subscription:
+        self.check_capacity()
+        filters = {k: v for k, v in filters.items() if v is not None}
+        sub = Subscription(filters)
+        self._index.setdefault(self._key(filters), set()).add(sub)
+        self._count += 1
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        key = self._key(sub.filters)
+        subs = self._index.get(key)
+        if subs and sub in subs:
+            subs.discard(sub)
+            self._count -= 1
+            if not subs:
+                del self._index[key]
+
+    def publish(self, event: dict):
+        self.published += 1
+        keys = [()] + [(f, event.get(f)) for f in FILTER_FIELDS if event.get(f) is not None]
+        for key in keys:
+            for sub in list(self._index.get(key, ())):
+                if sub.matches(event):
+                    sub.offer(event)
+
+    def stats(self) -> dict:
+        return {"subscribers": self._count, "published": self.published}
+
+    @staticmethod
+    def _key(filters: dict) -> tuple:
+        for field in FILTER_FIELDS:
+            if field in filters:
+                return (field, filters[field])
+        return ()
+
+
+event_hub = EventHub()
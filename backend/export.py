@@ -0,0 +1,98 @@
+# app/export.py
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from database import stream
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# rows are flushed to the client in batches of this size
+BATCH_SIZE = 500
+JSON_TYPES = ("json", "jsonb")
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+async def _ndjson(records, columns):
+    buf = []
+    json_columns = None
+    async for r in records:
+        if json_columns is None:
+            # json/jsonb arrive as text; decoded so they nest instead of being quoted strings
+            json_columns = [name for name, type_name in columns if type_name in JSON_TYPES]
+        row = dict(r)
+        for name in json_columns:
+            if row[name] is not None:
+                row[name] = json.loads(row[name])
+        buf.append(json.dumps(row, default=_default))
+        if len(buf) >= BATCH_SIZE:
+            yield "\n".join(buf) + "\n"
+            buf.clear()
+    if buf:
+        yield "\n".join(buf) + "\n"
+
+
+async def _csv(records, columns):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    header_written = False
+    count = 0
+    async for r in records:
+        if not header_written:
+            writer.writerow(r.keys())
+            header_written = True
+        writer.writerow(r.values())
+        count += 1
+        if count >= BATCH_SIZE:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            count = 0
+    if not header_written:
+        # an empty export is still a valid CSV with its header
+        writer.writerow(name for name, _ in columns)
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def export_response(query: str, *args, fmt: str = "ndjson", filename: str = "export"):
+    """
+    Streams the result of `query` as NDJSON or CSV straight from a server-side
+    cursor instead of materialising the full list first. Exports are
+    read-only, so they run on a replica when one is in rotation.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}'")
+    columns = []
+    records = stream(query, *args, replica=True, describe=columns.extend)
+    body = _ndjson(records, columns) if fmt == "ndjson" else _csv(records, columns)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+def time_range(column: str, since: datetime | None, until: datetime | None, args: list):
+    """Appends optional [since, until) bounds on `column` and returns the conditions."""
+    conditions = []
+    if since:
+        args.append(since)
+        conditions.append(f"{column} >= ${len(args)}")
+    if until:
+        args.append(until)
+        conditions.append(f"{column} < ${len(args)}")
+    return conditions
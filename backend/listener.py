@@ -0,0 +1,96 @@
+# app/listener.py
+import asyncio
+import json
+import os
+import asyncpg
+from database import DATABASE_URL
+
+RECONNECT_DELAY = float(os.getenv("LISTENER_RECONNECT_DELAY", 5))
+
+
+class ChangeListener:
+    """
+    Holds one dedicated connection per worker that LISTENs on the notification
+    channels and hands each decoded payload to the registered handlers. The
+    connection lives outside the pool so it never competes with requests.
+    """
+
+    def __init__(self, dsn: str | None):
+        self.dsn = dsn
+        self._handlers: dict[str, list] = {}
+        self._reconnect_handlers: list = []
+        self._conn: asyncpg.Connection | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopped = True
+
+    def subscribe(self, channel: str, handler):
+        """`handler(payload: dict)` is called for every event on `channel`."""
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def on_reconnect(self, handler):
+        """`handler()` runs after a dropped connection comes back; events may have been missed."""
+        self._reconnect_handlers.append(handler)
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def start(self):
+        self._stopped = False
+        try:
+            await self._connect()
+        except (OSError, asyncpg.PostgresError) as e:
+            print("❌ Change listener failed to connect:", e)
+            self._schedule_reconnect()
+
+    async def stop(self):
+        self._stopped = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._conn and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    async def _connect(self):
+        conn = await asyncpg.connect(dsn=self.dsn)
+        for channel in self._handlers:
+            await conn.add_listener(channel, self._dispatch)
+        conn.add_termination_listener(self._on_terminated)
+        self._conn = conn
+        print(f"Change listener connected ({', '.join(self._handlers) or 'no channels'})")
+
+    def _dispatch(self, conn, pid, channel, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(event)
+            except Exception as e:
+                print(f"❌ Change handler for '{channel}' failed:", e)
+
+    def _on_terminated(self, conn):
+        self._conn = None
+        if not self._stopped:
+            self._schedule_reconnect()
+
+    def _schedule_reconnect(self):
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        while not self._stopped:
+            await asyncio.sleep(RECONNECT_DELAY)
+            try:
+                await self._connect()
+            except (OSError, asyncpg.PostgresError) as e:
+                print("❌ Change listener reconnect failed:", e)
+                continue
+            for handler in self._reconnect_handlers:
+                handler()
+            return
+
+
+change_listener = ChangeListener(DATABASE_URL)
@@ -1,14 +1,22 @@
 import os
 import uvicorn
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Request
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 from fastapi.middleware.cors import CORSMiddleware
 
 load_dotenv()
 
-from database import init_db_pool, close_db_pool
+from database import init_db_pool, close_db_pool, PoolTimeoutError, ReadYourWritesMiddleware
+from cache import on_table_change, query_cache
+from listener import change_listener
+from events import event_hub
+from autoassign import auto_assigner
+from pagination import NEXT_CURSOR_HEADER
+from metrics import MetricsMiddleware
 from routers import (
-    users, complaints, views, officers, evidence, assignments, actions, feedback, audit, database, auth
+    users, complaints, views, officers, evidence, assignments, actions, feedback, audit, database, auth,
+    cache, events, health, analytics, metrics,
 )
 
 app = FastAPI(
@@ -31,10 +39,16 @@ api_router.include_router(audit.router, prefix="/audit")
 api_router.include_router(database.router, prefix="/database")
 api_router.include_router(complaints.router, prefix="/categories")
 api_router.include_router(auth.router, prefix="/auth")
+api_router.include_router(cache.router, prefix="/cache")
+api_router.include_router(events.router, prefix="/events")
+api_router.include_router(analytics.router, prefix="/analytics")
+api_router.include_router(health.router)
 
 
 # mount once
 app.include_router(api_router)
+# scraped at the conventional path, outside /api
+app.include_router(metrics.router)
 
 # CORS
 app.add_middleware(
@@ -43,14 +57,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+# pins a session's reads to the primary after it writes, when replicas are configured
+app.add_middleware(ReadYourWritesMiddleware)
+# outermost, so request timings include every other middleware
+app.add_middleware(MetricsMiddleware)
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+# other workers' writes arrive as NOTIFY events on a dedicated connection
+change_listener.subscribe("table_changes", on_table_change)
+change_listener.on_reconnect(query_cache.clear)
+change_listener.subscribe("complaint_status", event_hub.publish)
 
 @app.on_event("startup")
 async def startup():
     await init_db_pool()
+    await change_listener.start()
+    auto_assigner.start()
 
 @app.on_event("shutdown")
 async def shutdown():
+    await auto_assigner.stop()
+    await change_listener.stop()
     await close_db_pool()
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+# app/maintenance.py
+"""
+Periodic maintenance jobs. Run from cron or by hand, e.g.
+
+    python maintenance.py reconcile-stats
+    python maintenance.py reconcile-officer-load
+    python maintenance.py reconcile-rollups
+    python maintenance.py audit-partitions
+    python maintenance.py audit-retention
+    AUDIT_MODE=statement python maintenance.py audit-mode
+    python maintenance.py evidence-uploads
+"""
+import argparse
+import asyncio
+import os
+from database import init_db_pool, close_db_pool, fetch, fetchrow
+import storage
+
+# monthly AuditLog partitions created ahead of time, and how many full months to keep attached
+AUDIT_PARTITIONS_AHEAD = int(os.getenv("AUDIT_PARTITIONS_AHEAD", 3))
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", 12))
+# detached partitions are kept as standalone archive tables unless this is set
+AUDIT_DROP_DETACHED = os.getenv("AUDIT_DROP_DETACHED", "0") == "1"
+# audit triggers on Users/Complaints: row, statement (transition tables) or off
+AUDIT_MODE = os.getenv("AUDIT_MODE", "row")
+
+
+async def notify_table_change(table: str):
+    """
+    Tells every API worker to drop cached results tagged `table`, via the same
+    `table_changes` channel the trg_notify_* triggers use. Needed after a
+    rebuild of a derived table, which those triggers don't see, since this
+    process has no cache of its own.
+    """
+    await fetchrow(
+        "SELECT pg_notify('table_changes', json_build_object('table', $1::text, 'op', 'U')::text)", table
+    )
+
+
+async def reconcile_complaint_stats() -> int:
+    """Rebuilds ComplaintStats from Complaints; returns the number of buckets."""
+    row = await fetchrow("SELECT rebuild_complaint_stats() AS buckets")
+    # cached /complaints/stats and /complaints/categories are tagged "complaints"
+    await notify_table_change("complaints")
+    return row["buckets"]
+
+
+async def reconcile_officer_load() -> int:
+    """Rebuilds OfficerLoad from Complaints; returns the number of officers with open cases."""
+    row = await fetchrow("SELECT rebuild_officer_load() AS officers")
+    # cached /views/officer_workload reads open_count from OfficerLoad
+    await notify_table_change("officerload")
+    return row["officers"]
+
+
+async def reconcile_complaint_rollups() -> int:
+    """Rebuilds the hourly and daily complaint rollups; returns the number of hourly rows."""
+    row = await fetchrow("SELECT rebuild_complaint_rollups() AS buckets")
+    # cached /analytics/timeseries results are tagged "complaints"
+    await notify_table_change("complaints")
+    return row["buckets"]
+
+
+async def ensure_audit_partitions() -> int:
+    """Creates the monthly AuditLog partitions that don't exist yet; returns how many."""
+    row = await fetchrow("SELECT ensure_audit_partitions($1) AS created", AUDIT_PARTITIONS_AHEAD)
+    return row["created"]
+
+
+async def detach_expired_audit_partitions() -> list[str]:
+    """Detaches (or drops) AuditLog partitions older than the retention window."""
+    rows = await fetch(
+        "SELECT detach_audit_partitions($1, $2) AS partition",
+        AUDIT_RETENTION_MONTHS, AUDIT_DROP_DETACHED,
+    )
+    return [r["partition"] for r in rows]
+
+
+async def apply_audit_mode() -> str:
+    """Switches the audit triggers to AUDIT_MODE; returns the mode now in effect."""
+    row = await fetchrow("SELECT set_audit_mode($1) AS mode", AUDIT_MODE)
+    return row["mode"]
+
+
+async def purge_stale_uploads() -> int:
+    """Removes resumable uploads untouched for UPLOAD_TTL_HOURS; returns how many."""
+    return await asyncio.to_thread(storage.purge_stale_uploads)
+
+
+JOBS = {
+    "reconcile-stats": reconcile_complaint_stats,
+    "reconcile-officer-load": reconcile_officer_load,
+    "reconcile-rollups": reconcile_complaint_rollups,
+    "audit-partitions": ensure_audit_partitions,
+    "audit-retention": detach_expired_audit_partitions,
+    "audit-mode": apply_audit_mode,
+    "evidence-uploads": purge_stale_uploads,
+}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Database maintenance jobs")
+    parser.add_argument("job", choices=sorted(JOBS))
+    args = parser.parse_args()
+
+    await init_db_pool()
+    try:
+        result = await JOBS[args.job]()
+        print(f"{args.job}: {result}")
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
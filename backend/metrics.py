@@ -0,0 +1,239 @@
+# app/metrics.py
+"""
+In-process latency histograms, exposed in Prometheus text format on /metrics.
+
+Requests are labelled by route template ("/api/complaints/{complaint_id}"),
+queries by a normalized fingerprint of their SQL. Each request also records
+how much of its time went to waiting for a pool connection and to queries,
+so the rest is Python work and serialization.
+"""
+import bisect
+import os
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+
+# log queries slower than this with their arguments; 0 disables
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 0))
+# distinct query fingerprints tracked; the rest are counted under "other"
+MAX_QUERY_FINGERPRINTS = int(os.getenv("METRICS_MAX_QUERIES", 500))
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> list[str]:
+        sep = "," if labels else ""
+        series = f"{{{labels}}}" if labels else ""
+        out, cumulative = [], 0
+        for bound, n in zip(BUCKETS, self.counts):
+            cumulative += n
+            out.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        out.append(f"{name}_sum{series} {self.total:.6f}")
+        out.append(f"{name}_count{series} {self.count}")
+        return out
+
+
+class RequestTimings:
+    """Pool-wait and query time accumulated by the database helpers for one request."""
+    __slots__ = ("db", "wait")
+
+    def __init__(self):
+        self.db = 0.0
+        self.wait = 0.0
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+
+request_latency: dict[tuple, Histogram] = {}
+request_db_time: dict[tuple, Histogram] = {}
+request_pool_wait: dict[tuple, Histogram] = {}
+query_latency: dict[str, Histogram] = {}
+acquire_wait = Histogram()
+slow_queries = 0
+# fingerprint -> first (query, args) seen, while benchmarks.plans is collecting statements
+_captured: dict[str, tuple] | None = None
+
+
+def _histogram(table: dict, key) -> Histogram:
+    h = table.get(key)
+    if h is None:
+        h = table[key] = Histogram()
+    return h
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|(?<![$\w])\d+(?:\.\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(query: str) -> str:
+    """Collapses whitespace and replaces inline literals with ?, so one statement is one series."""
+    return _SPACE.sub(" ", _LITERALS.sub("?", query)).strip()[:200]
+
+
+def observe_query(query: str, seconds: float, args=(), cursor: bool = False):
+    global slow_queries
+    key = fingerprint(query)
+    if key not in query_latency and len(query_latency) >= MAX_QUERY_FINGERPRINTS:
+        key = "other"
+    _histogram(query_latency, key).observe(seconds)
+    if _captured is not None and key not in _captured:
+        _captured[key] = (query, args, cursor)
+    timings = _current.get()
+    if timings is not None:
+        timings.db += seconds
+    if SLOW_QUERY_MS and seconds * 1000 >= SLOW_QUERY_MS:
+        slow_queries += 1
+        print(f"🐢 Slow query ({seconds * 1000:.1f} ms): {key} args={args!r:.500}")
+
+
+def start_capture():
+    global _captured
+    _captured = {}
+
+
+def captured() -> dict[str, tuple]:
+    """fingerprint -> (query, args, read through a server-side cursor) since start_capture()."""
+    return dict(_captured or {})
+
+
+def observe_acquire(seconds: float):
+    acquire_wait.observe(seconds)
+    timings = _current.get()
+    if timings is not None:
+        timings.wait += seconds
+
+
+def route_template(scope) -> str:
+    """
+    "/api/complaints/{complaint_id}" for "/api/complaints/42". A route's own
+    path_format lacks its include prefixes, so the request path keeps its
+    leading segments and only the trailing ones matched by the route are
+    replaced with the route's placeholders.
+    """
+    route = scope.get("route")
+    if route is None:
+        # unmatched paths share one label so scanners can't blow up cardinality
+        return "unmatched"
+    path = scope.get("path", "")
+    fmt = getattr(route, "path_format", None) or getattr(route, "path", "")
+    if "{" not in fmt:
+        return path
+    tail = fmt.split("/")[1:]
+    segments = path.split("/")
+    if len(tail) >= len(segments):
+        return fmt
+    return "/".join(segments[:len(segments) - len(tail)] + tail)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: times each HTTP request and labels it with its route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            template = route_template(scope)
+            method = scope["method"]
+            _histogram(request_latency, (method, template, f"{status // 100}xx")).observe(elapsed)
+            _histogram(request_db_time, (method, template)).observe(timings.db)
+            _histogram(request_pool_wait, (method, template)).observe(timings.wait)
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+# per-replica series: (name, type, value from a Replica.snapshot() entry)
+REPLICA_SERIES = (
+    ("healthy", "gauge", lambda r: int(r["healthy"])),
+    ("lag_seconds", "gauge", lambda r: r["lag_s"]),
+    ("reads_total", "counter", lambda r: r["reads"]),
+    ("pool_size", "gauge", lambda r: r["pool"].get("size")),
+    ("pool_in_use", "gauge", lambda r: r["pool"].get("in_use")),
+    ("pool_acquire_timeouts_total", "counter", lambda r: r["pool"]["timeouts"]),
+)
+
+
+def render(pool: dict, coalesced: dict | None = None, replicas: dict | None = None) -> str:
+    """
+    Prometheus text exposition of every series; `pool` is PoolStats.snapshot(),
+    `coalesced` SingleFlight.snapshot(), `replicas` ReplicaSet.snapshot().
+    """
+    out = ["# TYPE http_request_duration_seconds histogram"]
+    for (method, route, status), h in request_latency.items():
+        out += h.lines("http_request_duration_seconds",
+                       f'method="{method}",route="{_label(route)}",status="{status}"')
+    out.append("# TYPE http_request_db_seconds histogram")
+    for (method, route), h in request_db_time.items():
+        out += h.lines("http_request_db_seconds", f'method="{method}",route="{_label(route)}"')
+    out.append("# TYPE http_request_pool_wait_seconds histogram")
+    for (method, route), h in request_pool_wait.items():
+        out += h.lines("http_request_pool_wait_seconds", f'method="{method}",route="{_label(route)}"')
+    out.append("# TYPE db_query_duration_seconds histogram")
+    for query, h in query_latency.items():
+        out += h.lines("db_query_duration_seconds", f'query="{_label(query)}"')
+    out.append("# TYPE db_pool_acquire_wait_seconds histogram")
+    out += acquire_wait.lines("db_pool_acquire_wait_seconds", "")
+
+    out.append("# TYPE db_pool_acquire_timeouts_total counter")
+    out.append(f"db_pool_acquire_timeouts_total {pool.get('timeouts', 0)}")
+    for key in ("size", "idle", "in_use", "max_size"):
+        if key in pool:
+            out.append(f"# TYPE db_pool_{key} gauge")
+            out.append(f"db_pool_{key} {pool[key]}")
+    out.append("# TYPE db_slow_queries_total counter")
+    out.append(f"db_slow_queries_total {slow_queries}")
+    if coalesced is not None:
+        out.append("# TYPE db_shared_queries_total counter")
+        out.append(f"db_shared_queries_total {coalesced['leaders']}")
+        out.append("# TYPE db_coalesced_calls_total counter")
+        out.append(f"db_coalesced_calls_total {coalesced['collapsed']}")
+        out.append("# TYPE db_coalesced_in_flight gauge")
+        out.append(f"db_coalesced_in_flight {coalesced['in_flight']}")
+    if replicas and replicas["replicas"]:
+        out.append("# TYPE db_replica_fallbacks_total counter")
+        out.append(f"db_replica_fallbacks_total {replicas['fallbacks']}")
+        out.append("# TYPE db_replica_pinned_reads_total counter")
+        out.append(f"db_replica_pinned_reads_total {replicas['pinned_reads']}")
+        for name, kind, value in REPLICA_SERIES:
+            out.append(f"# TYPE db_replica_{name} {kind}")
+            for r in replicas["replicas"]:
+                v = value(r)
+                if v is not None:
+                    out.append(f'db_replica_{name}{{replica="{_label(r["name"])}"}} {v}')
+    return "\n".join(out) + "\n"
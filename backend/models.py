@@ -142,7 +142,7 @@ class AuditLogEntry(BaseModel):
     audit_id: int
     table_name: str
     operation: str
-    primary_key: Dict[str, Any]
+    primary_key: Any
     changed_by: Optional[int]
     changed_at: datetime
     row_data: Dict[str, Any]
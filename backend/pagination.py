@@ -0,0 +1,122 @@
+# app/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime
+from fastapi import HTTPException, Response
+from database import fetch_records
+
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values) -> str:
+    """
+    Opaque cursor token for the keyset values of the last row on a page.
+    Timestamps are stored as ISO strings and parsed back on decode.
+    """
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _cursor_value(key: str, value):
+    # ids are ints, search ranks numbers, every other key a timestamp
+    name = key.split(".")[-1]
+    if name.endswith("_id"):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    elif name == "rank":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    elif isinstance(value, str):
+        return datetime.fromisoformat(value)
+    raise ValueError(f"bad cursor value for {key}")
+
+
+def decode_cursor(token: str, keys) -> list:
+    """
+    Keyset values from a cursor token, checked against the type of each of
+    `keys`, so a tampered cursor is a 400 rather than a database error.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("wrong cursor size")
+        return [_cursor_value(k, v) for k, v in zip(keys, values)]
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def page_query(select: str, keys, cursor: str | None = None, limit: int = 100,
+               where=(), args=(), descending: bool = True):
+    """
+    Builds a keyset-paginated query from a bare `SELECT ... FROM ...`.
+
+    `where` conditions reference `args` positionally ($1, $2, ...). The cursor
+    adds a row comparison on `keys`, so every page is an index range scan
+    instead of an OFFSET that grows with depth. One extra row is requested so
+    `next_page` can tell whether another page exists.
+    """
+    args = list(args)
+    conditions = list(where)
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        placeholders = ", ".join(f"${len(args) + i + 1}" for i in range(len(keys)))
+        op = "<" if descending else ">"
+        conditions.append(f"({', '.join(keys)}) {op} ({placeholders})")
+        args.extend(values)
+
+    query = select
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    direction = " DESC" if descending else ""
+    query += " ORDER BY " + ", ".join(k + direction for k in keys)
+    args.append(clamp_limit(limit) + 1)
+    query += f" LIMIT ${len(args)}"
+    return query, args
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def next_page(response: Response, rows: list, keys, limit: int) -> list:
+    """
+    Trims the look-ahead row and exposes the cursor for the following page in
+    the X-Next-Cursor header, so list routes keep returning plain arrays.
+    """
+    limit = clamp_limit(limit)
+    if len(rows) <= limit:
+        return rows
+    page = rows[:limit]
+    last = page[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor([last[k.split(".")[-1]] for k in keys])
+    return page
+
+
+def json_page_sql(query: str, keys, descending: bool = True) -> str:
+    """Wraps a page query so Postgres renders each row as JSON text."""
+    direction = " DESC" if descending else ""
+    cols = ", ".join(f"q.{k}" for k in keys)
+    order = ", ".join(f"q.{k}{direction}" for k in keys)
+    return f"SELECT row_to_json(q)::text AS _json, {cols} FROM ({query}) q ORDER BY {order}"
+
+
+async def fetch_json_page(query: str, args, keys, limit: int, descending: bool = True,
+                          shared: bool = False, replica: bool = False):
+    """
+    Fast path for trusted read models: rows arrive as JSON text rendered by
+    Postgres and are joined straight into the response body, skipping the
+    dict copy, Pydantic validation and jsonable_encoder.
+    Returns (body bytes, next cursor or None). `shared` and `replica` are
+    passed to fetch_records.
+    """
+    records = await fetch_records(json_page_sql(query, keys, descending), *args, shared=shared, replica=replica)
+    limit = clamp_limit(limit)
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor([records[-1][k] for k in keys])
+    return ("[" + ",".join(r[0] for r in records) + "]").encode(), next_cursor
@@ -1,13 +1,21 @@
-from fastapi import APIRouter
-from database import fetch, fetchrow, execute
+from fastapi import APIRouter, Request, Response
+from database import fetch, fetchrow, execute, transaction
+from cache import invalidate
+from bulk import bulk_insert, read_items
+from schemas import ActionCreate
+from pagination import page_query, next_page
 
 router = APIRouter(tags=["Actions"])
 
 
+PAGE_KEYS = ("action_date", "action_id")
+
+
 @router.get("/", response_model=list)
-async def list_actions():
-    rows = await fetch("SELECT * FROM complaintactions ORDER BY action_date DESC")
-    return rows
+async def list_actions(response: Response, limit: int = 100, cursor: str | None = None):
+    q, args = page_query("SELECT * FROM complaintactions", PAGE_KEYS, cursor, limit)
+    rows = await fetch(q, *args)
+    return next_page(response, rows, PAGE_KEYS, limit)
 
 
 @router.post("/", status_code=201)
@@ -18,4 +26,24 @@ async def add_action(complaint_id: int, officer_id: int, action_taken: str, is_f
     RETURNING action_id, complaint_id, officer_id, action_taken, is_final, action_date
     """
     row = await fetchrow(q, complaint_id, officer_id, action_taken, is_final)
+    # a final action resolves the complaint through trg_set_complaint_resolved
+    invalidate("complaintactions", "complaints")
     return row
+
+
+
+@router.post("/bulk")
+async def add_actions_bulk(request: Request):
+    valid, errors = await read_items(request, ActionCreate)
+    # body is parsed before a connection is checked out
+    async with transaction() as conn:
+        result = await bulk_insert(
+            conn, "complaintactions",
+            {"complaint_id": "int", "officer_id": "int", "action_taken": "text", "is_final": "bool"},
+            valid, errors,
+            references={"complaint_id": ("complaints", "complaint_id"),
+                        "officer_id": ("officers", "officer_id")},
+            returning="action_id, complaint_id, officer_id, action_taken, is_final, action_date",
+        )
+    invalidate("complaintactions", "complaints")
+    return result
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from datetime import datetime, timedelta, timezone
+from cache import cached_fetch, check_etag
+
+router = APIRouter(tags=["Analytics"])
+
+BUCKETS = ("hour", "day", "week")
+# group_by value -> rollup column
+GROUPS = {"category": "category", "department": "department", "location": "area", "none": "''"}
+# bucket=auto picks the finest bucket whose range limit fits, else week
+AUTO_BUCKETS = ((timedelta(days=2), "hour"), (timedelta(days=120), "day"))
+MAX_HOURLY_RANGE = timedelta(days=31)
+DEFAULT_RANGE = timedelta(days=30)
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+@router.get("/timeseries")
+async def timeseries(request: Request, response: Response, bucket: str = "auto", group_by: str = "none",
+                     since: datetime | None = None, until: datetime | None = None,
+                     category: str | None = None, department: str | None = None):
+    """
+    Complaint intake, resolutions and mean hours to resolve per bucket, read
+    from the hourly and daily rollups maintained by trg_complaints_rollups.
+    Buckets are UTC; `group_by` is category, department, location (the area
+    after the last comma) or none. Defaults to the last 30 days.
+    """
+    if until is None:
+        # rounded so repeated dashboard polls share a cache entry
+        until = datetime.now(timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+    until = _utc(until)
+    since = _utc(since) if since else until - DEFAULT_RANGE
+    if since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+
+    span = until - since
+    if bucket == "auto":
+        bucket = next((b for limit, b in AUTO_BUCKETS if span <= limit), "week")
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {', '.join(BUCKETS)} or auto")
+    if group_by not in GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {', '.join(GROUPS)}")
+    if bucket == "hour" and span > MAX_HOURLY_RANGE:
+        raise HTTPException(status_code=400, detail="Hourly buckets are limited to 31 days; use day or week")
+
+    # day and week both come from the daily rollup, a fraction of the hourly rows
+    if bucket == "hour":
+        table, floor = "complaintrolluphourly", "complaint_rollup_hour($1)"
+    else:
+        table, floor = "complaintrollupdaily", "complaint_rollup_day($1)"
+    bucket_expr = ("date_trunc('week', bucket AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'"
+                   if bucket == "week" else "bucket")
+
+    args = [since, until]
+    where = [f"bucket >= {floor}", "bucket < $2"]
+    if category:
+        args.append(category)
+        where.append(f"category = ${len(args)}")
+    if department:
+        args.append(department)
+        where.append(f"department = ${len(args)}")
+
+    q = f"""
+        SELECT {bucket_expr} AS bucket,
+               {GROUPS[group_by]} AS "group",
+               SUM(intake)::int AS intake,
+               SUM(resolved)::int AS resolved,
+               round((SUM(resolve_seconds) / NULLIF(SUM(resolved), 0) / 3600)::numeric, 2) AS mean_resolve_hours
+        FROM {table}
+        WHERE {" AND ".join(where)}
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+    """
+    cached = await cached_fetch(q, *args, tags=("complaints", "officers"))
+    not_modified = check_etag(request, response, cached.etag)
+    if not_modified:
+        return not_modified
+    return {"bucket": bucket, "group_by": group_by, "since": since, "until": until,
+            "source": table, "series": cached.value}
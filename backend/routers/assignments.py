@@ -1,13 +1,22 @@
-from fastapi import APIRouter, HTTPException, status
-from database import fetch, fetchrow, execute
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from database import fetch, fetchrow, execute, transaction
+from cache import invalidate
+from bulk import bulk_insert, read_items
+from schemas import AssignmentCreate
+from pagination import page_query, next_page
+from autoassign import auto_assign, AUTO_ASSIGN_BATCH
 
 router = APIRouter(tags=["Assignments"])
 
 
+PAGE_KEYS = ("assigned_at", "assignment_id")
+
+
 @router.get("/", response_model=list)
-async def list_assignments():
-    rows = await fetch("SELECT * FROM complaintassignments ORDER BY assigned_at DESC")
-    return rows
+async def list_assignments(response: Response, limit: int = 100, cursor: str | None = None):
+    q, args = page_query("SELECT * FROM complaintassignments", PAGE_KEYS, cursor, limit)
+    rows = await fetch(q, *args)
+    return next_page(response, rows, PAGE_KEYS, limit)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
@@ -18,4 +27,50 @@ async def assign_complaint(complaint_id: int, officer_id: int, assigned_by: int
     RETURNING assignment_id, complaint_id, officer_id, assigned_by, assigned_at
     """
     row = await fetchrow(q, complaint_id, officer_id, assigned_by)
+    # trg_set_complaint_in_progress may also move the complaint to 'In Progress'
+    invalidate("complaintassignments", "complaints")
     return row
+
+
+@router.post("/auto")
+async def auto_assign_complaints(limit: int = AUTO_ASSIGN_BATCH, assigned_by: int | None = None):
+    """
+    Routes up to `limit` unassigned Pending complaints by category to the
+    least-loaded officer in the matching department. Returns the assignments
+    made, which is empty while another run (the background loop or another
+    worker) holds the assignment lock.
+    """
+    return await auto_assign(max(1, min(limit, 1000)), assigned_by)
+
+
+@router.get("/load")
+async def get_officer_load():
+    """Open complaints per officer and per department, read from OfficerLoad."""
+    officers = await fetch("""
+        SELECT o.officer_id, o.department, COALESCE(l.open_count, 0) AS open_count
+        FROM officers o
+        LEFT JOIN officerload l ON l.officer_id = o.officer_id
+        ORDER BY o.department, open_count, o.officer_id
+    """)
+    departments: dict[str, int] = {}
+    for o in officers:
+        departments[o["department"]] = departments.get(o["department"], 0) + o["open_count"]
+    return {"officers": officers, "departments": departments}
+
+
+@router.post("/bulk")
+async def assign_complaints_bulk(request: Request):
+    valid, errors = await read_items(request, AssignmentCreate)
+    # body is parsed before a connection is checked out
+    async with transaction() as conn:
+        result = await bulk_insert(
+            conn, "complaintassignments",
+            {"complaint_id": "int", "officer_id": "int", "assigned_by": "int"},
+            valid, errors,
+            references={"complaint_id": ("complaints", "complaint_id"),
+                        "officer_id": ("officers", "officer_id"),
+                        "assigned_by": ("users", "user_id")},
+            returning="assignment_id, complaint_id, officer_id, assigned_by, assigned_at",
+        )
+    invalidate("complaintassignments", "complaints")
+    return result
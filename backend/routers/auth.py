@@ -1,29 +1,21 @@
 from fastapi import APIRouter, HTTPException, status
-from passlib.context import CryptContext
-from database import fetchrow
-from schemas import UserRegister, UserOut
+from database import fetchrow, execute
+from cache import invalidate
+from schemas import UserRegister, UserLogin, UserOut
+from security import hash_password, verify_password
 
 router = APIRouter(tags=["Authentication"])
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 @router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
 async def register(payload: UserRegister):
-    # Check if email already exists
-    exists = await fetchrow("SELECT user_id FROM users WHERE email = $1", payload.email)
-    if exists:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, 
-            detail="Email already registered"
-        )
-
-    # Hash the password (NEVER store plain text!)
-    hashed_password = pwd_context.hash(payload.password)
+    # Hash the password (NEVER store plain text!) on the bcrypt worker pool
+    hashed_password = await hash_password(payload.password)
 
-    # 3 Insert into Database
+    # Insert; an existing email hits the unique constraint and returns no row
     query = """
         INSERT INTO users (name, email, phone, role, password_hash)
         VALUES ($1, $2, $3, $4, $5)
+        ON CONFLICT (email) DO NOTHING
         RETURNING user_id, name, email, phone, role, created_at
     """
     
@@ -36,6 +28,32 @@ async def register(payload: UserRegister):
             payload.role, 
             hashed_password
         )
-        return row
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    invalidate("users")
+    return row
+
+
+@router.post("/login", response_model=UserOut)
+async def login(payload: UserLogin):
+    # no connection is held across the bcrypt waits below, which can queue on the
+    # hash pool; a burst of logins would otherwise drain the database pool
+    row = await fetchrow(
+        "SELECT user_id, name, email, phone, role, created_at, password_hash FROM users WHERE email = $1",
+        payload.email,
+    )
+    ok, needs_rehash = await verify_password(payload.password, row["password_hash"] if row else None)
+    if not ok:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
+
+    if needs_rehash:
+        # work factor changed since this hash was made
+        new_hash = await hash_password(payload.password)
+        await execute("UPDATE users SET password_hash = $1 WHERE user_id = $2", new_hash, row["user_id"])
+    return row
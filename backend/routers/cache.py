@@ -0,0 +1,16 @@
+from fastapi import APIRouter, status
+from cache import query_cache
+from database import single_flight
+
+router = APIRouter(tags=["Cache"])
+
+
+@router.get("/")
+async def cache_stats():
+    return {**query_cache.stats(), "coalesced": single_flight.snapshot()}
+
+
+@router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_cache():
+    query_cache.clear()
+    return None
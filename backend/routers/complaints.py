@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from typing import List
+from datetime import datetime
 from pydantic import BaseModel
-from database import fetch, fetchrow, execute
-from schemas import ComplaintCreate, ComplaintOut
+from database import fetch, fetchrow, execute, transaction, get_transaction
+from cache import cached_fetch, check_etag, invalidate
+from bulk import bulk_insert, read_items
+from export import export_response, time_range
+from pagination import page_query, next_page
+from statements import register
+from schemas import ComplaintCreate, ComplaintOut, ComplaintSearchOut
 
 router = APIRouter(tags=["Complaints"])
 
@@ -10,34 +16,126 @@ router = APIRouter(tags=["Complaints"])
 class StatusUpdate(BaseModel):
     status: str
 
+PAGE_KEYS = ("submitted_at", "complaint_id")
+
+# everything except the search_document tsvector, which is only read by /search
+COLUMNS = "complaint_id, user_id, category, description, location, status, submitted_at, resolved_at, last_updated_at, current_officer_id"
+
 @router.get("/", response_model=List[ComplaintOut])
-async def list_complaints(status: str | None = None, limit: int = 100):
-    if status:
-        rows = await fetch(
-            "SELECT * FROM complaints WHERE status = $1 ORDER BY submitted_at DESC LIMIT $2",
-            status, limit
-        )
-    else:
-        rows = await fetch("SELECT * FROM complaints ORDER BY submitted_at DESC LIMIT $1", limit)
-    return rows
+async def list_complaints(response: Response, status: str | None = None, limit: int = 100,
+                          cursor: str | None = None):
+    where, args = (["status = $1"], [status]) if status else ([], [])
+    q, args = page_query(f"SELECT {COLUMNS} FROM complaints", PAGE_KEYS, cursor, limit, where, args)
+    rows = await fetch(q, *args)
+    return next_page(response, rows, PAGE_KEYS, limit)
 
-@router.get("/stats")
-async def get_complaint_stats():
-    q = """
-    SELECT 
+# both read the ComplaintStats counters, maintained by trg_complaints_stats
+STATS_SQL = register("complaints.stats", """
+    SELECT
         status,
-        COUNT(*) AS count
-    FROM complaints
+        SUM(complaint_count)::int AS count
+    FROM complaintstats
     GROUP BY status
-    ORDER BY status;
-    """
-    rows = await fetch(q)
-    return rows
+    HAVING SUM(complaint_count) > 0
+    ORDER BY status
+""")
+
+CATEGORIES_SQL = register("complaints.categories", """
+    SELECT NULLIF(category, '') AS category
+    FROM complaintstats
+    GROUP BY category
+    HAVING SUM(complaint_count) > 0
+    ORDER BY category
+""")
+
+GET_SQL = register("complaints.get", f"SELECT {COLUMNS} FROM complaints WHERE complaint_id = $1")
+
+@router.get("/stats")
+async def get_complaint_stats(request: Request, response: Response):
+    cached = await cached_fetch(STATS_SQL, tags=("complaints",))
+    not_modified = check_etag(request, response, cached.etag)
+    if not_modified:
+        return not_modified
+    return cached.value
 
 @router.get("/categories")
-async def get_categories():
-    rows = await fetch("SELECT DISTINCT category FROM complaints ORDER BY category")
-    return [r['category'] for r in rows]
+async def get_categories(request: Request, response: Response):
+    cached = await cached_fetch(CATEGORIES_SQL, tags=("complaints",))
+    not_modified = check_etag(request, response, cached.etag)
+    if not_modified:
+        return not_modified
+    return [r['category'] for r in cached.value]
+
+@router.get("/export")
+async def export_complaints(format: str = "ndjson", status: str | None = None,
+                            since: datetime | None = None, until: datetime | None = None):
+    """Streams every matching complaint as NDJSON or CSV, oldest first."""
+    args = []
+    where = time_range("submitted_at", since, until, args)
+    if status:
+        args.append(status)
+        where.append(f"status = ${len(args)}")
+    q = f"SELECT {COLUMNS} FROM complaints"
+    if where:
+        q += " WHERE " + " AND ".join(where)
+    q += " ORDER BY submitted_at, complaint_id"
+    return export_response(q, *args, fmt=format, filename="complaints")
+
+SEARCH_KEYS = ("rank", "complaint_id")
+HIGHLIGHT_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
+
+def _like_pattern(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+@router.get("/search", response_model=List[ComplaintSearchOut])
+async def search_complaints(response: Response, q: str | None = None, location: str | None = None,
+                            status: str | None = None, limit: int = 20, cursor: str | None = None):
+    """
+    Ranked search over category, description and location.
+
+    `q` takes web-search syntax ("quoted phrases", or, -exclude) and matches the
+    search_document GIN index; `location` is a case-insensitive substring or
+    prefix ("Sector 1") served by the trigram index. With only `location`,
+    results rank by trigram similarity. Paged by (rank, complaint_id) through
+    X-Next-Cursor; description snippets are highlighted for the page only.
+    """
+    q = (q or "").strip()
+    location = (location or "").strip()
+    if not q and not location:
+        raise HTTPException(status_code=400, detail="Provide q or location")
+
+    args, where = [], []
+    if q:
+        args.append(q)
+        where.append("c.search_document @@ websearch_to_tsquery('english', $1)")
+        rank = "ts_rank_cd(c.search_document, websearch_to_tsquery('english', $1))"
+    if location:
+        args.append(_like_pattern(location))
+        where.append(f"c.location ILIKE '%' || ${len(args)} || '%'")
+        if not q:
+            args.append(location)
+            rank = f"similarity(c.location, ${len(args)})"
+    if status:
+        args.append(status)
+        where.append(f"c.status = ${len(args)}")
+
+    select = f"""
+        SELECT * FROM (
+            SELECT {", ".join("c." + col.strip() for col in COLUMNS.split(","))}, {rank} AS rank
+            FROM complaints c
+            WHERE {" AND ".join(where)}
+        ) hits"""
+    inner, args = page_query(select, SEARCH_KEYS, cursor, limit, args=args)
+    highlight = (f"ts_headline('english', COALESCE(page.description, ''), websearch_to_tsquery('english', $1), "
+                 f"'{HIGHLIGHT_OPTIONS}')" if q else "NULL")
+    # ts_headline re-parses the text, so it runs on the page rows, not every hit
+    sql = f"""
+        SELECT page.*, {highlight} AS highlight
+        FROM ({inner}) page
+        ORDER BY page.rank DESC, page.complaint_id DESC
+    """
+    rows = await fetch(sql, *args)
+    return next_page(response, rows, SEARCH_KEYS, limit)
 
 @router.post("/", response_model=ComplaintOut)
 async def create_complaint(payload: ComplaintCreate):
@@ -50,30 +148,57 @@ async def create_complaint(payload: ComplaintCreate):
     q = """
     INSERT INTO complaints (user_id, category, description, location, status)
     VALUES ($1, $2, $3, $4, 'Pending')
-    RETURNING complaint_id, user_id, category, description, location, status, submitted_at, resolved_at, last_updated_at
+    RETURNING complaint_id, user_id, category, description, location, status, submitted_at, resolved_at, last_updated_at, current_officer_id
     """
     row = await fetchrow(q, payload.user_id, payload.category, payload.description, payload.location)
+    invalidate("complaints")
     return row
 
+@router.post("/bulk")
+async def create_complaints_bulk(request: Request):
+    """
+    Accepts a JSON array or NDJSON of complaints and inserts them in one
+    transaction. Returns a result per input row, in input order.
+    """
+    valid, errors = await read_items(request, ComplaintCreate)
+    # body is parsed before a connection is checked out
+    async with transaction() as conn:
+        result = await bulk_insert(
+            conn, "complaints",
+            {"user_id": "int", "category": "varchar", "description": "text", "location": "varchar"},
+            valid, errors,
+            references={"user_id": ("users", "user_id")},
+            returning="complaint_id, user_id, category, description, location, status, submitted_at, resolved_at, last_updated_at, current_officer_id",
+        )
+    invalidate("complaints")
+    return result
+
 @router.get("/{complaint_id}", response_model=ComplaintOut)
 async def get_complaint(complaint_id: int):
-    row = await fetchrow("SELECT * FROM complaints WHERE complaint_id = $1", complaint_id)
+    row = await fetchrow(GET_SQL, complaint_id)
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Complaint not found")
     return row
 
 # ✅ This is the NEW route to fix the 404 error
 @router.put("/{complaint_id}/status", response_model=ComplaintOut)
-async def update_complaint_status(complaint_id: int, payload: StatusUpdate):
+async def update_complaint_status(complaint_id: int, payload: StatusUpdate, conn=Depends(get_transaction)):
+    # the row lock keeps a concurrent status change from landing between the check and the update
+    current = await fetchrow(f"SELECT {COLUMNS} FROM complaints WHERE complaint_id = $1 FOR UPDATE",
+                             complaint_id, conn=conn)
+    if not current:
+        raise HTTPException(status_code=404, detail="Complaint not found")
+    if current["status"] == payload.status:
+        # nothing changes, so no audit row, trigger work or cache invalidation
+        return current
     q = """
     UPDATE complaints 
     SET status=$1, last_updated_at = CURRENT_TIMESTAMP
     WHERE complaint_id=$2
-    RETURNING complaint_id, user_id, category, description, location, status, submitted_at, resolved_at, last_updated_at
+    RETURNING complaint_id, user_id, category, description, location, status, submitted_at, resolved_at, last_updated_at, current_officer_id
     """
-    row = await fetchrow(q, payload.status, complaint_id)
-    if not row:
-        raise HTTPException(status_code=404, detail="Complaint not found")
+    row = await fetchrow(q, payload.status, complaint_id, conn=conn)
+    invalidate("complaints")
     return row
 
 @router.put("/{complaint_id}", response_model=ComplaintOut)
@@ -81,15 +206,18 @@ async def update_complaint(complaint_id: int, payload: ComplaintCreate):
     q = """
     UPDATE complaints SET category=$1, description=$2, location=$3, last_updated_at = CURRENT_TIMESTAMP
     WHERE complaint_id=$4
-    RETURNING complaint_id, user_id, category, description, location, status, submitted_at, resolved_at, last_updated_at
+    RETURNING complaint_id, user_id, category, description, location, status, submitted_at, resolved_at, last_updated_at, current_officer_id
     """
     row = await fetchrow(q, payload.category, payload.description, payload.location, complaint_id)
     if not row:
         raise HTTPException(status_code=404, detail="Complaint not found")
+    invalidate("complaints")
     return row
 
 
 @router.delete("/{complaint_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_complaint(complaint_id: int):
     await execute("DELETE FROM complaints WHERE complaint_id = $1", complaint_id)
+    # cascades to evidence, feedback, assignments and actions
+    invalidate("complaints", "complaintevidence", "feedback", "complaintassignments", "complaintactions")
     return None
\ No newline at end of file
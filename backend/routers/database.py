@@ -1,12 +1,18 @@
-from fastapi import APIRouter
-from database import fetch
+from fastapi import APIRouter, Query
 from typing import Dict, List, Any
+from snapshot import take_snapshot, DEFAULT_ROW_LIMIT
 
 router = APIRouter(tags=["Database"])
 
 # Changed response_model to Dict to match frontend expectation
 @router.get("/", response_model=Dict[str, List[Any]])
-async def get_all_tables():
+async def get_all_tables(
+    limit: int = DEFAULT_ROW_LIMIT,
+    tables: List[str] | None = Query(None),
+    columns: List[str] | None = Query(None, description="table.column entries"),
+    table_limit: List[str] | None = Query(None, description="table:rows entries"),
+    refresh: bool = False,
+):
     """
     Returns a dictionary where keys are table names and values are lists of rows.
     Format:
@@ -15,21 +21,4 @@ async def get_all_tables():
         "complaints": [{...}, {...}]
     }
     """
-    # 1. Fetch all table names
-    tables = await fetch("""
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema = 'public'
-          AND table_type = 'BASE TABLE';
-    """)
-
-    result = {}
-
-    # 2. Loop through tables and fetch rows
-    for t in tables:
-        table_name = t['table_name']
-        # Limit 200 to prevent crashing the browser with too much data
-        rows = await fetch(f"SELECT * FROM {table_name} LIMIT 200")
-        result[table_name] = rows
-
-    return result
\ No newline at end of file
+    return await take_snapshot(tables, columns, table_limit, limit, refresh)
@@ -0,0 +1,58 @@
+import asyncio
+import json
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from events import event_hub
+
+router = APIRouter(tags=["Events"])
+
+HEARTBEAT_SECONDS = 15
+
+
+def _sse(event: str, data: dict, event_id: int | None = None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.get("/complaints")
+async def complaint_events(request: Request, officer_id: int | None = None,
+                           category: str | None = None, complaint_id: int | None = None):
+    """
+    Server-Sent Events stream of complaint status changes, optionally filtered.
+    A `lagged` event tells the client it fell behind and should refetch.
+    """
+    # refused with a 503 here; once the stream starts the status is already sent
+    event_hub.check_capacity()
+
+    async def stream():
+        seq = 0
+        sub = None
+        try:
+            # subscribed only once the body is being sent, so every subscription is released below
+            sub = event_hub.subscribe(officer_id=officer_id, category=category, complaint_id=complaint_id)
+            yield "retry: 5000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if sub.dropped:
+                    yield _sse("lagged", {"dropped": sub.dropped})
+                    sub.dropped = 0
+                seq += 1
+                yield _sse("status", event, seq)
+        finally:
+            if sub is not None:
+                event_hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+async def event_stats():
+    return event_hub.stats()
@@ -1,22 +1,41 @@
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import asyncpg
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
 from typing import List
-from database import fetch, fetchrow, execute
-from pydantic import BaseModel
+from database import fetch, fetchrow, execute, transaction, get_connection
+from pagination import page_query, next_page
+from bulk import bulk_insert, read_items
+import storage
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 router = APIRouter(tags=["Evidence"])
 
+# complaintevidence.mime_type is VARCHAR(100)
+MIME_TYPE_MAX_LENGTH = 100
+
 
 class EvidenceCreate(BaseModel):
     complaint_id: int
     file_path: str
-    mime_type: str
+    mime_type: str = Field(max_length=MIME_TYPE_MAX_LENGTH)
+
+
+PAGE_KEYS = ("uploaded_at", "evidence_id")
+RETURNING = "evidence_id, complaint_id, file_path, mime_type, content_sha256, size_bytes, uploaded_at"
+# serializes committing a blob with its row against deleting its last row;
+# the two-key form keeps these apart from other advisory locks
+BLOB_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('complaintevidence'), hashtext($1))"
+BLOB_SESSION_LOCK_SQL = "SELECT pg_advisory_lock(hashtext('complaintevidence'), hashtext($1))"
+BLOB_UNLOCK_SQL = "SELECT pg_advisory_unlock(hashtext('complaintevidence'), hashtext($1))"
 
 
 @router.get("/", response_model=List[dict])
-async def list_evidence(limit: int = 100):
-    rows = await fetch("SELECT * FROM complaintevidence ORDER BY uploaded_at DESC LIMIT $1", limit)
-    return rows
+async def list_evidence(response: Response, limit: int = 100, cursor: str | None = None):
+    q, args = page_query("SELECT * FROM complaintevidence", PAGE_KEYS, cursor, limit)
+    rows = await fetch(q, *args)
+    return next_page(response, rows, PAGE_KEYS, limit)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
@@ -24,12 +43,170 @@ async def add_evidence(payload: EvidenceCreate):
     q = """
     INSERT INTO complaintevidence (complaint_id, file_path, mime_type)
     VALUES ($1, $2, $3)
-    RETURNING evidence_id, complaint_id, file_path, mime_type, uploaded_at
+    RETURNING evidence_id, complaint_id, file_path, mime_type, content_sha256, size_bytes, uploaded_at
     """
     row = await fetchrow(q, payload.complaint_id, payload.file_path, payload.mime_type)
     return row
 
+@router.post("/bulk")
+async def add_evidence_bulk(request: Request):
+    valid, errors = await read_items(request, EvidenceCreate)
+    async with transaction() as conn:
+        return await bulk_insert(
+            conn, "complaintevidence",
+            {"complaint_id": "int", "file_path": "text", "mime_type": "varchar"},
+            valid, errors,
+            references={"complaint_id": ("complaints", "complaint_id")},
+            returning=RETURNING,
+        )
+
+async def _require_complaint(complaint_id: int):
+    # checked before the body is read, so uploads for a missing complaint fail fast
+    if not await fetchrow("SELECT 1 FROM complaints WHERE complaint_id = $1", complaint_id):
+        raise HTTPException(status_code=404, detail="Complaint not found")
+
+
+def _check_mime_type(mime_type: str | None):
+    # validated before anything is written, so a bad value can't orphan a blob
+    if mime_type and len(mime_type) > MIME_TYPE_MAX_LENGTH:
+        raise HTTPException(status_code=422, detail=f"MIME type is limited to {MIME_TYPE_MAX_LENGTH} characters")
+
+
+async def _record_blob(complaint_id: int, staged, sha256: str, size: int, mime_type: str | None):
+    """
+    Moves a staged file into the store and inserts its row in one transaction,
+    under the advisory lock delete_evidence takes before removing a blob, so a
+    concurrent delete can't unlink a blob this row is about to reference.
+    On failure the staged file is back in place for the caller.
+    """
+    q = f"""
+    INSERT INTO complaintevidence (complaint_id, file_path, mime_type, content_sha256, size_bytes)
+    VALUES ($1, $2, $3, $4, $5)
+    RETURNING {RETURNING}
+    """
+    async with transaction() as conn:
+        await execute(BLOB_LOCK_SQL, sha256, conn=conn)
+        created = await asyncio.to_thread(storage.commit_blob, staged, sha256)
+        try:
+            row = await fetchrow(q, complaint_id, storage.relative_path(sha256), mime_type, sha256, size, conn=conn)
+        except BaseException as e:
+            # still under the lock: nothing else can have started referencing a blob made just now
+            if created:
+                await asyncio.to_thread(storage.uncommit_blob, staged, sha256)
+            if isinstance(e, asyncpg.ForeignKeyViolationError):
+                raise HTTPException(status_code=404, detail="Complaint not found")
+            raise
+    storage.schedule_thumbnail(sha256, mime_type)
+    return row
+
+
+@router.post("/upload", status_code=status.HTTP_201_CREATED)
+async def upload_evidence(request: Request, complaint_id: int):
+    """
+    Single-request upload: the raw request body is the file and Content-Type
+    its MIME type. The body is streamed to disk and hashed, never held in
+    memory; a file already in the store is not written twice.
+    """
+    mime_type = request.headers.get("content-type")
+    _check_mime_type(mime_type)
+    await _require_complaint(complaint_id)
+    staged, sha256, size = await storage.save_stream(request.stream())
+    try:
+        return await _record_blob(complaint_id, staged, sha256, size, mime_type)
+    finally:
+        storage.discard(staged)
+
+
+# Resumable uploads: POST creates, PATCH appends at Upload-Offset, HEAD reports
+# the offset after a dropped connection, POST .../complete records the evidence.
+@router.post("/uploads", status_code=status.HTTP_201_CREATED)
+async def start_upload(response: Response):
+    upload_id = storage.new_upload()
+    response.headers["Upload-Offset"] = "0"
+    return {"upload_id": upload_id, "offset": 0}
+
+
+@router.head("/uploads/{upload_id}")
+async def get_upload_offset(upload_id: str):
+    return Response(headers={"Upload-Offset": str(storage.upload_offset(upload_id)),
+                             "Cache-Control": "no-store"})
+
+
+@router.patch("/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def append_upload(request: Request, upload_id: str, upload_offset: int = Header(...)):
+    offset = await storage.append_upload(upload_id, upload_offset, request.stream())
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Upload-Offset": str(offset)})
+
+
+@router.post("/uploads/{upload_id}/complete", status_code=status.HTTP_201_CREATED)
+async def complete_upload(upload_id: str, complaint_id: int,
+                          mime_type: str | None = Query(None, max_length=MIME_TYPE_MAX_LENGTH)):
+    # checked before the upload is consumed; a failure leaves it in place to retry
+    await _require_complaint(complaint_id)
+    staged, sha256, size = await storage.finish_upload(upload_id)
+    try:
+        row = await _record_blob(complaint_id, staged, sha256, size, mime_type)
+    except BaseException:
+        storage.restore_upload(staged, upload_id)
+        raise
+    storage.discard(staged)
+    return row
+
+
+async def _stored(evidence_id: int) -> dict:
+    row = await fetchrow(
+        "SELECT mime_type, content_sha256 FROM complaintevidence WHERE evidence_id = $1", evidence_id
+    )
+    if not row:
+        raise HTTPException(status_code=404, detail="Evidence not found")
+    if not row["content_sha256"]:
+        raise HTTPException(status_code=404, detail="Evidence has no stored file")
+    return row
+
+
+@router.get("/{evidence_id}/content")
+async def get_evidence_content(evidence_id: int):
+    """Serves the stored file; Range requests get 206 partial content."""
+    row = await _stored(evidence_id)
+    path = storage.blob_path(row["content_sha256"])
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Evidence file missing from store")
+    # blobs never change, so the hash is a strong validator
+    return FileResponse(path, media_type=row["mime_type"] or "application/octet-stream",
+                        headers={"ETag": f'"{row["content_sha256"]}"',
+                                 "Cache-Control": "private, max-age=31536000, immutable"})
+
+
+@router.get("/{evidence_id}/thumbnail")
+async def get_evidence_thumbnail(evidence_id: int):
+    if storage.Image is None:
+        raise HTTPException(status_code=501, detail="Thumbnails are not enabled on this server (Pillow is not installed)")
+    row = await _stored(evidence_id)
+    path = storage.thumbnail_path(row["content_sha256"])
+    if not path.exists():
+        # not an image, or still being generated
+        raise HTTPException(status_code=404, detail="Thumbnail not available")
+    return FileResponse(path, media_type="image/jpeg")
+
+
 @router.delete("/{evidence_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_evidence(evidence_id: int):
-    await execute("DELETE FROM complaintevidence WHERE evidence_id = $1", evidence_id)
+async def delete_evidence(evidence_id: int, conn=Depends(get_connection)):
+    row = await fetchrow("SELECT content_sha256 FROM complaintevidence WHERE evidence_id = $1", evidence_id, conn=conn)
+    sha256 = row["content_sha256"] if row else None
+    if not sha256:
+        await execute("DELETE FROM complaintevidence WHERE evidence_id = $1", evidence_id, conn=conn)
+        return None
+    # blobs are shared between rows with identical content. A session lock is
+    # held past the commit until the unlink is done, so an upload of the same
+    # content waits and then writes the blob afresh instead of reusing it.
+    await execute(BLOB_SESSION_LOCK_SQL, sha256, conn=conn)
+    try:
+        async with conn.transaction():
+            await execute("DELETE FROM complaintevidence WHERE evidence_id = $1", evidence_id, conn=conn)
+            remaining = await fetchrow("SELECT 1 FROM complaintevidence WHERE content_sha256 = $1 LIMIT 1",
+                                       sha256, conn=conn)
+        if not remaining:
+            storage.remove_blob(sha256)
+    finally:
+        await execute(BLOB_UNLOCK_SQL, sha256, conn=conn)
     return None
\ No newline at end of file
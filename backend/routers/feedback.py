@@ -1,40 +1,38 @@
-from fastapi import APIRouter, HTTPException, status
+import asyncpg
+from fastapi import APIRouter, HTTPException, Response, status
 from typing import List, Dict, Any
 from database import fetch, fetchrow, execute
+from cache import invalidate
+from statements import register
+from pagination import page_query, next_page
 from schemas import FeedbackCreate, FeedbackOut
 
 router = APIRouter(tags=["Feedback"])
 
+PAGE_KEYS = ("submitted_at", "feedback_id")
+
+GET_SQL = register("feedback.get", "SELECT * FROM feedback WHERE feedback_id = $1")
+
 @router.get("", response_model=List[Dict[str, Any]])
-async def list_feedback(limit: int = 100):
-    query = """
-        SELECT feedback_id, complaint_id, user_id, rating, comments, submitted_at 
-        FROM feedback 
-        ORDER BY submitted_at DESC 
-        LIMIT $1
-    """
-    rows = await fetch(query, limit)
-    return [dict(row) for row in rows]
+async def list_feedback(response: Response, limit: int = 100, cursor: str | None = None):
+    query, args = page_query(
+        "SELECT feedback_id, complaint_id, user_id, rating, comments, submitted_at FROM feedback",
+        PAGE_KEYS, cursor, limit,
+    )
+    rows = await fetch(query, *args)
+    return next_page(response, rows, PAGE_KEYS, limit)
 
 @router.get("/{feedback_id}", response_model=FeedbackOut)
 async def get_feedback(feedback_id: int):
-    row = await fetchrow("SELECT * FROM feedback WHERE feedback_id = $1", feedback_id)
+    row = await fetchrow(GET_SQL, feedback_id)
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Feedback not found")
     return row
 
 @router.post("", response_model=FeedbackOut, status_code=status.HTTP_201_CREATED)
 async def create_feedback(payload: FeedbackCreate):
-    # 1. VALIDATION: Check if IDs exist to prevent 500 Crashes
-    user_exists = await fetchrow("SELECT 1 FROM users WHERE user_id = $1", payload.user_id)
-    if not user_exists:
-        raise HTTPException(status_code=404, detail=f"User ID {payload.user_id} not found")
-
-    complaint_exists = await fetchrow("SELECT 1 FROM complaints WHERE complaint_id = $1", payload.complaint_id)
-    if not complaint_exists:
-        raise HTTPException(status_code=404, detail=f"Complaint ID {payload.complaint_id} not found")
-
-    # 2. INSERT
+    # One round trip: the foreign keys report a missing user or complaint,
+    # which also closes the gap between checking and inserting.
     q = """
     INSERT INTO feedback (complaint_id, user_id, rating, comments)
     VALUES ($1, $2, $3, $4)
@@ -42,7 +40,13 @@ async def create_feedback(payload: FeedbackCreate):
     """
     try:
         row = await fetchrow(q, payload.complaint_id, payload.user_id, payload.rating, payload.comments)
+        # trg_set_complaint_closed_on_feedback may close the complaint
+        invalidate("feedback", "complaints")
         return row
+    except asyncpg.ForeignKeyViolationError as e:
+        if e.constraint_name == "feedback_user_id_fkey":
+            raise HTTPException(status_code=404, detail=f"User ID {payload.user_id} not found")
+        raise HTTPException(status_code=404, detail=f"Complaint ID {payload.complaint_id} not found")
     except Exception as e:
         print(f"DB Error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
@@ -1,14 +1,13 @@
 from fastapi import APIRouter
-from database import get_pool
+from database import fetchrow, pool_stats, replica_set
 
-router = APIRouter()
+router = APIRouter(tags=["Health"])
 
 @router.get("/health")
 async def health():
-    pool = await get_pool()
+    # "ok" is the primary's; a replica out of rotation only shifts reads to the primary
     try:
-        async with pool.acquire() as conn:
-            row = await conn.fetchrow("SELECT NOW() AS now")
-            return {"ok": True, "time": row["now"]}
+        row = await fetchrow("SELECT NOW() AS now")
+        return {"ok": True, "time": row["now"], "pool": pool_stats.snapshot(), "replicas": replica_set.snapshot()}
     except Exception as e:
-        return {"ok": False, "error": str(e)}
+        return {"ok": False, "error": str(e), "pool": pool_stats.snapshot(), "replicas": replica_set.snapshot()}
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Response
+from database import pool_stats, replica_set, single_flight
+from metrics import render
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: request, query and pool histograms plus pool and replica gauges."""
+    return Response(render(pool_stats.snapshot(), single_flight.snapshot(), replica_set.snapshot()), media_type="text/plain; version=0.0.4")
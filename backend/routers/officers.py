@@ -1,14 +1,28 @@
-from fastapi import APIRouter
-from database import fetch, fetchrow, execute
+from fastapi import APIRouter, Request, Response
+from cache import cached_fetch, cached_fetchrow, check_etag
+from pagination import page_query, next_page
+from statements import register
 
 router = APIRouter(tags=["Officers"])
 
+PAGE_KEYS = ("officer_id",)
+
+GET_SQL = register("officers.get", "SELECT * FROM officers WHERE officer_id = $1")
+
 @router.get("/", response_model=list)
-async def list_officers():
-    rows = await fetch("SELECT * FROM officers ORDER BY officer_id")
-    return rows
+async def list_officers(request: Request, response: Response, limit: int = 100,
+                        cursor: str | None = None):
+    q, args = page_query("SELECT * FROM officers", PAGE_KEYS, cursor, limit, descending=False)
+    cached = await cached_fetch(q, *args, tags=("officers",))
+    not_modified = check_etag(request, response, cached.etag)
+    if not_modified:
+        return not_modified
+    return next_page(response, cached.value, PAGE_KEYS, limit)
 
 @router.get("/{officer_id}", response_model=dict)
-async def get_officer(officer_id: int):
-    row = await fetchrow("SELECT * FROM officers WHERE officer_id = $1", officer_id)
-    return row
\ No newline at end of file
+async def get_officer(request: Request, response: Response, officer_id: int):
+    cached = await cached_fetchrow(GET_SQL, officer_id, tags=("officers",))
+    not_modified = check_etag(request, response, cached.etag)
+    if not_modified:
+        return not_modified
+    return cached.value
\ No newline at end of file
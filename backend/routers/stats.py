@@ -1,21 +1,26 @@
 # app/routers/stats.py
-from fastapi import APIRouter
-from database import get_pool
+from fastapi import APIRouter, Request, Response
+from cache import cached_fetchrow, check_etag
+from statements import register
 
 router = APIRouter()
 
+# ComplaintStats holds one row per (status, category, day), not per complaint
+TOTALS_SQL = register("stats.totals", """
+    SELECT
+      COALESCE(SUM(complaint_count), 0)::int AS totalComplaints,
+      COALESCE(SUM(complaint_count) FILTER (WHERE status='Pending'), 0)::int AS pending,
+      COALESCE(SUM(complaint_count) FILTER (WHERE status='Resolved'), 0)::int AS resolved,
+      COALESCE(SUM(complaint_count) FILTER (WHERE status='In Progress'), 0)::int AS inProgress,
+      COALESCE(SUM(complaint_count) FILTER (WHERE status='Closed'), 0)::int AS closed,
+      COALESCE(SUM(complaint_count) FILTER (WHERE status='Rejected'), 0)::int AS rejected
+    FROM ComplaintStats
+""")
+
 @router.get("/complaints/stats")
-async def complaints_stats():
-    pool = await get_pool()
-    async with pool.acquire() as conn:
-        r = await conn.fetchrow("""
-            SELECT
-              COUNT(*)::int AS totalComplaints,
-              COUNT(*) FILTER (WHERE status='Pending')::int AS pending,
-              COUNT(*) FILTER (WHERE status='Resolved')::int AS resolved,
-              COUNT(*) FILTER (WHERE status='In Progress')::int AS inProgress,
-              COUNT(*) FILTER (WHERE status='Closed')::int AS closed,
-              COUNT(*) FILTER (WHERE status='Rejected')::int AS rejected
-            FROM Complaints
-        """)
-        return dict(r)
+async def complaints_stats(request: Request, response: Response):
+    cached = await cached_fetchrow(TOTALS_SQL, tags=("complaints",))
+    not_modified = check_etag(request, response, cached.etag)
+    if not_modified:
+        return not_modified
+    return cached.value
@@ -1,25 +1,35 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Response, status
 from typing import List
 from database import fetch, fetchrow, execute
+from cache import invalidate, query_cache
+from statements import register
+from pagination import page_query, next_page
 from schemas import UserCreate, UserOut
 
 router = APIRouter(tags=["Users"])
 
 
+GET_SQL = register(
+    "users.get", "SELECT user_id, name, email, phone, role, created_at FROM users WHERE user_id = $1"
+)
+
+# users are listed oldest first; the serial id follows creation order
+PAGE_KEYS = ("user_id",)
+
+
 @router.get("/", response_model=List[UserOut])
-async def list_users():
-    rows = await fetch(
-        "SELECT user_id, name, email, phone, role, created_at FROM users ORDER BY user_id"
+async def list_users(response: Response, limit: int = 100, cursor: str | None = None):
+    q, args = page_query(
+        "SELECT user_id, name, email, phone, role, created_at FROM users",
+        PAGE_KEYS, cursor, limit, descending=False,
     )
-    return rows
+    rows = await fetch(q, *args)
+    return next_page(response, rows, PAGE_KEYS, limit)
 
 
 @router.get("/{user_id}", response_model=UserOut)
 async def get_user(user_id: int):
-    row = await fetchrow(
-        "SELECT user_id, name, email, phone, role, created_at FROM users WHERE user_id = $1",
-        user_id,
-    )
+    row = await fetchrow(GET_SQL, user_id)
     if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return row
@@ -35,6 +45,7 @@ async def create_user(payload: UserCreate):
     """
     try:
         row = await fetchrow(query, payload.name, payload.email, payload.phone, payload.role, payload.password_hash)
+        invalidate("users")
         return row
     except Exception as e:
         # simple conflict handling
@@ -46,4 +57,6 @@ async def create_user(payload: UserCreate):
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(user_id: int):
     await execute("DELETE FROM users WHERE user_id = $1", user_id)
+    # cascades to the user's complaints, feedback and officer records
+    query_cache.clear()
     return None
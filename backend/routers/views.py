@@ -1,26 +1,77 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from typing import List, Dict, Any
+from datetime import datetime
 from database import fetch, fetchrow
+from cache import cached_call, cached_fetch, check_etag, json_page_response, invalidate
+from export import export_response, time_range
+from pagination import page_query, fetch_json_page, json_page_sql
+from statements import register
+from schemas import OfficerWorkloadSummaryOut
 
 router = APIRouter(tags=["Views & Functions"])
 
+COMPLAINT_SUMMARY_KEYS = ("submitted_at", "complaint_id")
+FEEDBACK_SUMMARY_KEYS = ("submitted_at", "feedback_id")
+
+# tables behind each view, used to invalidate cached pages
+COMPLAINT_SUMMARY_TABLES = ("complaints", "users", "complaintassignments", "officers")
+FEEDBACK_SUMMARY_TABLES = ("feedback",) + COMPLAINT_SUMMARY_TABLES
+
+COMPLAINT_SUMMARY_SQL = "SELECT * FROM complaintsummary"
+FEEDBACK_SUMMARY_SQL = "SELECT * FROM feedbacksummary"
+
+# first pages are what the dashboard polls; keep them prepared on every connection
+register("views.complaint_summary",
+         json_page_sql(page_query(COMPLAINT_SUMMARY_SQL, COMPLAINT_SUMMARY_KEYS)[0], COMPLAINT_SUMMARY_KEYS))
+register("views.feedback_summary",
+         json_page_sql(page_query(FEEDBACK_SUMMARY_SQL, FEEDBACK_SUMMARY_KEYS)[0], FEEDBACK_SUMMARY_KEYS))
+
+
+async def _json_page(request: Request, select: str, keys, cursor, limit: int, tags):
+    q, args = page_query(select, keys, cursor, limit)
+    cached = await cached_call(("json_page", q, tuple(args)),
+                               lambda: fetch_json_page(q, args, keys, limit, shared=True, replica=True), tags)
+    return json_page_response(request, cached)
+
+
 @router.get("/complaint_summary", response_model=List[Dict[str, Any]])
-async def complaint_summary(limit: int = 100):
+async def complaint_summary(request: Request, limit: int = 100, cursor: str | None = None):
     """
     Fetches data for the Admin Dashboard graphs.
-    Converts asyncpg Records to Dicts to prevent serialization errors.
+    Pass the X-Next-Cursor header back as `cursor` to read older complaints.
+    Rows are rendered to JSON by Postgres and returned as-is.
     """
     # Query the view ComplaintSummary
-    rows = await fetch("SELECT * FROM complaintsummary ORDER BY submitted_at DESC LIMIT $1", limit)
-    # ✅ FIX: Convert Record objects to dictionaries
-    return [dict(row) for row in rows]
+    return await _json_page(request, COMPLAINT_SUMMARY_SQL, COMPLAINT_SUMMARY_KEYS, cursor, limit,
+                            COMPLAINT_SUMMARY_TABLES)
 
 
 @router.get("/feedback_summary", response_model=List[Dict[str, Any]])
-async def feedback_summary(limit: int = 100):
-    rows = await fetch("SELECT * FROM feedbacksummary ORDER BY submitted_at DESC LIMIT $1", limit)
-    # ✅ FIX: Convert Record objects to dictionaries
-    return [dict(row) for row in rows]
+async def feedback_summary(request: Request, limit: int = 100, cursor: str | None = None):
+    return await _json_page(request, FEEDBACK_SUMMARY_SQL, FEEDBACK_SUMMARY_KEYS, cursor, limit,
+                            FEEDBACK_SUMMARY_TABLES)
+
+
+def _summary_export(view: str, order: str, fmt: str, since, until):
+    args = []
+    where = time_range("submitted_at", since, until, args)
+    q = f"SELECT * FROM {view}"
+    if where:
+        q += " WHERE " + " AND ".join(where)
+    q += f" ORDER BY {order}"
+    return export_response(q, *args, fmt=fmt, filename=view)
+
+
+@router.get("/complaint_summary/export")
+async def export_complaint_summary(format: str = "ndjson", since: datetime | None = None,
+                                   until: datetime | None = None):
+    return _summary_export("complaintsummary", "submitted_at, complaint_id", format, since, until)
+
+
+@router.get("/feedback_summary/export")
+async def export_feedback_summary(format: str = "ndjson", since: datetime | None = None,
+                                  until: datetime | None = None):
+    return _summary_export("feedbacksummary", "submitted_at, feedback_id", format, since, until)
 
 
 @router.get("/file_complaint/{user_id}")
@@ -29,12 +80,31 @@ async def file_complaint(user_id: int, category: str, description: str, location
     row = await fetchrow("SELECT file_complaint($1,$2,$3,$4) AS complaint_id", user_id, category, description, location)
     if not row:
         raise HTTPException(status_code=400, detail="Could not file complaint")
+    invalidate("complaints")
     # This was already fine because you manually constructed the dict
     return {"complaint_id": row["complaint_id"]}
 
 
+# open/aged counts read OfficerLoad and Complaints; names come from officers and users
+WORKLOAD_TABLES = ("complaints", "complaintassignments", "officers", "officerload", "users")
+WORKLOAD_SQL = "SELECT * FROM officers_workload($1, $2, $3)"
+
+
+@router.get("/officer_workload", response_model=List[OfficerWorkloadSummaryOut])
+async def officers_workload(request: Request, response: Response, department: str | None = None,
+                            aged_days: int = 7, window_days: int = 90):
+    """
+    Workload for every officer in one call: open and aged-pending cases
+    (older than `aged_days`), and the median hours to resolve over the last
+    `window_days`. Filter by `department`.
+    """
+    cached = await cached_fetch(WORKLOAD_SQL, department, aged_days, window_days, tags=WORKLOAD_TABLES)
+    not_modified = check_etag(request, response, cached.etag)
+    if not_modified:
+        return not_modified
+    return cached.value
+
+
 @router.get("/officer_workload/{officer_id}")
 async def officer_workload(officer_id: int):
-    rows = await fetch("SELECT * FROM officer_workload($1)", officer_id)
-    # ✅ FIX: Convert Record objects to dictionaries
-    return [dict(row) for row in rows]
\ No newline at end of file
+    return await fetch("SELECT * FROM officer_workload($1)", officer_id, replica=True)
\ No newline at end of file
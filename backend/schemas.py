@@ -23,9 +23,10 @@ class UserOut(BaseModel):
 # Complaints
 class ComplaintCreate(BaseModel):
     user_id: int
-    category: Optional[str]
+    # column widths, so an oversized value is a validation error rather than a failed insert
+    category: Optional[str] = Field(max_length=100)
     description: Optional[str]
-    location: Optional[str]
+    location: Optional[str] = Field(max_length=255)
 
 
 class ComplaintOut(BaseModel):
@@ -38,6 +39,12 @@ class ComplaintOut(BaseModel):
     submitted_at: datetime
     resolved_at: Optional[datetime] = None
     last_updated_at: Optional[datetime] = None 
+    current_officer_id: Optional[int] = None
+
+
+class ComplaintSearchOut(ComplaintOut):
+    rank: float
+    highlight: Optional[str] = None
 
 # ComplaintSummary view
 class ComplaintSummaryOut(BaseModel):
@@ -79,4 +86,43 @@ class UserRegister(BaseModel):
     email: EmailStr
     phone: Optional[str] = None
     role: str = Field(default="citizen", pattern="^(citizen|officer|admin)$")
-    password: str
\ No newline at end of file
+    password: str
+
+# Bulk ingestion items (actions and assignments take query params on the single-row routes)
+class ActionCreate(BaseModel):
+    complaint_id: int
+    officer_id: int
+    action_taken: str
+    is_final: bool = False
+
+
+class AssignmentCreate(BaseModel):
+    complaint_id: int
+    officer_id: int
+    assigned_by: Optional[int] = None
+
+
+# officer_workload(officer_id) SQL function
+class OfficerWorkloadOut(BaseModel):
+    officer_name: str
+    total_assigned: int
+    resolved: int
+    pending: int
+
+
+# officers_workload() SQL function: one row per officer
+class OfficerWorkloadSummaryOut(BaseModel):
+    officer_id: int
+    officer_name: str
+    department: Optional[str]
+    designation: Optional[str]
+    open_count: int
+    aged_pending: int
+    oldest_pending_at: Optional[datetime]
+    resolved_in_window: int
+    median_resolve_hours: Optional[float]
+
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
@@ -0,0 +1,66 @@
+# app/security.py
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from fastapi import HTTPException
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# bcrypt releases the GIL, so a small thread pool hashes in parallel without blocking the loop
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+# hashes queued or running before new requests are turned away with 503
+HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+
+_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+_pending = 0
+
+# verified when the email is unknown so login takes the same time either way
+_DUMMY_HASH = bcrypt.hashpw(b"not-a-real-password", bcrypt.gensalt(BCRYPT_ROUNDS))
+
+
+async def _run(fn, *args):
+    global _pending
+    if _pending >= HASH_MAX_PENDING:
+        raise HTTPException(status_code=503, detail="Too many concurrent password operations",
+                            headers={"Retry-After": "1"})
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _pending -= 1
+
+
+def _secret(password: str) -> bytes:
+    # bcrypt only uses the first 72 bytes and newer releases reject longer input
+    return password.encode()[:72]
+
+
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+
+
+def _verify(password: str, password_hash: str | None) -> tuple[bool, bool]:
+    if not password_hash:
+        bcrypt.checkpw(_secret(password), _DUMMY_HASH)
+        return False, False
+    try:
+        ok = bcrypt.checkpw(_secret(password), password_hash.encode())
+    except ValueError:
+        # seed rows and legacy rows don't hold a bcrypt hash
+        return False, False
+    # "$2b$12$..." -> cost factor 12
+    rounds = int(password_hash.split("$")[2])
+    return ok, rounds != BCRYPT_ROUNDS
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password)
+
+
+async def verify_password(password: str, password_hash: str | None) -> tuple[bool, bool]:
+    """Returns (matches, needs_rehash); needs_rehash is set when BCRYPT_ROUNDS changed."""
+    return await _run(_verify, password, password_hash)
+
+
+def pending() -> int:
+    return _pending
@@ -0,0 +1,102 @@
+# app/snapshot.py
+import asyncio
+import os
+import time
+from fastapi import HTTPException
+from database import fetch
+
+# per-table reads in flight at once; keeps the dashboard from draining the pool
+SNAPSHOT_CONCURRENCY = int(os.getenv("SNAPSHOT_CONCURRENCY", 4))
+CATALOG_TTL = float(os.getenv("SNAPSHOT_CATALOG_TTL", 300))
+DEFAULT_ROW_LIMIT = 200
+# upper bound for `limit` and "table:n"; larger requests get this many rows
+SNAPSHOT_MAX_ROWS = int(os.getenv("SNAPSHOT_MAX_ROWS", DEFAULT_ROW_LIMIT))
+
+_catalog: dict[str, list[str]] | None = None
+_catalog_loaded_at = 0.0
+
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+async def get_catalog(refresh: bool = False) -> dict[str, list[str]]:
+    """
+    Table -> column names for the public schema, fetched in one query and
+    cached for SNAPSHOT_CATALOG_TTL seconds.
+    """
+    global _catalog, _catalog_loaded_at
+    if refresh or _catalog is None or time.monotonic() - _catalog_loaded_at > CATALOG_TTL:
+        rows = await fetch("""
+            SELECT c.table_name::text AS table_name,
+                   array_agg(c.column_name::text ORDER BY c.ordinal_position) AS columns
+            FROM information_schema.columns c
+            JOIN information_schema.tables t
+              ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+            JOIN pg_class pc
+              ON pc.oid = (quote_ident(t.table_schema) || '.' || quote_ident(t.table_name))::regclass
+            WHERE t.table_schema = 'public'
+              AND t.table_type = 'BASE TABLE'
+              AND NOT pc.relispartition
+              AND c.data_type <> 'tsvector'
+            GROUP BY c.table_name
+            ORDER BY c.table_name
+        """, shared=True, replica=True)
+        _catalog = {r["table_name"]: list(r["columns"]) for r in rows}
+        _catalog_loaded_at = time.monotonic()
+    return _catalog
+
+
+def _parse_columns(specs, catalog) -> dict[str, list[str]]:
+    # "table.column" entries -> {table: [column, ...]}
+    selected: dict[str, list[str]] = {}
+    for spec in specs or []:
+        table, _, column = spec.partition(".")
+        if column not in catalog.get(table, ()):
+            raise HTTPException(status_code=400, detail=f"Unknown column '{spec}'")
+        selected.setdefault(table, []).append(column)
+    return selected
+
+
+def _parse_limits(specs, catalog) -> dict[str, int]:
+    # "table:n" entries -> {table: n}
+    limits = {}
+    for spec in specs or []:
+        table, _, n = spec.partition(":")
+        if table not in catalog or not n.isdigit():
+            raise HTTPException(status_code=400, detail=f"Invalid table limit '{spec}'")
+        limits[table] = min(int(n), SNAPSHOT_MAX_ROWS)
+    return limits
+
+
+async def take_snapshot(tables=None, columns=None, table_limits=None,
+                        limit: int = DEFAULT_ROW_LIMIT, refresh: bool = False) -> dict[str, list]:
+    """
+    Reads the first `limit` rows of each table, at most SNAPSHOT_MAX_ROWS.
+    The per-table queries run concurrently, capped at SNAPSHOT_CONCURRENCY
+    connections, so the total time tracks the slowest table instead of the
+    sum of all of them. Reads are shared, so a burst of identical snapshots
+    runs each table query once.
+    """
+    catalog = await get_catalog(refresh)
+    names = tables or list(catalog)
+    unknown = [t for t in names if t not in catalog]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown table(s): {', '.join(unknown)}")
+    selected = _parse_columns(columns, catalog)
+    limits = _parse_limits(table_limits, catalog)
+    limit = max(0, min(limit, SNAPSHOT_MAX_ROWS))
+
+    semaphore = asyncio.Semaphore(SNAPSHOT_CONCURRENCY)
+
+    async def read(table: str):
+        cols = ", ".join(quote_ident(c) for c in selected.get(table, ())) or "*"
+        async with semaphore:
+            rows = await fetch(
+                f"SELECT {cols} FROM {quote_ident(table)} LIMIT $1", limits.get(table, limit),
+                shared=True,
+                replica=True,
+            )
+        return table, rows
+
+    return dict(await asyncio.gather(*(read(t) for t in names)))
@@ -0,0 +1,20 @@
+# app/statements.py
+"""
+Registry of named hot statements. database.py prepares every registered
+statement on each pooled connection as it opens, so the first request on a
+connection doesn't pay for parsing and planning.
+"""
+
+_registry: dict[str, str] = {}
+
+
+def register(name: str, sql: str) -> str:
+    """Registers `sql` under `name` and returns the SQL so callers can keep using it."""
+    if _registry.get(name, sql) != sql:
+        raise ValueError(f"Statement '{name}' is already registered with different SQL")
+    _registry[name] = sql
+    return sql
+
+
+def registered() -> dict[str, str]:
+    return dict(_registry)
@@ -0,0 +1,243 @@
+# app/storage.py
+"""
+Content-addressed store for evidence files, rooted at EVIDENCE_STORE:
+
+    blobs/ab/ab12...        file contents, named by their SHA-256
+    uploads/<upload_id>     partial resumable uploads
+    uploads/<id>.staged     hashed files waiting to be committed with their row
+    thumbs/ab/ab12....jpg   thumbnails for image blobs
+
+Identical files are stored once; complaintevidence rows point at the hash.
+"""
+import asyncio
+import fcntl
+import hashlib
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from fastapi import HTTPException
+
+try:
+    from PIL import Image
+except ImportError:  # thumbnails are skipped without Pillow
+    Image = None
+
+EVIDENCE_STORE = Path(os.getenv("EVIDENCE_STORE", "evidence_store"))
+EVIDENCE_MAX_BYTES = int(os.getenv("EVIDENCE_MAX_BYTES", 100 * 1024 * 1024))
+# request body chunks are buffered up to this size before each disk write
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
+# partial uploads untouched for this long are removed by `maintenance.py evidence-uploads`
+UPLOAD_TTL_HOURS = int(os.getenv("UPLOAD_TTL_HOURS", 24))
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", 320))
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", 2))
+
+_UPLOAD_ID = re.compile(r"^[0-9a-f]{32}$")
+
+_thumb_executor = ThreadPoolExecutor(max_workers=THUMBNAIL_WORKERS, thread_name_prefix="thumbnail")
+_thumb_jobs: set = set()
+
+
+def blob_path(sha256: str) -> Path:
+    return EVIDENCE_STORE / "blobs" / sha256[:2] / sha256
+
+
+def thumbnail_path(sha256: str) -> Path:
+    return EVIDENCE_STORE / "thumbs" / sha256[:2] / f"{sha256}.jpg"
+
+
+def relative_path(sha256: str) -> str:
+    """What goes in complaintevidence.file_path for a stored blob."""
+    return blob_path(sha256).relative_to(EVIDENCE_STORE).as_posix()
+
+
+def _upload_path(upload_id: str) -> Path:
+    if not _UPLOAD_ID.match(upload_id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return EVIDENCE_STORE / "uploads" / upload_id
+
+
+async def _write(f, chunks, size: int) -> int:
+    """Appends an async byte stream to `f` in UPLOAD_CHUNK_SIZE writes; returns the new size."""
+    buf = bytearray()
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > EVIDENCE_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"Evidence files are limited to {EVIDENCE_MAX_BYTES} bytes")
+        buf += chunk
+        if len(buf) >= UPLOAD_CHUNK_SIZE:
+            await asyncio.to_thread(f.write, bytes(buf))
+            buf.clear()
+    if buf:
+        await asyncio.to_thread(f.write, bytes(buf))
+    return size
+
+
+def _hash_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(UPLOAD_CHUNK_SIZE):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _staged_path() -> Path:
+    return EVIDENCE_STORE / "uploads" / f"{uuid.uuid4().hex}.staged"
+
+
+def commit_blob(staged: Path, sha256: str) -> bool:
+    """
+    Moves a staged file into the blob store unless the blob already exists,
+    in which case the staged copy is left for discard(). Returns whether a new
+    blob was created. Call it under the evidence lock for `sha256` (see
+    routers/evidence.py), so a delete can't remove the blob in between.
+    """
+    dest = blob_path(sha256)
+    if dest.exists():
+        return False
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(staged, dest)
+    return True
+
+
+def uncommit_blob(staged: Path, sha256: str):
+    """Undoes a commit_blob that created the blob, when its row couldn't be inserted."""
+    os.replace(blob_path(sha256), staged)
+
+
+def discard(staged: Path):
+    staged.unlink(missing_ok=True)
+
+
+async def save_stream(chunks) -> tuple[Path, str, int]:
+    """
+    Writes a whole upload from an async byte stream to a staged file;
+    returns (staged path, sha256, size) for commit_blob.
+    """
+    tmp = _staged_path()
+    tmp.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(tmp, "wb") as f:
+            size = await _write(f, chunks, 0)
+        sha256 = await asyncio.to_thread(_hash_file, tmp)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return tmp, sha256, size
+
+
+def new_upload() -> str:
+    upload_id = uuid.uuid4().hex
+    path = _upload_path(upload_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload_id
+
+
+def upload_offset(upload_id: str) -> int:
+    try:
+        return _upload_path(upload_id).stat().st_size
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+
+def _open_locked(upload_id: str, mode: str):
+    """
+    Opens an existing partial upload holding an exclusive flock, which is
+    shared by every worker process; another writer holding it is a 409.
+    """
+    path = _upload_path(upload_id)
+    try:
+        # no O_CREAT: an upload finished or purged meanwhile must not be recreated
+        fd = os.open(path, (os.O_WRONLY | os.O_APPEND) if mode == "ab" else os.O_RDONLY)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    f = os.fdopen(fd, mode)
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        raise HTTPException(status_code=409, detail="Upload is being written by another request",
+                            headers={"Upload-Offset": str(upload_offset(upload_id))})
+    return f
+
+
+async def append_upload(upload_id: str, offset: int, chunks) -> int:
+    """
+    Appends a chunk stream at `offset`, which must equal the bytes received so
+    far; a mismatch is a 409 carrying the current offset so the client can resume.
+    """
+    with _open_locked(upload_id, "ab") as f:
+        current = os.fstat(f.fileno()).st_size
+        if offset != current:
+            raise HTTPException(status_code=409, detail="Offset mismatch",
+                                headers={"Upload-Offset": str(current)})
+        return await _write(f, chunks, current)
+
+
+def _stage_upload(upload_id: str) -> tuple[Path, str, int]:
+    with _open_locked(upload_id, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        h = hashlib.sha256()
+        while block := f.read(UPLOAD_CHUNK_SIZE):
+            h.update(block)
+        # renamed while still locked, so no append can land after the hash
+        staged = _staged_path()
+        os.replace(_upload_path(upload_id), staged)
+    return staged, h.hexdigest(), size
+
+
+async def finish_upload(upload_id: str) -> tuple[Path, str, int]:
+    """Hashes a completed resumable upload; returns (staged path, sha256, size) for commit_blob."""
+    return await asyncio.to_thread(_stage_upload, upload_id)
+
+
+def restore_upload(staged: Path, upload_id: str):
+    """Puts a staged upload back under its id, so the client can retry completing it."""
+    if staged.exists():
+        os.replace(staged, _upload_path(upload_id))
+
+
+def remove_blob(sha256: str):
+    blob_path(sha256).unlink(missing_ok=True)
+    thumbnail_path(sha256).unlink(missing_ok=True)
+
+
+def purge_stale_uploads(max_age_hours: int = UPLOAD_TTL_HOURS) -> int:
+    uploads = EVIDENCE_STORE / "uploads"
+    if not uploads.exists():
+        return 0
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for path in uploads.iterdir():
+        if path.stat().st_mtime < cutoff:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def _make_thumbnail(sha256: str):
+    dest = thumbnail_path(sha256)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_suffix(".tmp")
+    try:
+        with Image.open(blob_path(sha256)) as im:
+            # lets JPEG decode at a reduced scale instead of full resolution
+            im.draft("RGB", (THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            im.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            im.convert("RGB").save(tmp, "JPEG", quality=80)
+        os.replace(tmp, dest)
+    except Exception as e:
+        tmp.unlink(missing_ok=True)
+        print(f"❌ Thumbnail failed for {sha256}:", e)
+
+
+def schedule_thumbnail(sha256: str, mime_type: str | None):
+    """Queues a thumbnail for image blobs on the worker pool; returns immediately."""
+    if Image is None or not (mime_type or "").startswith("image/") or thumbnail_path(sha256).exists():
+        return
+    job = asyncio.get_running_loop().run_in_executor(_thumb_executor, _make_thumbnail, sha256)
+    _thumb_jobs.add(job)
+    job.add_done_callback(_thumb_jobs.discard)
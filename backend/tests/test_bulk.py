@@ -0,0 +1,106 @@
+import asyncio
+import contextlib
+import json
+import asyncpg
+import pytest
+from fastapi import HTTPException, Request
+import bulk
+from bulk import bulk_insert, read_items
+from schemas import AssignmentCreate
+
+COLUMNS = {"complaint_id": "int", "officer_id": "int", "assigned_by": "int"}
+REFERENCES = {"complaint_id": ("complaints", "complaint_id"), "officer_id": ("officers", "officer_id")}
+
+
+def _request(chunks: list[bytes], content_type: str) -> Request:
+    messages = [{"type": "http.request", "body": c, "more_body": True} for c in chunks]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+
+    async def receive():
+        return messages.pop(0)
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": [(b"content-type", content_type.encode())]}
+    return Request(scope, receive)
+
+
+class FakeConnection:
+    """Existing parent ids per table; the batch INSERT fails if any officer_id is in `bad`."""
+
+    def __init__(self, existing: dict[str, set], bad: set = frozenset()):
+        self.existing = existing
+        self.bad = bad
+        self.inserts = []
+
+    @contextlib.asynccontextmanager
+    async def _savepoint(self):
+        yield
+
+    def transaction(self):
+        return self._savepoint()
+
+    async def fetch(self, query, *args):
+        if query.lstrip().startswith("SELECT"):
+            table = query.split(" FROM ")[1].split()[0]
+            return [{query.split()[1]: i} for i in args[0] if i in self.existing[table]]
+        self.inserts.append(len(args[0]))
+        if self.bad & set(args[1]):
+            raise asyncpg.StringDataRightTruncationError("value too long")
+        return [{"complaint_id": c, "officer_id": o} for c, o in zip(args[0], args[1])]
+
+    async def fetchrow(self, query, *args):
+        return (await self.fetch(query, *args))[0]
+
+
+def test_read_items_reports_bad_ndjson_rows_by_index():
+    lines = [{"complaint_id": 1, "officer_id": 2}, "not json", {"complaint_id": "x", "officer_id": 2},
+             {"complaint_id": 3, "officer_id": 4, "assigned_by": 5}]
+    body = b"\n".join(l.encode() if isinstance(l, str) else json.dumps(l).encode() for l in lines)
+    # split mid-line, so rows are reassembled across chunks
+    request = _request([body[:10], body[10:37], body[37:]], "application/x-ndjson")
+
+    valid, errors = asyncio.run(read_items(request, AssignmentCreate))
+    assert [i for i, _ in valid] == [0, 3]
+    assert valid[1][1].assigned_by == 5
+    assert [e["index"] for e in errors] == [1, 2]
+    assert errors[1]["error"].startswith("complaint_id:")
+
+
+def test_read_items_rejects_non_arrays_and_oversized_batches(monkeypatch):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(read_items(_request([b'{"complaint_id": 1}'], "application/json"), AssignmentCreate))
+    assert exc.value.status_code == 400
+
+    monkeypatch.setattr(bulk, "BULK_MAX_ROWS", 2)
+    for body, content_type in ((b"[{}, {}, {}]", "application/json"), (b"{}\n{}\n{}\n", "application/x-ndjson")):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(read_items(_request([body], content_type), AssignmentCreate))
+        assert exc.value.status_code == 413
+
+
+def test_missing_parents_are_reported_per_row_and_the_rest_inserted_in_one_statement():
+    conn = FakeConnection({"complaints": {1, 2, 3}, "officers": {10, 11}})
+    valid = [(0, AssignmentCreate(complaint_id=1, officer_id=10)),
+             (1, AssignmentCreate(complaint_id=99, officer_id=10)),
+             (2, AssignmentCreate(complaint_id=2, officer_id=12)),
+             (4, AssignmentCreate(complaint_id=3, officer_id=11))]
+    errors = [{"index": 3, "ok": False, "error": "complaint_id: missing"}]
+
+    result = asyncio.run(bulk_insert(conn, "complaintassignments", COLUMNS, valid, errors, REFERENCES,
+                                     returning="complaint_id, officer_id"))
+    assert conn.inserts == [2]
+    assert (result["inserted"], result["failed"]) == (2, 3)
+    assert [r["index"] for r in result["results"]] == [0, 1, 2, 3, 4]
+    assert result["results"][1]["error"] == "complaint_id 99 not found"
+    assert result["results"][2]["error"] == "officer_id 12 not found"
+    assert result["results"][4]["row"] == {"complaint_id": 3, "officer_id": 11}
+
+
+def test_a_rejected_batch_is_retried_row_by_row():
+    conn = FakeConnection({"complaints": {1, 2, 3}, "officers": {10, 11, 12}}, bad={11})
+    valid = [(i, AssignmentCreate(complaint_id=i + 1, officer_id=10 + i)) for i in range(3)]
+
+    result = asyncio.run(bulk_insert(conn, "complaintassignments", COLUMNS, valid, [], REFERENCES,
+                                     returning="complaint_id, officer_id"))
+    assert conn.inserts == [3, 1, 1, 1]
+    assert (result["inserted"], result["failed"]) == (2, 1)
+    assert result["results"][1] == {"index": 1, "ok": False, "error": "value too long"}
@@ -0,0 +1,117 @@
+import asyncio
+from fastapi import Request, Response
+import cache
+from cache import QueryCache, cached_call, check_etag, json_page_response, make_etag
+
+
+def _request(if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    c = QueryCache(ttl=30)
+    c.set("default", 1)
+    c.set("short", 2, ttl=5)
+
+    now[0] += 10
+    assert c.get("short") is None
+    assert c.get("default").value == 1
+    now[0] += 25
+    assert c.get("default") is None
+    assert c.stats()["entries"] == 0
+    assert (c.hits, c.misses) == (1, 2)
+
+
+def test_least_recently_used_entry_is_evicted():
+    c = QueryCache(max_entries=2)
+    c.set("a", 1, tags=("users",))
+    c.set("b", 2, tags=("users",))
+    c.get("a")
+    c.set("c", 3)
+
+    assert c.get("b") is None
+    assert c.get("a").value == 1 and c.get("c").value == 3
+    assert c.evictions == 1
+    # the evicted key is gone from its tag too
+    assert c.invalidate("users") == 1
+
+
+def test_invalidate_drops_only_tagged_entries():
+    c = QueryCache()
+    c.set("stats", 1, tags=("complaints",))
+    c.set("summary", 2, tags=("complaints", "users"))
+    c.set("officers", 3, tags=("officers",))
+
+    assert c.invalidate("users") == 1
+    assert c.get("summary") is None
+    assert c.get("stats").value == 1
+    assert c.invalidate("complaints", "users") == 1
+    assert c.get("officers").value == 3
+
+
+def test_result_read_before_a_write_is_served_but_not_kept():
+    c = QueryCache()
+    generation = c.generation(("complaints",))
+    c.invalidate("complaints")
+    entry = c.set("stats", ["old"], tags=("complaints",), generation=generation)
+
+    assert entry.value == ["old"]
+    assert c.get("stats") is None
+    # other tags' generations are unaffected, and clear() moves every generation on
+    users = c.generation(("users",))
+    assert c.set("users", 1, tags=("users",), generation=users) is c.get("users")
+    c.clear()
+    c.set("users", 2, tags=("users",), generation=users)
+    assert c.get("users") is None
+
+
+def test_cached_call_skips_storing_a_fill_raced_by_a_write(monkeypatch):
+    monkeypatch.setattr(cache, "query_cache", QueryCache())
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        if len(loads) == 1:
+            cache.invalidate("complaints")
+        return len(loads)
+
+    async def main():
+        first = await cached_call("k", loader, tags=("complaints",))
+        second = await cached_call("k", loader, tags=("complaints",))
+        third = await cached_call("k", loader, tags=("complaints",))
+        return first.value, second.value, third.value
+
+    assert asyncio.run(main()) == (1, 2, 2)
+    assert len(loads) == 2
+
+
+def test_etag_follows_the_value():
+    assert make_etag([{"a": 1, "b": 2}]) == make_etag([{"b": 2, "a": 1}])
+    assert make_etag([1]) != make_etag([2])
+    assert make_etag((b"[1]", "cursor")) != make_etag((b"[1]", None))
+
+
+def test_check_etag_answers_304_for_a_matching_validator():
+    etag = make_etag(["row"])
+    response = Response()
+    assert check_etag(_request(), response, etag) is None
+    assert response.headers["ETag"] == etag
+
+    for header in (etag, f'"other", {etag}', "*"):
+        not_modified = check_etag(_request(header), Response(), etag)
+        assert not_modified.status_code == 304
+        assert not_modified.headers["ETag"] == etag
+    assert check_etag(_request('"other"'), Response(), etag) is None
+
+
+def test_json_page_response_carries_etag_and_cursor():
+    c = QueryCache()
+    entry = c.set("page", (b'[{"id":1}]', "abc"))
+    response = json_page_response(_request(), entry)
+    assert response.body == b'[{"id":1}]'
+    assert response.headers["ETag"] == entry.etag
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert json_page_response(_request(entry.etag), entry).status_code == 304
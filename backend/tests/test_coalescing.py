@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+import database
+from cache import QueryCache
+from database import SingleFlight, primary_reads
+
+
+def test_concurrent_identical_calls_share_one_run():
+    sf = SingleFlight()
+    runs = []
+
+    async def query():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return ["row"]
+
+    async def main():
+        return await asyncio.gather(*(sf.do(("fetch", "SELECT 1", ()), query) for _ in range(20)))
+
+    assert asyncio.run(main()) == [["row"]] * 20
+    assert len(runs) == 1
+    assert sf.snapshot() == {"leaders": 1, "collapsed": 19, "in_flight": 0}
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    sf = SingleFlight()
+
+    async def query():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        results = await asyncio.gather(*(sf.do(("k",), query) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        # a later call runs again rather than getting the stale failure
+        return await sf.do(("k",), lambda: asyncio.sleep(0, "ok"))
+
+    assert asyncio.run(main()) == "ok"
+    assert sf.leaders == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    sf = SingleFlight()
+
+    async def query():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(sf.do(("k",), query))
+        second = asyncio.ensure_future(sf.do(("k",), query))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_unhashable_arguments_run_uncoalesced():
+    sf = SingleFlight()
+
+    async def main():
+        return await sf.do(("fetch", "SELECT $1", ([1, 2],)), lambda: asyncio.sleep(0, "rows"))
+
+    assert asyncio.run(main()) == "rows"
+    assert sf.snapshot() == {"leaders": 0, "collapsed": 0, "in_flight": 0}
+
+
+def test_pinned_and_replica_reads_do_not_share(monkeypatch):
+    calls = []
+
+    async def read(method, query, args, replica):
+        calls.append(database._pinned.get())
+        await asyncio.sleep(0.01)
+        return "primary" if database._pinned.get() else "replica"
+
+    monkeypatch.setattr(database, "_read", read)
+    monkeypatch.setattr(database, "single_flight", SingleFlight())
+
+    async def pinned():
+        with primary_reads():
+            return await database._call("fetch", "SELECT 1", (), None, True, True)
+
+    async def main():
+        return await asyncio.gather(database._call("fetch", "SELECT 1", (), None, True, True), pinned())
+
+    assert asyncio.run(main()) == ["replica", "primary"]
+    assert sorted(calls) == [False, True]
+
+
+def test_changed_within_tracks_invalidated_tags():
+    cache = QueryCache()
+    assert not cache.changed_within(["complaints"], 10)
+    cache.invalidate("complaints")
+    assert cache.changed_within(["users", "complaints"], 10)
+    assert not cache.changed_within(["users"], 10)
+    assert not cache.changed_within(["complaints"], 0)
+
+
+def test_changed_within_after_clear():
+    cache = QueryCache()
+    cache.clear()
+    assert cache.changed_within(["anything"], 10)
@@ -0,0 +1,44 @@
+import pytest
+from fastapi import HTTPException
+from events import EventHub, Subscription
+
+
+def test_events_reach_only_matching_subscribers():
+    hub = EventHub()
+    everyone = hub.subscribe()
+    officer = hub.subscribe(officer_id=7)
+    complaint = hub.subscribe(complaint_id=42)
+    both = hub.subscribe(officer_id=7, category="Noise Pollution")
+
+    hub.publish({"complaint_id": 42, "officer_id": 7, "category": "Air Pollution", "status": "Resolved"})
+    hub.publish({"complaint_id": 43, "officer_id": 8, "category": "Noise Pollution", "status": "Closed"})
+
+    assert everyone.queue.qsize() == 2
+    assert officer.queue.get_nowait()["complaint_id"] == 42 and officer.queue.empty()
+    assert complaint.queue.get_nowait()["complaint_id"] == 42 and complaint.queue.empty()
+    assert both.queue.empty()
+    assert hub.stats() == {"subscribers": 4, "published": 2}
+
+
+def test_unsubscribe_releases_the_slot():
+    hub = EventHub(max_subscribers=1)
+    sub = hub.subscribe(category="Water Leakage")
+    with pytest.raises(HTTPException) as exc:
+        hub.subscribe()
+    assert exc.value.status_code == 503
+
+    hub.unsubscribe(sub)
+    hub.unsubscribe(sub)  # a second release is a no-op
+    assert hub.stats()["subscribers"] == 0
+    hub.check_capacity()
+    hub.publish({"category": "Water Leakage"})
+    assert sub.queue.empty()
+
+
+def test_slow_subscriber_drops_oldest_and_counts():
+    sub = Subscription({}, maxsize=3)
+    for i in range(5):
+        sub.offer({"seq": i})
+
+    assert sub.dropped == 2
+    assert [sub.queue.get_nowait()["seq"] for _ in range(3)] == [2, 3, 4]
@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+import metrics
+
+
+def scope(path, path_format):
+    return {"path": path, "route": SimpleNamespace(path_format=path_format)}
+
+
+def test_route_template_replaces_only_route_placeholders():
+    assert metrics.route_template(scope("/api/complaints/42", "/{complaint_id}")) == "/api/complaints/{complaint_id}"
+    assert metrics.route_template(scope("/api/evidence/7/content", "/{evidence_id}/content")) == "/api/evidence/{evidence_id}/content"
+
+
+def test_route_template_leaves_prefix_equal_to_param_value():
+    assert metrics.route_template(scope("/api/users/users", "/{user_id}")) == "/api/users/{user_id}"
+
+
+def test_route_template_static_and_unmatched():
+    assert metrics.route_template(scope("/api/complaints/", "/")) == "/api/complaints/"
+    assert metrics.route_template({"path": "/wp-login.php"}) == "unmatched"
+
+
+def test_fingerprint_collapses_literals_and_whitespace():
+    a = metrics.fingerprint("SELECT *  FROM users\n WHERE id = 42 AND name = 'bob'")
+    b = metrics.fingerprint("SELECT * FROM users WHERE id = 7 AND name = 'alice'")
+    assert a == b
+    assert "42" not in a and "bob" not in a
+    assert metrics.fingerprint("SELECT * FROM t WHERE id = $1") == "SELECT * FROM t WHERE id = $1"
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime, timezone
+import pytest
+from fastapi import HTTPException
+from pagination import decode_cursor, encode_cursor, page_query
+
+KEYS = ("submitted_at", "complaint_id")
+
+
+def _token(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    ts = datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    assert decode_cursor(encode_cursor([ts, 42]), KEYS) == [ts, 42]
+    assert decode_cursor(encode_cursor([0.25, 7]), ("rank", "complaint_id")) == [0.25, 7]
+    assert decode_cursor(encode_cursor([3]), ("user_id",)) == [3]
+
+
+@pytest.mark.parametrize("token", [
+    "not base64!",
+    _token({"submitted_at": "2025-03-01"}),
+    _token(["2025-03-01T00:00:00+00:00"]),
+    _token(["2025-03-01T00:00:00+00:00", "42"]),
+    _token(["2025-03-01T00:00:00+00:00", 4.2]),
+    _token(["2025-03-01T00:00:00+00:00", True]),
+    _token([1740787200, 42]),
+    _token(["yesterday", 42]),
+    _token([None, 42]),
+])
+def test_malformed_cursor_is_400(token):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(token, KEYS)
+    assert exc.value.status_code == 400
+
+
+def test_page_query_binds_cursor_after_filters():
+    ts = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    q, args = page_query("SELECT * FROM complaints", KEYS, encode_cursor([ts, 9]), 10,
+                         where=["status = $1"], args=["Pending"])
+    assert "(submitted_at, complaint_id) < ($2, $3)" in q
+    assert q.endswith("ORDER BY submitted_at DESC, complaint_id DESC LIMIT $4")
+    assert args == ["Pending", ts, 9, 11]
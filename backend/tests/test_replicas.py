@@ -0,0 +1,176 @@
+import asyncio
+import database
+from database import ReplicaSet, ReadYourWritesMiddleware, STICKY_COOKIE, primary_reads
+
+
+class FakeConn:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def fetch(self, query, *args):
+        if self.pool.query_error:
+            raise self.pool.query_error
+        self.pool.queries.append(query)
+        return [{"server": self.pool.name}]
+
+
+class FakePool:
+    def __init__(self, name, acquire_error=None, query_error=None, lag_row=None):
+        self.name = name
+        self.acquire_error = acquire_error
+        self.query_error = query_error
+        self.lag_row = lag_row
+        self.queries = []
+        self.lag_args = []
+
+    async def acquire(self, timeout=None):
+        if self.acquire_error:
+            raise self.acquire_error
+        return FakeConn(self)
+
+    async def release(self, conn):
+        pass
+
+    async def fetchrow(self, query, *args):
+        self.lag_args.append(args)
+        return self.lag_row
+
+    async def fetchval(self, query, *args):
+        if self.query_error:
+            raise self.query_error
+        return "0/3000000"
+
+
+def replicas(monkeypatch, *pools, healthy=True):
+    rs = ReplicaSet([f"postgresql://app:secret@{p.name}:5432/app" for p in pools])
+    for r, p in zip(rs.replicas, pools):
+        r.pool = p
+        r.healthy = healthy
+    monkeypatch.setattr(database, "replica_set", rs)
+    return rs
+
+
+def test_replica_names_hide_credentials():
+    rs = ReplicaSet(["postgresql://app:secret@r1:5433/app", "not a url"])
+    assert [r.name for r in rs.replicas] == ["r1:5433/app", "replica1"]
+
+
+def test_pick_round_robins_healthy_replicas(monkeypatch):
+    rs = replicas(monkeypatch, FakePool("r1"), FakePool("r2"), FakePool("r3"))
+    rs.replicas[1].healthy = False
+    picked = [rs.pick().name for _ in range(4)]
+    assert set(picked) == {"r1:5432/app", "r3:5432/app"}
+    assert picked[0] != picked[1] and picked[0] == picked[2]
+
+
+def test_pick_falls_back_when_none_healthy(monkeypatch):
+    rs = replicas(monkeypatch, FakePool("r1"), healthy=False)
+    assert rs.pick() is None
+    assert rs.fallbacks == 1
+
+
+def test_pick_pinned_reads_use_primary(monkeypatch):
+    rs = replicas(monkeypatch, FakePool("r1"))
+    with primary_reads():
+        assert rs.pick() is None
+    with primary_reads(False):
+        assert rs.pick() is not None
+    assert rs.pinned_reads == 1
+
+
+def test_read_goes_to_replica(monkeypatch):
+    primary, replica = FakePool("primary"), FakePool("r1")
+    monkeypatch.setattr(database, "_pool", primary)
+    replicas(monkeypatch, replica)
+    rows = asyncio.run(database.fetch("SELECT 1", replica=True))
+    assert rows == [{"server": "r1"}]
+    assert asyncio.run(database.fetch("SELECT 1")) == [{"server": "primary"}]
+
+
+def test_read_falls_back_when_replica_connection_fails(monkeypatch):
+    primary = FakePool("primary")
+    monkeypatch.setattr(database, "_pool", primary)
+    rs = replicas(monkeypatch, FakePool("r1", query_error=ConnectionResetError("gone")))
+    assert asyncio.run(database.fetch("SELECT 1", replica=True)) == [{"server": "primary"}]
+    assert not rs.replicas[0].healthy
+    assert "ConnectionResetError" in rs.replicas[0].error
+    assert rs.fallbacks == 1
+
+
+def test_read_falls_back_when_replica_pool_is_unreachable(monkeypatch):
+    monkeypatch.setattr(database, "_pool", FakePool("primary"))
+    rs = replicas(monkeypatch, FakePool("r1", acquire_error=OSError("refused")))
+    assert asyncio.run(database.fetch("SELECT 1", replica=True)) == [{"server": "primary"}]
+    assert not rs.replicas[0].healthy
+
+
+def check(monkeypatch, lag_row, primary_error=None, healthy=True):
+    monkeypatch.setattr(database, "_pool", FakePool("primary", query_error=primary_error))
+    rs = replicas(monkeypatch, FakePool("r1", lag_row=lag_row), healthy=healthy)
+    asyncio.run(rs.check())
+    return rs.replicas[0]
+
+
+def test_check_caught_up_replica_is_healthy(monkeypatch):
+    r = check(monkeypatch, {"behind_bytes": 0, "replay_age": 600.0}, healthy=False)
+    assert r.healthy and r.lag == 0.0
+    assert r.pool.lag_args == [("0/3000000",)]
+
+
+def test_check_lagging_replica_leaves_rotation(monkeypatch):
+    r = check(monkeypatch, {"behind_bytes": 4096, "replay_age": database.REPLICA_MAX_LAG_SECONDS + 1})
+    assert not r.healthy and r.behind_bytes == 4096
+    assert r.error.startswith("replication lag")
+
+
+def test_check_unknown_primary_position_is_not_zero_lag(monkeypatch):
+    # the lag query returns NULL bytes behind when given no primary position
+    r = check(monkeypatch, {"behind_bytes": None, "replay_age": database.REPLICA_MAX_LAG_SECONDS + 60},
+              primary_error=OSError("primary down"))
+    assert r.pool.lag_args == [(None,)]
+    assert not r.healthy and r.behind_bytes is None and r.lag > database.REPLICA_MAX_LAG_SECONDS
+
+
+def test_check_unknown_primary_position_judges_replay_age(monkeypatch):
+    r = check(monkeypatch, {"behind_bytes": None, "replay_age": 0.5},
+              primary_error=OSError("primary down"), healthy=False)
+    assert r.healthy and r.lag == 0.5
+
+
+def test_check_unknown_lag_leaves_rotation(monkeypatch):
+    r = check(monkeypatch, {"behind_bytes": None, "replay_age": None}, primary_error=OSError("primary down"))
+    assert not r.healthy and r.error == "replication lag unknown"
+
+
+def call(middleware, method, status=200, cookie=None):
+    seen = {}
+
+    async def app(scope, receive, send):
+        seen["pinned"] = database._pinned.get()
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    headers = [(b"cookie", f"theme=dark; {cookie}".encode())] if cookie else []
+    scope = {"type": "http", "method": method, "path": "/api/complaints/", "headers": headers}
+    asyncio.run(middleware(app)(scope, None, send))
+    cookies = [v for k, v in sent[0]["headers"] if k == b"set-cookie"]
+    return seen["pinned"], cookies
+
+
+def test_read_your_writes_cookie_and_pinning(monkeypatch):
+    replicas(monkeypatch, FakePool("r1"))
+    pinned, cookies = call(ReadYourWritesMiddleware, "POST")
+    assert pinned and len(cookies) == 1 and cookies[0].startswith(f"{STICKY_COOKIE}=1".encode())
+    assert call(ReadYourWritesMiddleware, "GET") == (False, [])
+    assert call(ReadYourWritesMiddleware, "GET", cookie=f"{STICKY_COOKIE}=1") == (True, [])
+    assert call(ReadYourWritesMiddleware, "DELETE", status=404) == (True, [])
+
+
+def test_read_your_writes_is_inert_without_replicas(monkeypatch):
+    monkeypatch.setattr(database, "replica_set", ReplicaSet([]))
+    assert call(ReadYourWritesMiddleware, "POST") == (False, [])
@@ -0,0 +1,39 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+import security
+
+
+def test_overload_is_503_and_frees_up_after(monkeypatch):
+    monkeypatch.setattr(security, "HASH_MAX_PENDING", 2)
+    release = threading.Event()
+
+    async def main():
+        blocked = [asyncio.create_task(security._run(release.wait, 5)) for _ in range(2)]
+        while security.pending() < 2:
+            await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as exc:
+            await security.verify_password("secret", None)
+        release.set()
+        await asyncio.gather(*blocked)
+        return exc.value, await security._run(len, "ok")
+
+    error, after = asyncio.run(main())
+    assert error.status_code == 503
+    assert error.headers == {"Retry-After": "1"}
+    assert after == 2
+    assert security.pending() == 0
+
+
+def test_hash_verify_and_rehash_on_cost_change(monkeypatch):
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 4)
+    password_hash = asyncio.run(security.hash_password("correct horse"))
+    assert password_hash.startswith("$2b$04$")
+    assert asyncio.run(security.verify_password("correct horse", password_hash)) == (True, False)
+    assert asyncio.run(security.verify_password("wrong", password_hash)) == (False, False)
+
+    monkeypatch.setattr(security, "BCRYPT_ROUNDS", 5)
+    assert asyncio.run(security.verify_password("correct horse", password_hash)) == (True, True)
+    # legacy rows without a bcrypt hash never match
+    assert asyncio.run(security.verify_password("correct horse", "plaintext")) == (False, False)
@@ -1,5 +1,7 @@
 BEGIN;
 
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 CREATE TABLE Users (
     user_id SERIAL PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
@@ -27,6 +29,8 @@ CREATE TABLE ComplaintEvidence (
     complaint_id INT NOT NULL REFERENCES Complaints(complaint_id) ON DELETE CASCADE,
     file_path TEXT NOT NULL,
     mime_type VARCHAR(100),
+    content_sha256 CHAR(64),  -- set for files in the evidence store; file_path is then its blob path
+    size_bytes BIGINT,
     uploaded_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -64,15 +68,20 @@ CREATE TABLE ComplaintActions (
     action_date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+-- monthly range partitions (auditlog_pYYYYMM), see ensure_audit_partitions()
 CREATE TABLE AuditLog (
-    audit_id BIGSERIAL PRIMARY KEY,
+    audit_id BIGSERIAL,
     table_name TEXT NOT NULL,
     operation CHAR(1) NOT NULL, -- I = insert, U = update, D = delete
-    primary_key JSONB,
+    primary_key JSONB,          -- value of the audited table's primary key column
     changed_by INT,
-    changed_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    row_data JSONB
-);
+    changed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    row_data JSONB,             -- I/D: full row; U: {"old": {...}, "new": {...}} of changed columns only
+    PRIMARY KEY (audit_id, changed_at)
+) PARTITION BY RANGE (changed_at);
+
+-- catches rows outside every monthly partition so audit writes never fail
+CREATE TABLE AuditLog_default PARTITION OF AuditLog DEFAULT;
 
 ALTER TABLE Users
     ADD CONSTRAINT chk_role CHECK (role IN ('citizen', 'officer', 'admin'));
@@ -83,6 +92,18 @@ ALTER TABLE Complaints
 ALTER TABLE Feedback
     ADD CONSTRAINT chk_rating CHECK (rating BETWEEN 1 AND 5);
 
+-- current (latest) assignment, kept by the ComplaintAssignments triggers
+ALTER TABLE Complaints
+    ADD COLUMN current_officer_id INT REFERENCES Officers(officer_id) ON DELETE SET NULL;
+
+-- full-text document for /complaints/search; category ranks above description above location
+ALTER TABLE Complaints
+    ADD COLUMN search_document TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', COALESCE(category, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(description, '')), 'B') ||
+        setweight(to_tsvector('simple', COALESCE(location, '')), 'C')
+    ) STORED;
+
 -- trigger to update last_updated_at on complaint updates
 CREATE OR REPLACE FUNCTION complaints_update_timestamp()
 RETURNS TRIGGER AS $$
@@ -97,13 +118,415 @@ BEFORE UPDATE ON Complaints
 FOR EACH ROW
 EXECUTE FUNCTION complaints_update_timestamp();
 
+-- ==========================
+-- COMPLAINT STATS: counters by (status, category, day) so dashboards never scan Complaints
+-- ==========================
+CREATE TABLE ComplaintStats (
+    status VARCHAR(50) NOT NULL,
+    category VARCHAR(100) NOT NULL DEFAULT '', -- '' stands for NULL category
+    day DATE NOT NULL,
+    complaint_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, category, day)
+);
+
+CREATE OR REPLACE FUNCTION complaint_stats_day(p_ts TIMESTAMP WITH TIME ZONE)
+RETURNS DATE AS $$
+    SELECT COALESCE((p_ts AT TIME ZONE 'UTC')::date, DATE '1970-01-01');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION complaint_stats_bump(p_status VARCHAR, p_category VARCHAR, p_submitted_at TIMESTAMP WITH TIME ZONE, p_delta INT)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO ComplaintStats (status, category, day, complaint_count)
+    VALUES (p_status, COALESCE(p_category, ''), complaint_stats_day(p_submitted_at), p_delta)
+    ON CONFLICT (status, category, day)
+    DO UPDATE SET complaint_count = ComplaintStats.complaint_count + EXCLUDED.complaint_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION complaints_maintain_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.status IS NOT DISTINCT FROM OLD.status
+       AND NEW.category IS NOT DISTINCT FROM OLD.category
+       AND NEW.submitted_at IS NOT DISTINCT FROM OLD.submitted_at THEN
+        RETURN NEW;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM complaint_stats_bump(OLD.status, OLD.category, OLD.submitted_at, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM complaint_stats_bump(NEW.status, NEW.category, NEW.submitted_at, 1);
+        RETURN NEW;
+    END IF;
+
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_complaints_stats
+AFTER INSERT OR UPDATE OR DELETE ON Complaints
+FOR EACH ROW
+EXECUTE FUNCTION complaints_maintain_stats();
+
+-- Reconcile: rebuild ComplaintStats from scratch (see backend/maintenance.py)
+CREATE OR REPLACE FUNCTION rebuild_complaint_stats()
+RETURNS INT AS $$
+DECLARE
+    n INT;
+BEGIN
+    -- blocks trigger upserts until the rebuild commits, so no delta is lost
+    LOCK TABLE ComplaintStats IN EXCLUSIVE MODE;
+    DELETE FROM ComplaintStats;
+    INSERT INTO ComplaintStats (status, category, day, complaint_count)
+    SELECT status, COALESCE(category, ''), complaint_stats_day(submitted_at), COUNT(*)
+    FROM Complaints
+    GROUP BY 1, 2, 3;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ==========================
+-- AUTO-ASSIGNMENT: category -> department routing and open-case counts per officer
+-- ==========================
+CREATE TABLE CategoryRouting (
+    category VARCHAR(100) PRIMARY KEY,
+    department VARCHAR(100) NOT NULL
+);
+
+-- complaints currently assigned to the officer and still Pending or In Progress
+CREATE TABLE OfficerLoad (
+    officer_id INT PRIMARY KEY REFERENCES Officers(officer_id) ON DELETE CASCADE,
+    open_count INT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION complaints_maintain_officer_load()
+RETURNS TRIGGER AS $$
+DECLARE
+    was_open BOOLEAN := FALSE;
+    is_open BOOLEAN := FALSE;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        was_open := OLD.current_officer_id IS NOT NULL AND OLD.status IN ('Pending', 'In Progress');
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        is_open := NEW.current_officer_id IS NOT NULL AND NEW.status IN ('Pending', 'In Progress');
+    END IF;
+
+    IF TG_OP = 'UPDATE' AND was_open = is_open
+       AND NEW.current_officer_id IS NOT DISTINCT FROM OLD.current_officer_id THEN
+        RETURN NEW;
+    END IF;
+
+    IF was_open THEN
+        UPDATE OfficerLoad SET open_count = open_count - 1 WHERE officer_id = OLD.current_officer_id;
+    END IF;
+    IF is_open THEN
+        INSERT INTO OfficerLoad (officer_id, open_count)
+        VALUES (NEW.current_officer_id, 1)
+        ON CONFLICT (officer_id) DO UPDATE SET open_count = OfficerLoad.open_count + 1;
+    END IF;
+
+    RETURN COALESCE(NEW, OLD);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_complaints_officer_load
+AFTER INSERT OR UPDATE OF status, current_officer_id OR DELETE ON Complaints
+FOR EACH ROW
+EXECUTE FUNCTION complaints_maintain_officer_load();
+
+-- Reconcile: rebuild OfficerLoad from Complaints (see backend/maintenance.py)
+CREATE OR REPLACE FUNCTION rebuild_officer_load()
+RETURNS INT AS $$
+DECLARE
+    n INT;
+BEGIN
+    LOCK TABLE OfficerLoad IN EXCLUSIVE MODE;
+    DELETE FROM OfficerLoad;
+    INSERT INTO OfficerLoad (officer_id, open_count)
+    SELECT current_officer_id, COUNT(*)
+    FROM Complaints
+    WHERE current_officer_id IS NOT NULL AND status IN ('Pending', 'In Progress')
+    GROUP BY current_officer_id;
+    GET DIAGNOSTICS n = ROW_COUNT;
+    RETURN n;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Assigns up to p_limit unassigned Pending complaints, oldest first, each to the least-loaded
+-- officer in its category's department. Rows locked by a concurrent run are skipped rather
+-- than waited on, so parallel workers split the backlog and never assign a complaint twice.
+CREATE OR REPLACE FUNCTION auto_assign_complaints(p_limit INT DEFAULT 100, p_assigned_by INT DEFAULT NULL)
+RETURNS TABLE (complaint_id INT, officer_id INT, assignment_id INT) AS $$
+#variable_conflict use_column
+DECLARE
+    pending RECORD;
+    chosen INT;
+BEGIN
+    -- one run at a time across all workers: concurrent runs would all pick the same
+    -- least-loaded officer from their snapshots, then queue (or deadlock) on that
+    -- officer's OfficerLoad row for the length of each other's batch
+    IF NOT pg_try_advisory_xact_lock(hashtext('auto_assign_complaints')) THEN
+        RETURN;
+    END IF;
+
+    FOR pending IN
+        SELECT c.complaint_id, c.category
+        FROM Complaints c
+        WHERE c.status = 'Pending'
+          AND c.current_officer_id IS NULL
+          -- unroutable complaints would otherwise sit at the head of every batch
+          AND EXISTS (
+              SELECT 1 FROM CategoryRouting r
+              JOIN Officers o ON o.department = r.department
+              WHERE r.category = c.category
+          )
+        ORDER BY c.submitted_at, c.complaint_id
+        LIMIT p_limit
+        -- skips complaints a manual assignment or status update has locked
+        FOR UPDATE OF c SKIP LOCKED
+    LOOP
+        SELECT o.officer_id INTO chosen
+        FROM CategoryRouting r
+        JOIN Officers o ON o.department = r.department
+        LEFT JOIN OfficerLoad l ON l.officer_id = o.officer_id
+        WHERE r.category = pending.category
+        ORDER BY COALESCE(l.open_count, 0), o.officer_id
+        LIMIT 1;
+
+        -- trg_set_complaint_in_progress sets current_officer_id, which bumps OfficerLoad
+        INSERT INTO ComplaintAssignments (complaint_id, officer_id, assigned_by)
+        VALUES (pending.complaint_id, chosen, p_assigned_by)
+        RETURNING assignment_id INTO assignment_id;
+
+        complaint_id := pending.complaint_id;
+        officer_id := chosen;
+        RETURN NEXT;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ==========================
+-- ANALYTICS ROLLUPS: intake and resolutions per hour and per day (UTC), by category,
+-- department and area, so /analytics/timeseries never scans Complaints
+-- ==========================
+CREATE TABLE ComplaintRollupHourly (
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    category VARCHAR(100) NOT NULL DEFAULT '',
+    department VARCHAR(100) NOT NULL DEFAULT '',
+    area VARCHAR(255) NOT NULL DEFAULT '',
+    intake INT NOT NULL DEFAULT 0,
+    resolved INT NOT NULL DEFAULT 0,
+    resolve_seconds DOUBLE PRECISION NOT NULL DEFAULT 0, -- sum; mean = resolve_seconds / resolved
+    PRIMARY KEY (bucket, category, department, area)
+);
+
+CREATE TABLE ComplaintRollupDaily (LIKE ComplaintRollupHourly INCLUDING ALL);
+
+CREATE OR REPLACE FUNCTION complaint_rollup_hour(p_ts TIMESTAMP WITH TIME ZONE)
+RETURNS TIMESTAMP WITH TIME ZONE AS $$
+    SELECT COALESCE(date_trunc('hour', p_ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', 'epoch'::timestamptz);
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION complaint_rollup_day(p_ts TIMESTAMP WITH TIME ZONE)
+RETURNS TIMESTAMP WITH TIME ZONE AS $$
+    SELECT COALESCE(date_trunc('day', p_ts AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', 'epoch'::timestamptz);
+$$ LANGUAGE sql IMMUTABLE;
+
+-- area: the text after the last comma, e.g. 'Indore' for 'Sector 12, Indore'
+CREATE OR REPLACE FUNCTION complaint_area(p_location VARCHAR)
+RETURNS VARCHAR AS $$
+    SELECT COALESCE(btrim(regexp_replace(p_location, '^.*,', '')), '');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- department of the current officer, else the one the category routes to
+CREATE OR REPLACE FUNCTION complaint_department(p_officer_id INT, p_category VARCHAR)
+RETURNS VARCHAR AS $$
+    SELECT COALESCE(
+        (SELECT department FROM Officers WHERE officer_id = p_officer_id),
+        (SELECT department FROM CategoryRouting WHERE category = p_category),
+        ''
+    );
+$$ LANGUAGE sql STABLE;
+
+CREATE OR REPLACE FUNCTION complaint_rollup_add(
+    p_at TIMESTAMP WITH TIME ZONE, p_category VARCHAR, p_department VARCHAR, p_area VARCHAR,
+    p_intake INT, p_resolved INT, p_seconds DOUBLE PRECISION
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO ComplaintRollupHourly AS r (bucket, category, department, area, intake, resolved, resolve_seconds)
+    VALUES (complaint_rollup_hour(p_at), p_category, p_department, p_area, p_intake, p_resolved, p_seconds)
+    ON CONFLICT (bucket, category, department, area) DO UPDATE
+    SET intake = r.intake + EXCLUDED.intake,
+        resolved = r.resolved + EXCLUDED.resolved,
+        resolve_seconds = r.resolve_seconds + EXCLUDED.resolve_seconds;
+
+    INSERT INTO ComplaintRollupDaily AS r (bucket, category, department, area, intake, resolved, resolve_seconds)
+    VALUES (complaint_rollup_day(p_at), p_category, p_department, p_area, p_intake, p_resolved, p_seconds)
+    ON CONFLICT (bucket, category, department, area) DO UPDATE
+    SET intake = r.intake + EXCLUDED.intake,
+        resolved = r.resolved + EXCLUDED.resolved,
+        resolve_seconds = r.resolve_seconds + EXCLUDED.resolve_seconds;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION complaints_maintain_rollups()
+RETURNS TRIGGER AS $$
+DECLARE
+    old_category VARCHAR; old_department VARCHAR; old_area VARCHAR;
+    new_category VARCHAR; new_department VARCHAR; new_area VARCHAR;
+    same_dims BOOLEAN := FALSE;
+    intake_changed BOOLEAN := TRUE;
+    resolved_changed BOOLEAN := TRUE;
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND NEW.category IS NOT DISTINCT FROM OLD.category
+       AND NEW.location IS NOT DISTINCT FROM OLD.location
+       AND NEW.current_officer_id IS NOT DISTINCT FROM OLD.current_officer_id
+       AND NEW.submitted_at IS NOT DISTINCT FROM OLD.submitted_at
+       AND NEW.resolved_at IS NOT DISTINCT FROM OLD.resolved_at THEN
+        RETURN NEW;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        old_category := COALESCE(OLD.category, '');
+        old_department := complaint_department(OLD.current_officer_id, OLD.category);
+        old_area := complaint_area(OLD.location);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        new_category := COALESCE(NEW.category, '');
+        new_department := complaint_department(NEW.current_officer_id, NEW.category);
+        new_area := complaint_area(NEW.location);
+    END IF;
+    IF TG_OP = 'UPDATE' THEN
+        -- reassignment within a department, or resolving, touches only one side
+        same_dims := old_category = new_category AND old_department = new_department AND old_area = new_area;
+        intake_changed := NOT (same_dims AND NEW.submitted_at IS NOT DISTINCT FROM OLD.submitted_at);
+        resolved_changed := NOT (same_dims AND NEW.submitted_at IS NOT DISTINCT FROM OLD.submitted_at
+                                 AND NEW.resolved_at IS NOT DISTINCT FROM OLD.resolved_at);
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        IF intake_changed THEN
+            PERFORM complaint_rollup_add(OLD.submitted_at, old_category, old_department, old_area, -1, 0, 0);
+        END IF;
+        IF resolved_changed AND OLD.resolved_at IS NOT NULL THEN
+            PERFORM complaint_rollup_add(OLD.resolved_at, old_category, old_department, old_area, 0, -1,
+                                         -EXTRACT(EPOCH FROM OLD.resolved_at - OLD.submitted_at));
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        IF intake_changed THEN
+            PERFORM complaint_rollup_add(NEW.submitted_at, new_category, new_department, new_area, 1, 0, 0);
+        END IF;
+        IF resolved_changed AND NEW.resolved_at IS NOT NULL THEN
+            PERFORM complaint_rollup_add(NEW.resolved_at, new_category, new_department, new_area, 0, 1,
+                                         EXTRACT(EPOCH FROM NEW.resolved_at - NEW.submitted_at));
+        END IF;
+        RETURN NEW;
+    END IF;
+
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_complaints_rollups
+AFTER INSERT OR UPDATE OF category, location, current_officer_id, submitted_at, resolved_at OR DELETE ON Complaints
+FOR EACH ROW
+EXECUTE FUNCTION complaints_maintain_rollups();
+
+-- Reconcile: rebuild both rollups from Complaints (see backend/maintenance.py).
+-- Also picks up officers who moved department since their cases were counted.
+CREATE OR REPLACE FUNCTION rebuild_complaint_rollups()
+RETURNS INT AS $$
+DECLARE
+    n INT;
+BEGIN
+    LOCK TABLE ComplaintRollupHourly, ComplaintRollupDaily IN EXCLUSIVE MODE;
+    DELETE FROM ComplaintRollupHourly;
+    DELETE FROM ComplaintRollupDaily;
+
+    WITH facts AS (
+        SELECT COALESCE(category, '') AS category,
+               complaint_department(current_officer_id, category) AS department,
+               complaint_area(location) AS area,
+               submitted_at,
+               resolved_at
+        FROM Complaints
+    ),
+    events AS (
+        SELECT submitted_at AS at, category, department, area, 1 AS intake, 0 AS resolved, 0::float8 AS seconds
+        FROM facts
+        UNION ALL
+        SELECT resolved_at, category, department, area, 0, 1, EXTRACT(EPOCH FROM resolved_at - submitted_at)::float8
+        FROM facts
+        WHERE resolved_at IS NOT NULL
+    )
+    INSERT INTO ComplaintRollupHourly (bucket, category, department, area, intake, resolved, resolve_seconds)
+    SELECT complaint_rollup_hour(at), category, department, area, SUM(intake), SUM(resolved), SUM(seconds)
+    FROM events
+    GROUP BY 1, 2, 3, 4;
+    GET DIAGNOSTICS n = ROW_COUNT;
+
+    INSERT INTO ComplaintRollupDaily (bucket, category, department, area, intake, resolved, resolve_seconds)
+    SELECT complaint_rollup_day(bucket), category, department, area, SUM(intake), SUM(resolved), SUM(resolve_seconds)
+    FROM ComplaintRollupHourly
+    GROUP BY 1, 2, 3, 4;
+
+    RETURN n;
+END;
+$$ LANGUAGE plpgsql;
+
 CREATE INDEX IF NOT EXISTS idx_users_email ON Users(email);
-CREATE INDEX IF NOT EXISTS idx_complaints_status ON Complaints(status);
 CREATE INDEX IF NOT EXISTS idx_complaints_category ON Complaints(category);
 CREATE INDEX IF NOT EXISTS idx_assignments_officer ON ComplaintAssignments(officer_id);
 CREATE INDEX IF NOT EXISTS idx_actions_complaint ON ComplaintActions(complaint_id);
 CREATE INDEX IF NOT EXISTS idx_feedback_complaint ON Feedback(complaint_id);
 
+-- foreign keys whose cascading deletes scanned the child table in a benchmarks/plans.py
+-- --nested report (benchmarks.seed, 200k complaints): DELETE /users/{id} for an
+-- officer's user went from 5.7 ms to 96 ms without the first four, and DELETE
+-- /complaints/{id} from 2.4 ms to 18 ms without idx_evidence_complaint. Officers(user_id)
+-- and Officers(department) showed nothing at a few hundred officers and have no index
+CREATE INDEX IF NOT EXISTS idx_complaints_user ON Complaints(user_id);
+CREATE INDEX IF NOT EXISTS idx_feedback_user ON Feedback(user_id);
+CREATE INDEX IF NOT EXISTS idx_assignments_assigned_by ON ComplaintAssignments(assigned_by);
+CREATE INDEX IF NOT EXISTS idx_actions_officer ON ComplaintActions(officer_id);
+CREATE INDEX IF NOT EXISTS idx_evidence_complaint ON ComplaintEvidence(complaint_id);
+
+-- keyset pagination: every list route pages on (timestamp, id) DESC. The exports read
+-- these backwards through their cursor (ORDER BY submitted_at/changed_at ASC, including
+-- the complaintsummary and feedbacksummary joins), so they stream without a sort
+CREATE INDEX IF NOT EXISTS idx_complaints_submitted ON Complaints(submitted_at DESC, complaint_id DESC);
+CREATE INDEX IF NOT EXISTS idx_complaints_status_submitted ON Complaints(status, submitted_at DESC, complaint_id DESC);
+CREATE INDEX IF NOT EXISTS idx_evidence_uploaded ON ComplaintEvidence(uploaded_at DESC, evidence_id DESC);
+CREATE INDEX IF NOT EXISTS idx_feedback_submitted ON Feedback(submitted_at DESC, feedback_id DESC);
+CREATE INDEX IF NOT EXISTS idx_assignments_assigned ON ComplaintAssignments(assigned_at DESC, assignment_id DESC);
+CREATE INDEX IF NOT EXISTS idx_actions_date ON ComplaintActions(action_date DESC, action_id DESC);
+CREATE INDEX IF NOT EXISTS idx_auditlog_changed ON AuditLog(changed_at DESC, audit_id DESC);
+CREATE INDEX IF NOT EXISTS idx_auditlog_table_changed ON AuditLog(table_name, operation, changed_at DESC, audit_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_assignments_complaint ON ComplaintAssignments(complaint_id, assigned_at DESC, assignment_id DESC);
+CREATE INDEX IF NOT EXISTS idx_complaints_current_officer ON Complaints(current_officer_id);
+-- officers_workload(): open cases per officer, resolutions by recency
+CREATE INDEX IF NOT EXISTS idx_complaints_open_officer ON Complaints(current_officer_id, submitted_at)
+    WHERE status IN ('Pending', 'In Progress');
+CREATE INDEX IF NOT EXISTS idx_complaints_resolved ON Complaints(resolved_at)
+    WHERE resolved_at IS NOT NULL;
+-- the auto-assignment queue
+CREATE INDEX IF NOT EXISTS idx_complaints_unassigned ON Complaints(submitted_at, complaint_id)
+    WHERE status = 'Pending' AND current_officer_id IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_evidence_sha256 ON ComplaintEvidence(content_sha256) WHERE content_sha256 IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_complaints_search ON Complaints USING GIN (search_document);
+CREATE INDEX IF NOT EXISTS idx_complaints_location_trgm ON Complaints USING GIN (location gin_trgm_ops);
+
 
 CREATE OR REPLACE VIEW ComplaintSummary AS
 SELECT
@@ -124,8 +547,7 @@ SELECT
     o.designation
 FROM Complaints c
 JOIN Users cu ON cu.user_id = c.user_id
-LEFT JOIN ComplaintAssignments ca ON ca.complaint_id = c.complaint_id
-LEFT JOIN Officers o ON ca.officer_id = o.officer_id
+LEFT JOIN Officers o ON o.officer_id = c.current_officer_id
 LEFT JOIN Users ou ON o.user_id = ou.user_id;
 
 CREATE OR REPLACE VIEW FeedbackSummary AS
@@ -140,8 +562,7 @@ SELECT
 FROM Feedback f
 JOIN Complaints c ON f.complaint_id = c.complaint_id
 JOIN Users cu ON f.user_id = cu.user_id
-LEFT JOIN ComplaintAssignments ca ON ca.complaint_id = c.complaint_id
-LEFT JOIN Officers o ON ca.officer_id = o.officer_id
+LEFT JOIN Officers o ON o.officer_id = c.current_officer_id
 LEFT JOIN Users ou ON o.user_id = ou.user_id;
 
 -- File a complaint helper
@@ -173,10 +594,10 @@ RETURNS TABLE (
 BEGIN
     RETURN QUERY
     SELECT
-        u.name AS officer_name,
-        COUNT(DISTINCT ca.complaint_id) AS total_assigned,
-        COUNT(DISTINCT CASE WHEN c.status = 'Resolved' THEN c.complaint_id END) AS resolved,
-        COUNT(DISTINCT CASE WHEN c.status != 'Resolved' THEN c.complaint_id END) AS pending
+        u.name::text AS officer_name,
+        COUNT(DISTINCT ca.complaint_id)::int AS total_assigned,
+        COUNT(DISTINCT CASE WHEN c.status = 'Resolved' THEN c.complaint_id END)::int AS resolved,
+        COUNT(DISTINCT CASE WHEN c.status != 'Resolved' THEN c.complaint_id END)::int AS pending
     FROM ComplaintAssignments ca
     JOIN Officers o ON ca.officer_id = o.officer_id
     JOIN Users u ON o.user_id = u.user_id
@@ -186,14 +607,66 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Trigger 1: set complaint 'In Progress' on assignment
+-- Workload for every officer in one pass: open and aged cases from the current assignment,
+-- median hours from submission to resolution over the last p_window_days
+CREATE OR REPLACE FUNCTION officers_workload(
+    p_department VARCHAR DEFAULT NULL,
+    p_aged_days INT DEFAULT 7,
+    p_window_days INT DEFAULT 90
+)
+RETURNS TABLE (
+    officer_id INT,
+    officer_name TEXT,
+    department TEXT,
+    designation TEXT,
+    open_count INT,
+    aged_pending INT,
+    oldest_pending_at TIMESTAMP WITH TIME ZONE,
+    resolved_in_window INT,
+    median_resolve_hours NUMERIC
+) AS $$
+    WITH open_cases AS (
+        SELECT c.current_officer_id AS officer_id,
+               COUNT(*) FILTER (WHERE c.submitted_at < now() - make_interval(days => p_aged_days)) AS aged,
+               MIN(c.submitted_at) AS oldest
+        FROM Complaints c
+        WHERE c.status IN ('Pending', 'In Progress') AND c.current_officer_id IS NOT NULL
+        GROUP BY c.current_officer_id
+    ),
+    resolved AS (
+        SELECT c.current_officer_id AS officer_id,
+               COUNT(*) AS n,
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM c.resolved_at - c.submitted_at)) / 3600 AS median_hours
+        FROM Complaints c
+        WHERE c.resolved_at >= now() - make_interval(days => p_window_days) AND c.current_officer_id IS NOT NULL
+        GROUP BY c.current_officer_id
+    )
+    SELECT o.officer_id,
+           u.name::text,
+           o.department::text,
+           o.designation::text,
+           COALESCE(l.open_count, 0),
+           COALESCE(oc.aged, 0)::int,
+           oc.oldest,
+           COALESCE(r.n, 0)::int,
+           round(r.median_hours::numeric, 2)
+    FROM Officers o
+    JOIN Users u ON u.user_id = o.user_id
+    LEFT JOIN OfficerLoad l ON l.officer_id = o.officer_id
+    LEFT JOIN open_cases oc ON oc.officer_id = o.officer_id
+    LEFT JOIN resolved r ON r.officer_id = o.officer_id
+    WHERE p_department IS NULL OR o.department = p_department
+    ORDER BY o.department, o.officer_id;
+$$ LANGUAGE sql STABLE;
+
+-- Trigger 1: record the current officer and set complaint 'In Progress' on assignment
 CREATE OR REPLACE FUNCTION set_complaint_in_progress()
 RETURNS TRIGGER AS $$
 BEGIN
     UPDATE Complaints
-    SET status = 'In Progress'
-    WHERE complaint_id = NEW.complaint_id
-      AND status = 'Pending';
+    SET current_officer_id = NEW.officer_id,
+        status = CASE WHEN status = 'Pending' THEN 'In Progress' ELSE status END
+    WHERE complaint_id = NEW.complaint_id;
 
     RETURN NEW;
 END;
@@ -204,6 +677,30 @@ AFTER INSERT ON ComplaintAssignments
 FOR EACH ROW
 EXECUTE FUNCTION set_complaint_in_progress();
 
+-- Removing the current assignment falls back to the previous one
+CREATE OR REPLACE FUNCTION refresh_current_assignment()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE Complaints c
+    SET current_officer_id = (
+        SELECT ca.officer_id
+        FROM ComplaintAssignments ca
+        WHERE ca.complaint_id = OLD.complaint_id
+        ORDER BY ca.assigned_at DESC, ca.assignment_id DESC
+        LIMIT 1
+    )
+    WHERE c.complaint_id = OLD.complaint_id
+      AND c.current_officer_id IS NOT DISTINCT FROM OLD.officer_id;
+
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_refresh_current_assignment
+AFTER DELETE ON ComplaintAssignments
+FOR EACH ROW
+EXECUTE FUNCTION refresh_current_assignment();
+
 -- Trigger 2: set complaint 'Resolved' on final action (is_final = true)
 CREATE OR REPLACE FUNCTION set_complaint_resolved()
 RETURNS TRIGGER AS $$
@@ -245,24 +742,40 @@ EXECUTE FUNCTION set_complaint_closed_on_feedback();
 -- ==========================
 -- AUDIT TRIGGER: logs inserts/updates/deletes to AuditLog
 -- ==========================
+-- TG_ARGV[0] names the primary key column; updates store only the columns that changed
 CREATE OR REPLACE FUNCTION audit_table()
 RETURNS TRIGGER AS $$
 DECLARE
-    pk JSONB;
+    old_row JSONB;
+    new_row JSONB;
+    old_diff JSONB;
+    new_diff JSONB;
 BEGIN
-    -- determine primary key(s) dynamically as JSON
     IF TG_OP = 'INSERT' THEN
-        pk = jsonb_build_object('pk', NEW.*)::jsonb; -- convenience (stores row)
+        new_row := to_jsonb(NEW) - 'search_document';
         INSERT INTO AuditLog(table_name, operation, primary_key, changed_by, row_data)
-        VALUES (TG_TABLE_NAME, 'I', to_jsonb(NEW), NULL, to_jsonb(NEW));
+        VALUES (TG_TABLE_NAME, 'I', new_row -> TG_ARGV[0], NULL, new_row);
         RETURN NEW;
     ELSIF TG_OP = 'UPDATE' THEN
-        INSERT INTO AuditLog(table_name, operation, primary_key, changed_by, row_data)
-        VALUES (TG_TABLE_NAME, 'U', to_jsonb(NEW), NULL, jsonb_build_object('old', to_jsonb(OLD), 'new', to_jsonb(NEW)));
+        old_row := to_jsonb(OLD) - 'search_document';
+        new_row := to_jsonb(NEW) - 'search_document';
+        SELECT jsonb_object_agg(n.key, o.value), jsonb_object_agg(n.key, n.value)
+        INTO old_diff, new_diff
+        FROM jsonb_each(new_row) n
+        JOIN jsonb_each(old_row) o USING (key)
+        WHERE n.value IS DISTINCT FROM o.value;
+
+        -- no-op updates leave no audit row
+        IF new_diff IS NOT NULL THEN
+            INSERT INTO AuditLog(table_name, operation, primary_key, changed_by, row_data)
+            VALUES (TG_TABLE_NAME, 'U', new_row -> TG_ARGV[0], NULL,
+                    jsonb_build_object('old', old_diff, 'new', new_diff));
+        END IF;
         RETURN NEW;
     ELSIF TG_OP = 'DELETE' THEN
+        old_row := to_jsonb(OLD) - 'search_document';
         INSERT INTO AuditLog(table_name, operation, primary_key, changed_by, row_data)
-        VALUES (TG_TABLE_NAME, 'D', to_jsonb(OLD), NULL, to_jsonb(OLD));
+        VALUES (TG_TABLE_NAME, 'D', old_row -> TG_ARGV[0], NULL, old_row);
         RETURN OLD;
     END IF;
 
@@ -273,12 +786,232 @@ $$ LANGUAGE plpgsql;
 CREATE TRIGGER trg_audit_users
 AFTER INSERT OR UPDATE OR DELETE ON Users
 FOR EACH ROW
-EXECUTE FUNCTION audit_table();
+EXECUTE FUNCTION audit_table('user_id');
 
 CREATE TRIGGER trg_audit_complaints
 AFTER INSERT OR UPDATE OR DELETE ON Complaints
 FOR EACH ROW
-EXECUTE FUNCTION audit_table();
+EXECUTE FUNCTION audit_table('complaint_id');
+
+-- ==========================
+-- STATEMENT-LEVEL AUDIT: one set-based AuditLog insert per statement from its transition
+-- tables, instead of one insert per row. Same row shape as audit_table(). Off by default;
+-- switch with SELECT set_audit_mode('statement').
+-- ==========================
+CREATE OR REPLACE FUNCTION audit_table_stmt()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO AuditLog(table_name, operation, primary_key, changed_by, row_data)
+        SELECT TG_TABLE_NAME, 'I', r -> TG_ARGV[0], NULL, r
+        FROM (SELECT to_jsonb(n) - 'search_document' AS r FROM new_rows n) s;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO AuditLog(table_name, operation, primary_key, changed_by, row_data)
+        SELECT TG_TABLE_NAME, 'U', n.r -> TG_ARGV[0], NULL,
+               jsonb_build_object('old', d.old_diff, 'new', d.new_diff)
+        FROM (SELECT to_jsonb(x) - 'search_document' AS r FROM new_rows x) n
+        JOIN (SELECT to_jsonb(x) - 'search_document' AS r FROM old_rows x) o
+          ON o.r -> TG_ARGV[0] = n.r -> TG_ARGV[0]
+        CROSS JOIN LATERAL (
+            SELECT jsonb_object_agg(nk.key, ok.value) AS old_diff,
+                   jsonb_object_agg(nk.key, nk.value) AS new_diff
+            FROM jsonb_each(n.r) nk
+            JOIN jsonb_each(o.r) ok USING (key)
+            WHERE nk.value IS DISTINCT FROM ok.value
+        ) d
+        WHERE d.new_diff IS NOT NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO AuditLog(table_name, operation, primary_key, changed_by, row_data)
+        SELECT TG_TABLE_NAME, 'D', r -> TG_ARGV[0], NULL, r
+        FROM (SELECT to_jsonb(o) - 'search_document' AS r FROM old_rows o) s;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 'row' (per-row triggers, the default), 'statement' (transition tables) or 'off'.
+-- Triggers with transition tables take a single event each, hence three per table.
+CREATE OR REPLACE FUNCTION set_audit_mode(p_mode TEXT)
+RETURNS TEXT AS $$
+DECLARE
+    t RECORD;
+BEGIN
+    IF p_mode NOT IN ('row', 'statement', 'off') THEN
+        RAISE EXCEPTION 'Unknown audit mode: %', p_mode;
+    END IF;
+
+    FOR t IN SELECT * FROM (VALUES ('users', 'user_id'), ('complaints', 'complaint_id')) AS v(tbl, pk) LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', 'trg_audit_' || t.tbl, t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', 'trg_audit_' || t.tbl || '_ins', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', 'trg_audit_' || t.tbl || '_upd', t.tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS %I ON %I', 'trg_audit_' || t.tbl || '_del', t.tbl);
+
+        IF p_mode = 'row' THEN
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER INSERT OR UPDATE OR DELETE ON %I
+                 FOR EACH ROW EXECUTE FUNCTION audit_table(%L)',
+                'trg_audit_' || t.tbl, t.tbl, t.pk);
+        ELSIF p_mode = 'statement' THEN
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER INSERT ON %I REFERENCING NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION audit_table_stmt(%L)',
+                'trg_audit_' || t.tbl || '_ins', t.tbl, t.pk);
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER UPDATE ON %I REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION audit_table_stmt(%L)',
+                'trg_audit_' || t.tbl || '_upd', t.tbl, t.pk);
+            EXECUTE format(
+                'CREATE TRIGGER %I AFTER DELETE ON %I REFERENCING OLD TABLE AS old_rows
+                 FOR EACH STATEMENT EXECUTE FUNCTION audit_table_stmt(%L)',
+                'trg_audit_' || t.tbl || '_del', t.tbl, t.pk);
+        END IF;
+    END LOOP;
+    RETURN p_mode;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION audit_mode()
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = 'complaints'::regclass AND tgname = 'trg_audit_complaints') THEN 'row'
+        WHEN EXISTS (SELECT 1 FROM pg_trigger WHERE tgrelid = 'complaints'::regclass AND tgname = 'trg_audit_complaints_ins') THEN 'statement'
+        ELSE 'off'
+    END;
+$$ LANGUAGE sql STABLE;
+
+-- ==========================
+-- AUDIT PARTITIONS: one per month, created ahead and detached once past retention
+-- ==========================
+CREATE OR REPLACE FUNCTION ensure_audit_partitions(p_months_ahead INT DEFAULT 3)
+RETURNS INT AS $$
+DECLARE
+    month_start TIMESTAMPTZ;
+    part TEXT;
+    created INT := 0;
+BEGIN
+    FOR i IN 0..p_months_ahead LOOP
+        month_start := date_trunc('month', now()) + make_interval(months => i);
+        part := 'auditlog_p' || to_char(month_start, 'YYYYMM');
+        CONTINUE WHEN to_regclass(part) IS NOT NULL;
+
+        -- rows that already landed in the default partition must move before the range can be attached
+        CREATE TEMP TABLE audit_move ON COMMIT DROP AS
+        SELECT * FROM AuditLog_default
+        WHERE changed_at >= month_start AND changed_at < month_start + INTERVAL '1 month';
+        DELETE FROM AuditLog_default
+        WHERE changed_at >= month_start AND changed_at < month_start + INTERVAL '1 month';
+
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF AuditLog FOR VALUES FROM (%L) TO (%L)',
+            part, month_start, month_start + INTERVAL '1 month'
+        );
+        INSERT INTO AuditLog SELECT * FROM audit_move;
+        DROP TABLE audit_move;
+        created := created + 1;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- detaches monthly partitions that ended more than p_keep_months ago; detached tables are
+-- left in place as archives unless p_drop is set. Returns the affected partition names.
+CREATE OR REPLACE FUNCTION detach_audit_partitions(p_keep_months INT, p_drop BOOLEAN DEFAULT FALSE)
+RETURNS SETOF TEXT AS $$
+DECLARE
+    part TEXT;
+    cutoff TIMESTAMPTZ := date_trunc('month', now()) - make_interval(months => p_keep_months);
+BEGIN
+    FOR part IN
+        SELECT c.relname::text
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'auditlog'::regclass
+          AND c.relname ~ '^auditlog_p[0-9]{6}$'
+          AND to_timestamp(substr(c.relname, 11), 'YYYYMM') + INTERVAL '1 month' <= cutoff
+        ORDER BY c.relname
+    LOOP
+        EXECUTE format('ALTER TABLE AuditLog DETACH PARTITION %I', part);
+        IF p_drop THEN
+            EXECUTE format('DROP TABLE %I', part);
+        END IF;
+        RETURN NEXT part;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_audit_partitions();
+
+-- ==========================
+-- CHANGE EVENTS: one compact NOTIFY per statement so every API worker can evict its cache
+-- ==========================
+CREATE OR REPLACE FUNCTION notify_table_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- identical payloads within a transaction are delivered once
+    PERFORM pg_notify('table_changes', json_build_object('table', TG_TABLE_NAME, 'op', left(TG_OP, 1))::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_notify_users
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Users
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_table_change();
+
+CREATE TRIGGER trg_notify_complaints
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Complaints
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_table_change();
+
+CREATE TRIGGER trg_notify_officers
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Officers
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_table_change();
+
+CREATE TRIGGER trg_notify_assignments
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ComplaintAssignments
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_table_change();
+
+CREATE TRIGGER trg_notify_actions
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ComplaintActions
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_table_change();
+
+CREATE TRIGGER trg_notify_feedback
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON Feedback
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_table_change();
+
+CREATE TRIGGER trg_notify_evidence
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ComplaintEvidence
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_table_change();
+
+-- status transitions for the live feed (/api/events/complaints)
+CREATE OR REPLACE FUNCTION notify_complaint_status()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND NEW.status IS NOT DISTINCT FROM OLD.status THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('complaint_status', json_build_object(
+        'complaint_id', NEW.complaint_id,
+        'status', NEW.status,
+        'old_status', CASE WHEN TG_OP = 'UPDATE' THEN OLD.status END,
+        'category', NEW.category,
+        'officer_id', NEW.current_officer_id,
+        'changed_at', NEW.last_updated_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_notify_complaint_status
+AFTER INSERT OR UPDATE OF status ON Complaints
+FOR EACH ROW
+EXECUTE FUNCTION notify_complaint_status();
 
 -- USERS
 INSERT INTO Users (name, email, phone, role, password_hash)
@@ -307,6 +1040,19 @@ VALUES
 (6, 'Waste Management', 'Supervisor')
 ON CONFLICT DO NOTHING;
 
+-- AUTO-ASSIGNMENT ROUTING
+INSERT INTO CategoryRouting (category, department)
+VALUES
+('Air Pollution', 'Pollution Control'),
+('Deforestation', 'Pollution Control'),
+('Garbage Dumping', 'Waste Management'),
+('Garbage Issue', 'Waste Management'),
+('Plastic Waste', 'Waste Management'),
+('Water Leakage', 'Water Resources'),
+('Illegal Construction', 'Public Health'),
+('Noise Pollution', 'Noise Regulation')
+ON CONFLICT DO NOTHING;
+
 -- COMPLAINTS
 INSERT INTO Complaints (user_id, category, description, location, status)
 VALUES
@@ -376,7 +1122,7 @@ BEGIN
     IF NOT EXISTS (SELECT FROM pg_roles WHERE rolname = 'officer') THEN
         CREATE ROLE officer NOINHERIT;
     END IF;
-    IF NOT EXISTS (SELECT FROM pg_roles WHERE rolname = 'admin') THEN
+    IF NOT EXISTS (SELECT FROM pg_roles WHERE rolname = 'admin_role') THEN
         CREATE ROLE admin_role NOINHERIT;
     END IF;
 END$$;
@@ -390,10 +1136,10 @@ CREATE OR REPLACE FUNCTION complaints_by_status(p_status VARCHAR)
 RETURNS TABLE (complaint_id INT, category TEXT, description TEXT, location TEXT, submitted_at TIMESTAMP WITH TIME ZONE) AS $$
 BEGIN
     RETURN QUERY
-    SELECT complaint_id, category, description, location, submitted_at
-    FROM Complaints
-    WHERE status = p_status
-    ORDER BY submitted_at DESC;
+    SELECT c.complaint_id, c.category::text, c.description, c.location::text, c.submitted_at
+    FROM Complaints c
+    WHERE c.status = p_status
+    ORDER BY c.submitted_at DESC;
 END;
 $$ LANGUAGE plpgsql;
 